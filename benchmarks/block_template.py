@@ -0,0 +1,39 @@
+import random
+import time
+
+from common.mem_pool import MemPool
+from common.utils import calculate_transaction_hash
+from node.new_block_creation.block_template import BlockTemplateBuilder
+
+NUMBER_OF_TRANSACTIONS = 100000
+CHILD_PROBABILITY = 0.2
+
+
+def transaction(utxo_hash: str) -> dict:
+    return {
+        "inputs": [{"transaction_hash": utxo_hash, "output_index": 0, "unlocking_script": "sig key"}],
+        "outputs": [{"amount": 10, "locking_script": "OP_DUP OP_HASH160 abcd OP_EQUAL_VERIFY OP_CHECKSIG"}]
+    }
+
+
+def main():
+    random.seed(0)
+    mem_pool = MemPool()
+    transaction_hashes = []
+    for i in range(NUMBER_OF_TRANSACTIONS):
+        if transaction_hashes and random.random() < CHILD_PROBABILITY:
+            new_transaction = transaction(transaction_hashes.pop(random.randrange(len(transaction_hashes))))
+        else:
+            new_transaction = transaction(f"{i:064x}")
+        mem_pool.add(new_transaction, fee=random.randint(0, 100))
+        transaction_hashes.append(calculate_transaction_hash(new_transaction))
+
+    start = time.perf_counter()
+    block_template = BlockTemplateBuilder(mem_pool).build()
+    elapsed = time.perf_counter() - start
+    print(f"{len(block_template.transactions)} of {len(mem_pool)} transactions selected "
+          f"({block_template.size} bytes, fees {block_template.fees}) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
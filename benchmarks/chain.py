@@ -0,0 +1,63 @@
+import random
+import time
+import tracemalloc
+
+from common.block import Block, BlockHeader
+from common.chain import Chain
+
+NUMBER_OF_BLOCKS = 100000
+NUMBER_OF_LOOKUPS = 1000
+LAST_BLOCKS = 100
+
+
+def build_chain() -> Chain:
+    chain = Chain()
+    previous_block_hash = "0" * 64
+    for nonce in range(NUMBER_OF_BLOCKS):
+        block_header = BlockHeader(previous_block_hash=previous_block_hash, timestamp=1234.5, nonce=nonce,
+                                   merkle_root="f" * 64)
+        chain.append(Block(transactions=[], block_header=block_header))
+        previous_block_hash = block_header.hash
+    return chain
+
+
+def walk_to_height(tip: Block, height: int) -> Block:
+    current_block = tip
+    while current_block.height > height:
+        current_block = current_block.previous_block
+    return current_block
+
+
+def time_per_call(function, arguments: list) -> float:
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def main():
+    random.seed(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    chain = build_chain()
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(chain)} blocks built in {elapsed:.2f} s, {memory / len(chain):.0f} bytes per block")
+
+    heights = [random.randrange(len(chain)) for _ in range(NUMBER_OF_LOOKUPS)]
+    hashes = [chain[height].block_header.hash for height in heights]
+    walk = time_per_call(lambda height: walk_to_height(chain.tip, height), heights)
+    indexed = time_per_call(lambda height: chain[height], heights)
+    by_hash = time_per_call(chain.get_block, hashes)
+    length = time_per_call(lambda _: len(chain.tip), heights)
+    last_blocks = time_per_call(lambda _: chain.get_last_blocks(LAST_BLOCKS), heights)
+    print(f"block by height, linked walk: {walk * 1e6:,.1f} us")
+    print(f"block by height, chain index: {indexed * 1e6:,.3f} us ({walk / indexed:,.0f}x)")
+    print(f"block by hash:                {by_hash * 1e6:,.3f} us")
+    print(f"len(tip):                     {length * 1e6:,.3f} us")
+    print(f"last {LAST_BLOCKS} blocks:               {last_blocks * 1e6:,.3f} us")
+
+
+if __name__ == "__main__":
+    main()
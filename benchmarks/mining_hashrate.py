@@ -0,0 +1,40 @@
+import json
+import time
+
+from common.block import BlockHeader
+from common.utils import calculate_hash
+from node.new_block_creation.mining_engine import HeaderHasher
+
+NUMBER_OF_NONCES = 200000
+
+
+def json_loop_hashrate(block_header: BlockHeader) -> float:
+    start = time.perf_counter()
+    for nonce in range(NUMBER_OF_NONCES):
+        block_header_content = {
+            "previous_block_hash": block_header.previous_block_hash,
+            "merkle_root": block_header.merkle_root,
+            "timestamp": block_header.timestamp,
+            "nonce": nonce
+        }
+        calculate_hash(json.dumps(block_header_content))
+    return NUMBER_OF_NONCES / (time.perf_counter() - start)
+
+
+def midstate_hashrate(block_header: BlockHeader) -> float:
+    header_hasher = HeaderHasher(block_header)
+    start = time.perf_counter()
+    header_hasher.search(0, 1, NUMBER_OF_NONCES, 64)
+    return NUMBER_OF_NONCES / (time.perf_counter() - start)
+
+
+def main():
+    block_header = BlockHeader(previous_block_hash="0" * 64, timestamp=time.time(), nonce=0, merkle_root="f" * 64)
+    json_loop = json_loop_hashrate(block_header)
+    midstate = midstate_hashrate(block_header)
+    print(f"json.dumps + calculate_hash: {json_loop:,.0f} H/s")
+    print(f"sha256 midstate:             {midstate:,.0f} H/s ({midstate / json_loop:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
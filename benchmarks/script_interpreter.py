@@ -0,0 +1,106 @@
+import binascii
+import copy
+import json
+import time
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature import pkcs1_15
+
+from blockchain_users.camille import private_key as camille_private_key
+from common.owner import Owner
+from common.transaction import Transaction
+from common.transaction_input import TransactionInput
+from common.transaction_output import TransactionOutput
+from common.utils import calculate_hash
+from node.transaction_validation.script import StackScript, compile_script, get_signature_message
+
+NUMBER_OF_INPUTS = 20
+NUMBER_OF_ROUNDS = 20
+
+
+class LegacyStackScript:
+    def __init__(self, transaction_data: dict):
+        self.elements = []
+        for count, tx_input in enumerate(transaction_data["inputs"]):
+            tx_input.pop("unlocking_script")
+            transaction_data["inputs"][count] = tx_input
+        self.transaction_data = transaction_data
+
+    def push(self, element):
+        self.elements.append(element)
+
+    def pop(self):
+        return self.elements.pop()
+
+    def op_dup(self):
+        last_element = self.pop()
+        self.push(last_element)
+        self.push(last_element)
+
+    def op_hash160(self):
+        last_element = self.pop()
+        self.push(calculate_hash(calculate_hash(last_element, hash_function="sha256"), hash_function="ripemd160"))
+
+    def op_equal_verify(self):
+        assert self.pop() == self.pop()
+
+    def op_checksig(self):
+        public_key = self.pop()
+        signature = self.pop()
+        signature_decoded = binascii.unhexlify(signature.encode("utf-8"))
+        public_key_object = RSA.import_key(binascii.unhexlify(public_key.encode("utf-8")))
+        transaction_bytes = json.dumps(self.transaction_data, indent=2).encode('utf-8')
+        pkcs1_15.new(public_key_object).verify(SHA256.new(transaction_bytes), signature_decoded)
+
+
+def legacy_execute_script(transaction_data: dict, unlocking_script: str, locking_script: str):
+    transaction_data = copy.deepcopy(transaction_data)
+    transaction_data.pop("transaction_hash")
+    stack_script = LegacyStackScript(transaction_data)
+    for element in unlocking_script.split(" ") + locking_script.split(" "):
+        if element.startswith("OP"):
+            getattr(LegacyStackScript, element.lower())(stack_script)
+        else:
+            stack_script.push(element)
+
+
+def compiled_execute_scripts(transaction_data: dict, locking_script: str, signature_collector: list = None):
+    signature_message = get_signature_message(transaction_data)
+    for tx_input in transaction_data["inputs"]:
+        stack_script = StackScript(signature_message, signature_collector)
+        stack_script.execute(compile_script(tx_input["unlocking_script"]))
+        stack_script.execute(compile_script(locking_script))
+
+
+def scripts_per_second(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(NUMBER_OF_ROUNDS):
+        function(*args)
+    return NUMBER_OF_ROUNDS * NUMBER_OF_INPUTS / (time.perf_counter() - start)
+
+
+def main():
+    owner = Owner(private_key=camille_private_key)
+    inputs = [TransactionInput(transaction_hash=f"{i:064x}", output_index=0) for i in range(NUMBER_OF_INPUTS)]
+    outputs = [TransactionOutput(public_key_hash=owner.public_key_hash, amount=NUMBER_OF_INPUTS)]
+    transaction = Transaction(inputs, outputs)
+    transaction.sign(owner)
+    transaction_data = transaction.transaction_data
+    locking_script = outputs[0].locking_script
+
+    def legacy(data):
+        for tx_input in data["inputs"]:
+            legacy_execute_script(data, tx_input["unlocking_script"], locking_script)
+
+    legacy_rate = scripts_per_second(legacy, transaction_data)
+    compiled_rate = scripts_per_second(compiled_execute_scripts, transaction_data, locking_script)
+    deferred_rate = scripts_per_second(lambda data: compiled_execute_scripts(data, locking_script, []),
+                                       transaction_data)
+    print(f"legacy interpreter:               {legacy_rate:,.0f} scripts/s")
+    print(f"compiled interpreter:             {compiled_rate:,.0f} scripts/s ({compiled_rate / legacy_rate:.1f}x)")
+    print(f"compiled, signatures deferred:    {deferred_rate:,.0f} scripts/s")
+
+
+if __name__ == "__main__":
+    main()
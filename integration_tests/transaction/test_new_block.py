@@ -1,13 +1,17 @@
+import threading
+from unittest.mock import patch
+
 import pytest
 import requests
 
 from blockchain_users.camille import private_key as camille_private_key
+from common.chain_state import BLOCK_CONNECTED
 from common.io_blockchain import get_blockchain_from_memory
 from common.io_mem_pool import store_transactions_in_memory
 from common.transaction_input import TransactionInput
 from common.transaction_output import TransactionOutput
 from integration_tests.common.flask import Server
-from node.new_block_creation.new_block_creation import ProofOfWork
+from node.new_block_creation.new_block_creation import BlockException, ProofOfWork
 from wallet.wallet import Owner, Wallet, Transaction
 from common.network import Network
 from common.node import Node
@@ -23,7 +27,7 @@ def camille_wallet(camille):
     return Wallet(camille)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture
 def create_good_transactions(camille):
     utxo_0 = TransactionInput(transaction_hash="e10154f49ae1119777b93e5bcd1a1506b6a89c1f82cc85f63c6cbe83a39df5dc",
                               output_index=0)
@@ -37,7 +41,7 @@ def create_good_transactions(camille):
     store_transactions_in_memory(transactions_str)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture
 def create_bad_transactions(camille):
     utxo_0 = TransactionInput(transaction_hash="5669d7971b76850a4d725c75fbbc20ea97bd1382e2cfae43c41e121ca399b660",
                               output_index=0)
@@ -59,7 +63,7 @@ def server() -> Server:
 
 @pytest.fixture(scope="module")
 def network() -> Network:
-    node = Node(hostname="1.1.1.1:1234")
+    node = Node(hostname="127.0.0.1:5000")
     network = Network(node)
     return network
 
@@ -69,8 +73,9 @@ def test_given_good_transactions_in_mem_pool_when_new_block_is_created_then_new_
     server.start()
     pow = ProofOfWork(network)
     pow.create_new_block()
-    pow.broadcast()
+    block_receipt = pow.broadcast()
     server.stop()
+    assert block_receipt == {"status": BLOCK_CONNECTED}
 
 
 def test_given_good_transactions_in_mem_pool_when_new_block_is_created_then_new_block_is_added_to_current_blockchain(
@@ -118,3 +123,20 @@ def test_given_bad_transactions_in_mem_pool_when_new_block_is_created_then_new_b
         pow.broadcast()
     assert 'Could not find locking script for utxo' in error.value.response.text
     server.stop()
+
+
+def test_given_competing_block_sent_to_node_when_mining_then_miner_stops(create_good_transactions, server, network):
+    server.start()
+    competing_pow = ProofOfWork(network)
+    competing_pow.create_new_block()
+    pow = ProofOfWork(network)
+    timer = threading.Timer(1.5, competing_pow.broadcast)
+    timer.start()
+    with patch("node.new_block_creation.new_block_creation.NUMBER_OF_LEADING_ZEROS", 64):
+        with pytest.raises(BlockException) as error:
+            pow.create_new_block()
+    timer.join()
+    tip_hash = network.node.get_tip()["hash"]
+    server.stop()
+    assert error.value.message == "Mining cancelled"
+    assert tip_hash == competing_pow.new_block.block_header.hash
@@ -1,15 +1,34 @@
 import json
 
 from common.utils import calculate_hash
+from common.values import NUMBER_OF_LEADING_ZEROS
+
+HEADER_FIELDS = frozenset(("previous_block_hash", "merkle_root", "timestamp", "nonce"))
 
 
 class BlockHeader:
+    __slots__ = ("previous_block_hash", "merkle_root", "timestamp", "nonce", "_hash")
+
     def __init__(self, previous_block_hash: str, timestamp: float, nonce: int, merkle_root: str):
         self.previous_block_hash = previous_block_hash
         self.merkle_root = merkle_root
         self.timestamp = timestamp
         self.nonce = nonce
-        self.hash = self.get_hash()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in HEADER_FIELDS:
+            object.__setattr__(self, "_hash", None)
+
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", self.get_hash())
+        return self._hash
+
+    @hash.setter
+    def hash(self, value: str):
+        object.__setattr__(self, "_hash", value)
 
     def __eq__(self, other):
         try:
@@ -22,6 +41,10 @@ class BlockHeader:
         except AssertionError:
             return False
 
+    @property
+    def work(self) -> int:
+        return 16 ** NUMBER_OF_LEADING_ZEROS
+
     def get_hash(self) -> str:
         header_data = {"previous_block_hash": self.previous_block_hash,
                        "merkle_root": self.merkle_root,
@@ -47,6 +70,8 @@ class BlockHeader:
 
 
 class Block:
+    __slots__ = ("block_header", "transactions", "_previous_block", "height")
+
     def __init__(
             self,
             transactions: list(dict),
@@ -57,6 +82,15 @@ class Block:
         self.transactions = transactions
         self.previous_block = previous_block
 
+    @property
+    def previous_block(self):
+        return self._previous_block
+
+    @previous_block.setter
+    def previous_block(self, previous_block):
+        self._previous_block = previous_block
+        self.height = previous_block.height + 1 if previous_block is not None else 0
+
     def __eq__(self, other):
         try:
             assert self.block_header == other.block_header
@@ -66,12 +100,7 @@ class Block:
             return False
 
     def __len__(self) -> int:
-        i = 1
-        current_block = self
-        while current_block.previous_block:
-            i = i + 1
-            current_block = current_block.previous_block
-        return i
+        return self.height + 1
 
     def __str__(self):
         return json.dumps({"timestamp": self.block_header.timestamp,
@@ -95,9 +124,9 @@ class Block:
     def to_json(self) -> str:
         return json.dumps(self.to_dict)
 
-    def get_transaction(self, transaction_hash: dict) -> dict:
+    def get_transaction(self, transaction_hash: str) -> dict:
         current_block = self
-        while current_block.previous_block:
+        while current_block:
             for transaction in current_block.transactions:
                 if transaction["transaction_hash"] == transaction_hash:
                     return transaction
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from common.block import Block
+
+MAX_SIDE_BRANCH_BLOCKS = 1000
+MAX_ORPHAN_BLOCKS = 100
+
+
+class BlockTree:
+    def __init__(self, max_side_branch_blocks: int = MAX_SIDE_BRANCH_BLOCKS, max_orphan_blocks: int = MAX_ORPHAN_BLOCKS):
+        self.max_side_branch_blocks = max_side_branch_blocks
+        self.max_orphan_blocks = max_orphan_blocks
+        self.side_branch_blocks = OrderedDict()
+        self.cumulative_work = {}
+        self.orphan_blocks = OrderedDict()
+        self.orphan_hashes_by_parent = {}
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.side_branch_blocks or block_hash in self.orphan_blocks
+
+    def get_block(self, block_hash: str) -> Block:
+        return self.side_branch_blocks.get(block_hash) or self.orphan_blocks.get(block_hash)
+
+    def get_work(self, block_hash: str) -> int:
+        return self.cumulative_work.get(block_hash)
+
+    def add_side_branch_block(self, block: Block, cumulative_work: int):
+        block_hash = block.block_header.hash
+        self.side_branch_blocks[block_hash] = block
+        self.cumulative_work[block_hash] = cumulative_work
+        while len(self.side_branch_blocks) > self.max_side_branch_blocks:
+            evicted_hash, _ = self.side_branch_blocks.popitem(last=False)
+            self.cumulative_work.pop(evicted_hash)
+
+    def remove_side_branch_block(self, block_hash: str) -> Block:
+        self.cumulative_work.pop(block_hash, None)
+        return self.side_branch_blocks.pop(block_hash, None)
+
+    def remove_descendants(self, block_hash: str) -> list:
+        removed_hashes = []
+        parent_hashes = {block_hash}
+        for side_branch_hash, block in list(self.side_branch_blocks.items()):
+            if block.block_header.previous_block_hash in parent_hashes:
+                parent_hashes.add(side_branch_hash)
+                self.remove_side_branch_block(side_branch_hash)
+                removed_hashes.append(side_branch_hash)
+        return removed_hashes
+
+    def add_orphan_block(self, block: Block):
+        block_hash = block.block_header.hash
+        if block_hash in self.orphan_blocks:
+            return
+        self.orphan_blocks[block_hash] = block
+        self.orphan_hashes_by_parent.setdefault(block.block_header.previous_block_hash, []).append(block_hash)
+        while len(self.orphan_blocks) > self.max_orphan_blocks:
+            evicted_hash, evicted_block = self.orphan_blocks.popitem(last=False)
+            self._forget_orphan(evicted_hash, evicted_block.block_header.previous_block_hash)
+
+    def _forget_orphan(self, block_hash: str, parent_hash: str):
+        sibling_hashes = self.orphan_hashes_by_parent.get(parent_hash, [])
+        if block_hash in sibling_hashes:
+            sibling_hashes.remove(block_hash)
+        if not sibling_hashes:
+            self.orphan_hashes_by_parent.pop(parent_hash, None)
+
+    def pop_orphan_children(self, parent_hash: str) -> list:
+        return [self.orphan_blocks.pop(block_hash)
+                for block_hash in self.orphan_hashes_by_parent.pop(parent_hash, [])]
+
+    def get_branch(self, tip_hash: str) -> list:
+        branch = []
+        block = self.side_branch_blocks.get(tip_hash)
+        while block is not None:
+            branch.append(block)
+            block = self.side_branch_blocks.get(block.block_header.previous_block_hash)
+        return list(reversed(branch))
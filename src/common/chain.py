@@ -0,0 +1,89 @@
+from common.block import Block
+
+
+class ChainException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+class Chain:
+    def __init__(self, blocks: list = None):
+        self.blocks = []
+        self.heights = {}
+        self.cumulative_work = []
+        for block in blocks or []:
+            self.append(block)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __bool__(self) -> bool:
+        return bool(self.blocks)
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.heights
+
+    def __getitem__(self, height):
+        return self.blocks[height]
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    @property
+    def tip(self) -> Block:
+        return self.blocks[-1] if self.blocks else None
+
+    @property
+    def height(self) -> int:
+        return len(self.blocks) - 1
+
+    @property
+    def work(self) -> int:
+        return self.cumulative_work[-1] if self.cumulative_work else 0
+
+    def get_height(self, block_hash: str) -> int:
+        return self.heights.get(block_hash)
+
+    def get_block(self, block_hash: str) -> Block:
+        height = self.heights.get(block_hash)
+        return self.blocks[height] if height is not None else None
+
+    def get_last_blocks(self, number_of_blocks: int) -> list:
+        return self.blocks[max(len(self.blocks) - number_of_blocks, 0):]
+
+    def append(self, block: Block):
+        tip = self.tip
+        if tip is not None and block.block_header.previous_block_hash != tip.block_header.hash:
+            raise ChainException(block.block_header.previous_block_hash, "Block does not extend the chain tip")
+        block.previous_block = tip
+        self.heights[block.block_header.hash] = len(self.blocks)
+        self.cumulative_work.append(self.work + block.block_header.work)
+        self.blocks.append(block)
+
+    def truncate(self, height: int) -> list:
+        removed_blocks = self.blocks[height:]
+        del self.blocks[height:]
+        del self.cumulative_work[height:]
+        for block in removed_blocks:
+            self.heights.pop(block.block_header.hash, None)
+        return removed_blocks
+
+    @property
+    def to_dict(self) -> list:
+        return [{"header": block.block_header.to_dict, "transactions": block.transactions}
+                for block in reversed(self.blocks)]
+
+    @classmethod
+    def from_tip(cls, tip: Block):
+        blocks = []
+        current_block = tip
+        while current_block is not None:
+            blocks.append(current_block)
+            current_block = current_block.previous_block
+        chain = cls()
+        for block in reversed(blocks):
+            chain.heights[block.block_header.hash] = len(chain.blocks)
+            chain.cumulative_work.append(chain.work + block.block_header.work)
+            chain.blocks.append(block)
+        return chain
@@ -0,0 +1,274 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from common.block import Block
+from common.block_tree import BlockTree
+from common.chain import Chain
+from common.io_blockchain import append_block_to_memory, get_chain_from_memory, truncate_blockchain_in_memory
+from common.io_utxo_set import get_utxo_set_from_memory, store_utxo_set_changes_in_memory
+from common.merkle_tree import MerkleTree, get_merkle_root
+from common.transaction_index import TransactionIndex
+from common.values import MAX_HEADERS_PER_REQUEST, MERKLE_TREE_CACHE_SIZE, NUMBER_OF_LEADING_ZEROS
+
+BLOCK_KNOWN = "known"
+BLOCK_CONNECTED = "connected"
+BLOCK_SIDE_BRANCH = "side_branch"
+BLOCK_ORPHANED = "orphaned"
+BLOCK_REORGANIZED = "reorganized"
+
+
+class ChainStateException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+class ReadWriteLock:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers = self._readers + 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers = self._readers - 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers = self._waiting_writers + 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers = self._waiting_writers - 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class ChainState:
+    def __init__(self):
+        self.lock = ReadWriteLock()
+        self.chain = Chain()
+        self.utxo_set = None
+        self.transaction_index = None
+        self.block_tree = BlockTree()
+        self.merkle_trees = OrderedDict()
+        self.merkle_trees_lock = threading.Lock()
+
+    def read(self):
+        return self.lock.read()
+
+    def write(self):
+        return self.lock.write()
+
+    @property
+    def blockchain(self) -> Block:
+        return self.chain.tip
+
+    def load(self):
+        with self.write():
+            self.chain = get_chain_from_memory()
+            self.utxo_set = get_utxo_set_from_memory(self.chain)
+            self.transaction_index = TransactionIndex.from_chain(self.chain)
+            self.block_tree = BlockTree()
+
+    def has_block(self, block_hash: str) -> bool:
+        with self.read():
+            return block_hash in self.chain or block_hash in self.block_tree
+
+    def _validate_tip_extension(self, block: Block, validate) -> str:
+        with self.read():
+            block_hash = block.block_header.hash
+            tip_hash = self.chain.tip.block_header.hash
+            if block.block_header.previous_block_hash != tip_hash or block_hash in self.chain \
+                    or block_hash in self.block_tree.side_branch_blocks:
+                return None
+            self._check_block_header(block)
+            validate(block, self.chain.tip, self.utxo_set)
+            return tip_hash
+
+    def receive_block(self, block: Block, validate) -> dict:
+        validated_tip_hash = self._validate_tip_extension(block, validate)
+        with self.write():
+            stored_height = self.chain.height
+            changes = {"first_changed_height": stored_height + 1, "disconnected": []}
+            if validated_tip_hash is not None and validated_tip_hash == self.chain.tip.block_header.hash:
+                self._connect_block(block)
+                status = BLOCK_CONNECTED
+            else:
+                status = self._receive_block(block, validate, changes)
+            pending_blocks = self._get_orphan_children(block, status)
+            while pending_blocks:
+                pending_block = pending_blocks.pop(0)
+                try:
+                    pending_status = self._receive_block(pending_block, validate, changes)
+                except Exception as exception:
+                    print(f"Orphan block {pending_block.block_header.hash} rejected: {exception}")
+                    continue
+                pending_blocks.extend(self._get_orphan_children(pending_block, pending_status))
+            first_changed_height = changes["first_changed_height"]
+            if first_changed_height <= stored_height:
+                truncate_blockchain_in_memory(first_changed_height)
+            connected_blocks = self.chain[first_changed_height:]
+            for connected_block in connected_blocks:
+                append_block_to_memory(connected_block)
+            if connected_blocks:
+                store_utxo_set_changes_in_memory(self.utxo_set)
+            disconnected_blocks = [disconnected_block for disconnected_block in changes["disconnected"]
+                                   if disconnected_block.block_header.hash not in self.chain]
+        return {"status": status, "connected": connected_blocks, "disconnected": disconnected_blocks}
+
+    def _get_orphan_children(self, block: Block, status: str) -> list:
+        if status in (BLOCK_CONNECTED, BLOCK_SIDE_BRANCH, BLOCK_REORGANIZED):
+            return self.block_tree.pop_orphan_children(block.block_header.hash)
+        return []
+
+    @staticmethod
+    def _check_block_header(block: Block):
+        if not block.block_header.hash.startswith("0" * NUMBER_OF_LEADING_ZEROS):
+            raise ChainStateException(block.block_header.hash, "Proof of work validation failed")
+        if get_merkle_root(block.transactions) != block.block_header.merkle_root:
+            raise ChainStateException(block.block_header.hash, "Merkle root does not match the transactions")
+
+    def _receive_block(self, block: Block, validate, changes: dict) -> str:
+        block_hash = block.block_header.hash
+        if block_hash in self.chain or block_hash in self.block_tree.side_branch_blocks:
+            return BLOCK_KNOWN
+        self._check_block_header(block)
+        parent_hash = block.block_header.previous_block_hash
+        if parent_hash == self.chain.tip.block_header.hash:
+            validate(block, self.chain.tip, self.utxo_set)
+            self._connect_block(block)
+            return BLOCK_CONNECTED
+        parent_height = self.chain.get_height(parent_hash)
+        if parent_height is not None:
+            parent_work = self.chain.cumulative_work[parent_height]
+        elif parent_hash in self.block_tree.side_branch_blocks:
+            parent_work = self.block_tree.get_work(parent_hash)
+        else:
+            self.block_tree.add_orphan_block(block)
+            return BLOCK_ORPHANED
+        self.block_tree.add_side_branch_block(block, parent_work + block.block_header.work)
+        if self.block_tree.get_work(block_hash) > self.chain.work and self._reorganize(block_hash, validate, changes):
+            return BLOCK_REORGANIZED
+        return BLOCK_SIDE_BRANCH
+
+    def _connect_block(self, block: Block):
+        self.utxo_set.apply_block(block)
+        self.chain.append(block)
+        self.transaction_index.add_block(block)
+
+    def _disconnect_tip(self) -> Block:
+        height = self.chain.height
+        block = self.chain.tip
+        self.utxo_set.undo_block(block, self.transaction_index.get_output)
+        self.transaction_index.truncate(height)
+        self.chain.truncate(height)
+        return block
+
+    def _reorganize(self, tip_hash: str, validate, changes: dict) -> bool:
+        branch = self.block_tree.get_branch(tip_hash)
+        fork_height = self.chain.get_height(branch[0].block_header.previous_block_hash)
+        if fork_height is None:
+            return False
+        disconnected_blocks = []
+        while self.chain.height > fork_height:
+            disconnected_work = self.chain.work
+            disconnected_blocks.insert(0, (self._disconnect_tip(), disconnected_work))
+        connected_blocks = []
+        try:
+            for block in branch:
+                validate(block, self.chain.tip, self.utxo_set)
+                self._connect_block(block)
+                connected_blocks.append(block)
+        except Exception:
+            invalid_hash = branch[len(connected_blocks)].block_header.hash
+            print(f"Reorganization to {tip_hash} failed at block {invalid_hash}, restoring the previous chain")
+            self.block_tree.remove_side_branch_block(invalid_hash)
+            self.block_tree.remove_descendants(invalid_hash)
+            for _ in connected_blocks:
+                self._disconnect_tip()
+            for block, _ in disconnected_blocks:
+                self._connect_block(block)
+            raise
+        for block in branch:
+            self.block_tree.remove_side_branch_block(block.block_header.hash)
+        for block, disconnected_work in disconnected_blocks:
+            self.block_tree.add_side_branch_block(block, disconnected_work)
+            changes["disconnected"].append(block)
+        changes["first_changed_height"] = min(changes["first_changed_height"], fork_height + 1)
+        return True
+
+    def get_transaction(self, transaction_hash: str) -> dict:
+        with self.read():
+            return self.transaction_index.get_transaction(transaction_hash)
+
+    def get_tip(self) -> dict:
+        with self.read():
+            return {"height": self.chain.height, "hash": self.chain.tip.block_header.hash}
+
+    def get_height(self, block_hash: str) -> int:
+        with self.read():
+            return self.chain.get_height(block_hash)
+
+    def get_block(self, block_hash: str) -> Block:
+        with self.read():
+            return self.chain.get_block(block_hash)
+
+    def get_blocks(self, from_height: int, to_height: int) -> list:
+        with self.read():
+            return self.chain[max(from_height, 0):max(to_height + 1, 0)]
+
+    def get_headers(self, from_height: int, count: int = MAX_HEADERS_PER_REQUEST) -> list:
+        from_height = max(from_height, 0)
+        count = min(max(count, 0), MAX_HEADERS_PER_REQUEST)
+        with self.read():
+            blocks = self.chain[from_height:from_height + count]
+        return [{"height": from_height + i, "hash": block.block_header.hash, "header": block.block_header.to_dict}
+                for i, block in enumerate(blocks)]
+
+    def get_merkle_tree(self, block: Block) -> MerkleTree:
+        block_hash = block.block_header.hash
+        with self.merkle_trees_lock:
+            merkle_tree = self.merkle_trees.get(block_hash)
+            if merkle_tree is not None:
+                self.merkle_trees.move_to_end(block_hash)
+                return merkle_tree
+        merkle_tree = MerkleTree.from_transactions(block.transactions)
+        with self.merkle_trees_lock:
+            self.merkle_trees[block_hash] = merkle_tree
+            if len(self.merkle_trees) > MERKLE_TREE_CACHE_SIZE:
+                self.merkle_trees.popitem(last=False)
+        return merkle_tree
+
+    def get_transaction_proof(self, transaction_hash: str) -> dict:
+        with self.read():
+            location = self.transaction_index.get_location(transaction_hash)
+            if location is None:
+                return {}
+            height, position = location
+            block = self.chain[height]
+        return {
+            "transaction": block.transactions[position],
+            "height": height,
+            "block_hash": block.block_header.hash,
+            "merkle_root": block.block_header.merkle_root,
+            "index": position,
+            "proof": self.get_merkle_tree(block).get_proof(position)
+        }
@@ -0,0 +1,336 @@
+import struct
+
+FORMAT_VERSION = 1
+BINARY_MIME_TYPE = "application/x-blockchain-binary"
+
+OPCODES = ("OP_DUP", "OP_HASH160", "OP_EQUAL_VERIFY", "OP_CHECKSIG")
+OPCODE_VALUES = {opcode: value for value, opcode in enumerate(OPCODES)}
+PUSH_HEX = 0xf0
+PUSH_STRING = 0xf1
+
+HASH_32 = 0
+HEX_STRING = 1
+UTF8_STRING = 2
+
+INTEGER_AMOUNT = 0
+FLOAT_AMOUNT = 1
+
+HAS_UNLOCKING_SCRIPT = 1
+HAS_TRANSACTION_HASH = 1
+HAS_HEIGHT = 2
+
+INPUT_KEYS = ("transaction_hash", "output_index", "unlocking_script")
+OUTPUT_KEYS = ("amount", "locking_script")
+TRANSACTION_KEYS = ("inputs", "outputs", "transaction_hash")
+COINBASE_TRANSACTION_KEYS = ("inputs", "outputs", "height")
+HEADER_KEYS = ("previous_block_hash", "merkle_root", "timestamp", "nonce")
+BLOCK_KEYS = ("header", "transactions")
+
+UINT8 = struct.Struct(">B")
+UINT16 = struct.Struct(">H")
+UINT32 = struct.Struct(">I")
+INT64 = struct.Struct(">q")
+FLOAT64 = struct.Struct(">d")
+HEADER_NUMBERS = struct.Struct(">dQ")
+
+
+class EncodingException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+def _get_hex_bytes(value: str) -> bytes:
+    try:
+        hex_bytes = bytes.fromhex(value)
+    except ValueError:
+        return None
+    return hex_bytes if hex_bytes.hex() == value else None
+
+
+def _check_keys(data: dict, keys: tuple, optional_keys: tuple = ()):
+    if not isinstance(data, dict):
+        raise EncodingException(data, "Expected an object")
+    data_keys = tuple(data.keys())
+    if data_keys != keys and data_keys not in optional_keys:
+        raise EncodingException(data_keys, "Fields cannot be encoded in binary")
+
+
+def _check_integer(value, maximum: int, minimum: int = 0):
+    if type(value) is not int or not minimum <= value <= maximum:
+        raise EncodingException(value, "Integer cannot be encoded in binary")
+
+
+class BinaryWriter:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write_format(self, structure: struct.Struct, *values):
+        self.buffer += structure.pack(*values)
+
+    def write_bytes(self, value: bytes):
+        if len(value) > 0xffff:
+            raise EncodingException(len(value), "Field is too long to be encoded in binary")
+        self.write_format(UINT16, len(value))
+        self.buffer += value
+
+    def write_string(self, value: str):
+        if not isinstance(value, str):
+            raise EncodingException(value, "Expected a string")
+        hex_bytes = _get_hex_bytes(value)
+        if hex_bytes is not None and len(hex_bytes) == 32:
+            self.write_format(UINT8, HASH_32)
+            self.buffer += hex_bytes
+        elif hex_bytes is not None:
+            self.write_format(UINT8, HEX_STRING)
+            self.write_bytes(hex_bytes)
+        else:
+            self.write_format(UINT8, UTF8_STRING)
+            self.write_bytes(value.encode("utf-8"))
+
+    def write_script(self, script: str):
+        if not isinstance(script, str):
+            raise EncodingException(script, "Expected a script")
+        elements = script.split(" ")
+        self.write_format(UINT16, len(elements))
+        for element in elements:
+            opcode = OPCODE_VALUES.get(element)
+            if opcode is not None:
+                self.write_format(UINT8, opcode)
+                continue
+            hex_bytes = _get_hex_bytes(element)
+            if hex_bytes is not None:
+                self.write_format(UINT8, PUSH_HEX)
+                self.write_bytes(hex_bytes)
+            else:
+                self.write_format(UINT8, PUSH_STRING)
+                self.write_bytes(element.encode("utf-8"))
+
+    def write_amount(self, amount):
+        if type(amount) is float:
+            self.write_format(UINT8, FLOAT_AMOUNT)
+            self.write_format(FLOAT64, amount)
+        else:
+            _check_integer(amount, 2 ** 63 - 1, -2 ** 63)
+            self.write_format(UINT8, INTEGER_AMOUNT)
+            self.write_format(INT64, amount)
+
+    def write_transaction(self, transaction: dict):
+        _check_keys(transaction, TRANSACTION_KEYS, (TRANSACTION_KEYS[:2], COINBASE_TRANSACTION_KEYS))
+        has_transaction_hash = "transaction_hash" in transaction
+        has_height = "height" in transaction
+        transaction_flags = (HAS_TRANSACTION_HASH if has_transaction_hash else 0) | (HAS_HEIGHT if has_height else 0)
+        self.write_format(UINT8, transaction_flags)
+        self.write_format(UINT32, len(transaction["inputs"]))
+        for transaction_input in transaction["inputs"]:
+            _check_keys(transaction_input, INPUT_KEYS, (INPUT_KEYS[:2],))
+            has_unlocking_script = "unlocking_script" in transaction_input
+            self.write_format(UINT8, HAS_UNLOCKING_SCRIPT if has_unlocking_script else 0)
+            self.write_string(transaction_input["transaction_hash"])
+            _check_integer(transaction_input["output_index"], 0xffffffff)
+            self.write_format(UINT32, transaction_input["output_index"])
+            if has_unlocking_script:
+                self.write_script(transaction_input["unlocking_script"])
+        self.write_format(UINT32, len(transaction["outputs"]))
+        for transaction_output in transaction["outputs"]:
+            _check_keys(transaction_output, OUTPUT_KEYS)
+            self.write_amount(transaction_output["amount"])
+            self.write_script(transaction_output["locking_script"])
+        if has_transaction_hash:
+            self.write_string(transaction["transaction_hash"])
+        if has_height:
+            _check_integer(transaction["height"], 0xffffffff)
+            self.write_format(UINT32, transaction["height"])
+
+    def write_header(self, header: dict):
+        _check_keys(header, HEADER_KEYS)
+        self.write_string(header["previous_block_hash"])
+        self.write_string(header["merkle_root"])
+        if type(header["timestamp"]) is not float:
+            raise EncodingException(header["timestamp"], "Timestamp cannot be encoded in binary")
+        _check_integer(header["nonce"], 2 ** 64 - 1)
+        self.write_format(HEADER_NUMBERS, header["timestamp"], header["nonce"])
+
+    def write_block(self, block: dict):
+        _check_keys(block, BLOCK_KEYS)
+        self.write_header(block["header"])
+        self.write_format(UINT32, len(block["transactions"]))
+        for transaction in block["transactions"]:
+            self.write_transaction(transaction)
+
+
+class BinaryReader:
+    def __init__(self, data: bytes):
+        self.data = bytes(data)
+        self.offset = 0
+
+    def read_format(self, structure: struct.Struct) -> tuple:
+        values = structure.unpack_from(self.data, self.offset)
+        self.offset = self.offset + structure.size
+        return values
+
+    def read_uint8(self) -> int:
+        value = self.data[self.offset]
+        self.offset = self.offset + 1
+        return value
+
+    def read_raw(self, length: int) -> bytes:
+        end = self.offset + length
+        if end > len(self.data):
+            raise EncodingException(self.offset, "Binary payload is truncated")
+        value = self.data[self.offset:end]
+        self.offset = end
+        return value
+
+    def read_bytes(self) -> bytes:
+        length, = self.read_format(UINT16)
+        return self.read_raw(length)
+
+    def read_string(self) -> str:
+        tag = self.read_uint8()
+        if tag == HASH_32:
+            return self.read_raw(32).hex()
+        if tag == HEX_STRING:
+            return self.read_bytes().hex()
+        if tag == UTF8_STRING:
+            return self.read_bytes().decode("utf-8")
+        raise EncodingException(tag, "Unknown string tag")
+
+    def read_script(self) -> str:
+        data = self.data
+        offset = self.offset
+        number_of_elements = data[offset] << 8 | data[offset + 1]
+        offset = offset + 2
+        elements = []
+        for _ in range(number_of_elements):
+            tag = data[offset]
+            offset = offset + 1
+            if tag < len(OPCODES):
+                elements.append(OPCODES[tag])
+                continue
+            end = offset + 2 + (data[offset] << 8 | data[offset + 1])
+            if end > len(data):
+                raise EncodingException(offset, "Binary payload is truncated")
+            if tag == PUSH_HEX:
+                elements.append(data[offset + 2:end].hex())
+            elif tag == PUSH_STRING:
+                elements.append(data[offset + 2:end].decode("utf-8"))
+            else:
+                raise EncodingException(tag, "Unknown script element tag")
+            offset = end
+        self.offset = offset
+        return " ".join(elements)
+
+    def read_amount(self):
+        tag = self.read_uint8()
+        if tag == FLOAT_AMOUNT:
+            return self.read_format(FLOAT64)[0]
+        if tag == INTEGER_AMOUNT:
+            return self.read_format(INT64)[0]
+        raise EncodingException(tag, "Unknown amount tag")
+
+    def read_transaction(self) -> dict:
+        transaction_flags = self.read_uint8()
+        number_of_inputs, = self.read_format(UINT32)
+        inputs = []
+        for _ in range(number_of_inputs):
+            input_flags = self.read_uint8()
+            transaction_input = {"transaction_hash": self.read_string(), "output_index": self.read_format(UINT32)[0]}
+            if input_flags & HAS_UNLOCKING_SCRIPT:
+                transaction_input["unlocking_script"] = self.read_script()
+            inputs.append(transaction_input)
+        number_of_outputs, = self.read_format(UINT32)
+        outputs = [{"amount": self.read_amount(), "locking_script": self.read_script()}
+                   for _ in range(number_of_outputs)]
+        transaction = {"inputs": inputs, "outputs": outputs}
+        if transaction_flags & HAS_TRANSACTION_HASH:
+            transaction["transaction_hash"] = self.read_string()
+        if transaction_flags & HAS_HEIGHT:
+            transaction["height"] = self.read_format(UINT32)[0]
+        return transaction
+
+    def read_header(self) -> dict:
+        previous_block_hash = self.read_string()
+        merkle_root = self.read_string()
+        timestamp, nonce = self.read_format(HEADER_NUMBERS)
+        return {"previous_block_hash": previous_block_hash, "merkle_root": merkle_root,
+                "timestamp": timestamp, "nonce": nonce}
+
+    def read_block(self) -> dict:
+        header = self.read_header()
+        number_of_transactions, = self.read_format(UINT32)
+        return {"header": header,
+                "transactions": [self.read_transaction() for _ in range(number_of_transactions)]}
+
+
+def _encode(write, data) -> bytes:
+    writer = BinaryWriter()
+    writer.write_format(UINT8, FORMAT_VERSION)
+    try:
+        write(writer, data)
+    except (struct.error, KeyError, TypeError) as encoding_error:
+        raise EncodingException(data, f"Data cannot be encoded in binary: {encoding_error}")
+    return bytes(writer.buffer)
+
+
+def _decode(read, data: bytes):
+    reader = BinaryReader(data)
+    try:
+        version = reader.read_uint8()
+        if version != FORMAT_VERSION:
+            raise EncodingException(version, "Unsupported binary format version")
+        decoded_data = read(reader)
+    except (struct.error, IndexError, UnicodeDecodeError) as decoding_error:
+        raise EncodingException(reader.offset, f"Binary payload is malformed: {decoding_error}")
+    if reader.offset != len(reader.data):
+        raise EncodingException(reader.offset, "Binary payload has trailing bytes")
+    return decoded_data
+
+
+def _write_list(writer: BinaryWriter, items: list, write):
+    writer.write_format(UINT32, len(items))
+    for item in items:
+        write(writer, item)
+
+
+def _read_list(reader: BinaryReader, read) -> list:
+    number_of_items, = reader.read_format(UINT32)
+    return [read(reader) for _ in range(number_of_items)]
+
+
+def encode_transaction(transaction: dict) -> bytes:
+    return _encode(BinaryWriter.write_transaction, transaction)
+
+
+def decode_transaction(data: bytes) -> dict:
+    return _decode(BinaryReader.read_transaction, data)
+
+
+def encode_block(block: dict) -> bytes:
+    return _encode(BinaryWriter.write_block, block)
+
+
+def decode_block(data: bytes) -> dict:
+    return _decode(BinaryReader.read_block, data)
+
+
+def encode_blocks(blocks: list) -> bytes:
+    return _encode(lambda writer, items: _write_list(writer, items, BinaryWriter.write_block), blocks)
+
+
+def decode_blocks(data: bytes) -> list:
+    return _decode(lambda reader: _read_list(reader, BinaryReader.read_block), data)
+
+
+def encode_inventory_data(inventory_data: dict) -> bytes:
+    def write_inventory_data(writer: BinaryWriter, items: dict):
+        _write_list(writer, items["blocks"], BinaryWriter.write_block)
+        _write_list(writer, items["transactions"], BinaryWriter.write_transaction)
+    return _encode(write_inventory_data, inventory_data)
+
+
+def decode_inventory_data(data: bytes) -> dict:
+    def read_inventory_data(reader: BinaryReader) -> dict:
+        return {"blocks": _read_list(reader, BinaryReader.read_block),
+                "transactions": _read_list(reader, BinaryReader.read_transaction)}
+    return _decode(read_inventory_data, data)
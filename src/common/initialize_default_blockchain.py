@@ -5,19 +5,20 @@ from blockchain_users.bertrand import private_key as bertrand_private_key
 from blockchain_users.camille import private_key as camille_private_key
 from common.block import Block, BlockHeader
 from common.io_blockchain import store_blockchain_in_memory
+from common.io_utxo_set import store_utxo_set_in_memory
 from common.merkle_tree import get_merkle_root
+from common.owner import Owner
 from common.transaction import Transaction
 from common.transaction_input import TransactionInput
 from common.transaction_output import TransactionOutput
-from wallet.wallet import Owner
+from common.utxo_set import UTXOSet
 
 albert_wallet = Owner(private_key=albert_private_key)
 bertrand_wallet = Owner(private_key=bertrand_private_key)
 camille_wallet = Owner(private_key=camille_private_key)
 
 
-def initialize_default_blockchain():
-    print("Initializing default blockchain")
+def get_default_blockchain() -> Block:
     timestamp_0 = datetime.timestamp(
         datetime.fromisoformat('2011-11-04 00:05:23.111'))
     input_0 = TransactionInput(transaction_hash="abcd1234",
@@ -93,4 +94,20 @@ def initialize_default_blockchain():
         block_header=block_header_3,
         previous_block=block_2,
     )
-    store_blockchain_in_memory(block_3)
+    return block_3
+
+
+def get_default_block_hashes() -> list:
+    block_hashes = []
+    block = get_default_blockchain()
+    while block is not None:
+        block_hashes.insert(0, block.block_header.hash)
+        block = block.previous_block
+    return block_hashes
+
+
+def initialize_default_blockchain():
+    print("Initializing default blockchain")
+    blockchain = get_default_blockchain()
+    store_blockchain_in_memory(blockchain)
+    store_utxo_set_in_memory(UTXOSet.from_blockchain(blockchain))
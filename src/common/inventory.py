@@ -0,0 +1,38 @@
+import threading
+from collections import OrderedDict
+
+INVENTORY_TRANSACTION = "transaction"
+INVENTORY_BLOCK = "block"
+RECENTLY_SEEN_MAX_SIZE = 100000
+
+
+class RecentlySeenFilter:
+    def __init__(self, max_size: int = RECENTLY_SEEN_MAX_SIZE):
+        self.max_size = max_size
+        self.hashes = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __contains__(self, inventory_hash: str) -> bool:
+        with self.lock:
+            return inventory_hash in self.hashes
+
+    def add(self, inventory_hash: str) -> bool:
+        with self.lock:
+            if inventory_hash in self.hashes:
+                self.hashes.move_to_end(inventory_hash)
+                return False
+            self.hashes[inventory_hash] = None
+            if len(self.hashes) > self.max_size:
+                self.hashes.popitem(last=False)
+            return True
+
+    def discard(self, inventory_hash: str):
+        with self.lock:
+            self.hashes.pop(inventory_hash, None)
+
+
+def get_inventory_item(inventory_type: str, inventory_hash: str) -> dict:
+    return {"type": inventory_type, "hash": inventory_hash}
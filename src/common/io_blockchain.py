@@ -1,29 +1,165 @@
 import json
+import os
+import struct
 
 from common.block import Block, BlockHeader
+from common.chain import Chain
+from common.encoding import FORMAT_VERSION, EncodingException, decode_block, encode_block
 
 FILENAME = "src/doc/blockchain"
+INDEX_FILENAME = "src/doc/blockchain.index"
 
+RECORD_LENGTH_FORMAT = ">I"
+RECORD_LENGTH_SIZE = struct.calcsize(RECORD_LENGTH_FORMAT)
+INDEX_ENTRY_FORMAT = ">QI32s"
+INDEX_ENTRY_SIZE = struct.calcsize(INDEX_ENTRY_FORMAT)
 
-def get_blockchain_from_memory():
-    with open(FILENAME, "r") as file_obj:
-        blocks_text = file_obj.read()
-        block_list = json.loads(blocks_text)
-        previous_block = None
-        for block_dict in reversed(block_list):
-            block_header_str = block_dict.pop("header")
-            block_header = BlockHeader(**block_header_str)
-            block_object = Block(**block_dict, block_header=block_header)
-            block_object.previous_block = previous_block
-            previous_block = block_object
-    return block_object
 
+def _encode_block(block: Block) -> bytes:
+    block_data = {
+        "header": block.block_header.to_dict,
+        "transactions": block.transactions
+    }
+    try:
+        return encode_block(block_data)
+    except EncodingException:
+        return json.dumps(block_data).encode("utf-8")
 
-def store_blockchain_in_memory(blockchain: Block):
-    store_blockchain_dict_in_memory(blockchain.to_dict)
+
+def _decode_block_data(block_bytes: bytes) -> dict:
+    if block_bytes[0] == FORMAT_VERSION:
+        return decode_block(block_bytes)
+    return json.loads(block_bytes)
+
+
+def _decode_block(block_bytes: bytes) -> Block:
+    block_dict = _decode_block_data(block_bytes)
+    block_header = BlockHeader(**block_dict.pop("header"))
+    return Block(**block_dict, block_header=block_header)
+
+
+def _read_index() -> list:
+    try:
+        with open(INDEX_FILENAME, "rb") as file_obj:
+            index_bytes = file_obj.read()
+    except FileNotFoundError:
+        return []
+    number_of_entries = len(index_bytes) // INDEX_ENTRY_SIZE
+    return [struct.unpack_from(INDEX_ENTRY_FORMAT, index_bytes, i * INDEX_ENTRY_SIZE)
+            for i in range(number_of_entries)]
+
+
+def _read_index_entry(height: int) -> tuple:
+    if height < 0:
+        raise IndexError(f"No block at height {height}")
+    with open(INDEX_FILENAME, "rb") as file_obj:
+        file_obj.seek(height * INDEX_ENTRY_SIZE)
+        entry_bytes = file_obj.read(INDEX_ENTRY_SIZE)
+    if len(entry_bytes) < INDEX_ENTRY_SIZE:
+        raise IndexError(f"No block at height {height}")
+    return struct.unpack(INDEX_ENTRY_FORMAT, entry_bytes)
+
+
+def _read_record(file_obj, offset: int, length: int) -> bytes:
+    file_obj.seek(offset + RECORD_LENGTH_SIZE)
+    return file_obj.read(length)
+
+
+def _write_blocks(blocks: list):
+    temporary_filename = f"{FILENAME}.tmp"
+    temporary_index_filename = f"{INDEX_FILENAME}.tmp"
+    with open(temporary_filename, "wb") as file_obj, open(temporary_index_filename, "wb") as index_obj:
+        offset = 0
+        for block in blocks:
+            block_bytes = _encode_block(block)
+            file_obj.write(struct.pack(RECORD_LENGTH_FORMAT, len(block_bytes)))
+            file_obj.write(block_bytes)
+            index_obj.write(struct.pack(INDEX_ENTRY_FORMAT, offset, len(block_bytes),
+                                        bytes.fromhex(block.block_header.hash)))
+            offset = offset + RECORD_LENGTH_SIZE + len(block_bytes)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+        index_obj.flush()
+        os.fsync(index_obj.fileno())
+    os.replace(temporary_filename, FILENAME)
+    os.replace(temporary_index_filename, INDEX_FILENAME)
+
+
+def get_blockchain_height() -> int:
+    try:
+        return os.path.getsize(INDEX_FILENAME) // INDEX_ENTRY_SIZE
+    except FileNotFoundError:
+        return 0
+
+
+def get_block_hashes_from_memory() -> list:
+    return [block_hash.hex() for _, _, block_hash in _read_index()]
 
 
-def store_blockchain_dict_in_memory(blockchain_list: list):
-    text = json.dumps(blockchain_list).encode("utf-8")
-    with open(FILENAME, "wb") as file_obj:
-        file_obj.write(text)
+def get_block_from_memory(height: int) -> Block:
+    offset, length, _ = _read_index_entry(height)
+    with open(FILENAME, "rb") as file_obj:
+        block = _decode_block(_read_record(file_obj, offset, length))
+    block.height = height
+    return block
+
+
+def get_tip_hash_from_memory() -> str:
+    height = get_blockchain_height()
+    if not height:
+        return None
+    _, _, block_hash = _read_index_entry(height - 1)
+    return block_hash.hex()
+
+
+def get_tip_from_memory() -> Block:
+    return get_block_from_memory(get_blockchain_height() - 1)
+
+
+def get_chain_from_memory() -> Chain:
+    chain = Chain()
+    with open(FILENAME, "rb") as file_obj:
+        for offset, length, _ in _read_index():
+            chain.append(_decode_block(_read_record(file_obj, offset, length)))
+    return chain
+
+
+def get_blockchain_from_memory() -> Block:
+    return get_chain_from_memory().tip
+
+
+def append_block_to_memory(block: Block):
+    height = get_blockchain_height()
+    if height:
+        last_offset, last_length, _ = _read_index_entry(height - 1)
+        offset = last_offset + RECORD_LENGTH_SIZE + last_length
+    else:
+        offset = 0
+    block_bytes = _encode_block(block)
+    mode = "r+b" if os.path.exists(FILENAME) else "wb"
+    with open(FILENAME, mode) as file_obj:
+        file_obj.seek(offset)
+        file_obj.write(struct.pack(RECORD_LENGTH_FORMAT, len(block_bytes)))
+        file_obj.write(block_bytes)
+        file_obj.truncate()
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+    mode = "r+b" if os.path.exists(INDEX_FILENAME) else "wb"
+    with open(INDEX_FILENAME, mode) as index_obj:
+        index_obj.seek(height * INDEX_ENTRY_SIZE)
+        index_obj.write(struct.pack(INDEX_ENTRY_FORMAT, offset, len(block_bytes),
+                                    bytes.fromhex(block.block_header.hash)))
+        index_obj.truncate()
+        index_obj.flush()
+        os.fsync(index_obj.fileno())
+
+
+def truncate_blockchain_in_memory(height: int):
+    with open(INDEX_FILENAME, "r+b") as index_obj:
+        index_obj.truncate(height * INDEX_ENTRY_SIZE)
+        index_obj.flush()
+        os.fsync(index_obj.fileno())
+
+
+def store_blockchain_in_memory(blockchain: Block):
+    _write_blocks(list(Chain.from_tip(blockchain)))
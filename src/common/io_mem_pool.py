@@ -1,17 +1,73 @@
 import json
+import os
 
+from common.utils import calculate_transaction_hash
 
 FILENAME = "src/doc/mem_pool"
 
 
-def get_transactions_from_memory():
-    with open(FILENAME, "rb") as file_obj:
-        current_mem_pool_str = file_obj.read()
-        current_mem_pool_list = json.loads(current_mem_pool_str)
-    return current_mem_pool_list
+def _apply_record(entries: dict, record):
+    if isinstance(record, list):
+        for transaction in record:
+            entries[calculate_transaction_hash(transaction)] = {"transaction": transaction, "fee": 0}
+    elif "add" in record:
+        entries[calculate_transaction_hash(record["add"])] = {"transaction": record["add"], "fee": record.get("fee", 0)}
+    else:
+        for transaction_hash in record["remove"]:
+            entries.pop(transaction_hash, None)
+
+
+def get_mem_pool_entries_from_memory() -> list:
+    entries = {}
+    position = 0
+    valid_length = 0
+    try:
+        with open(FILENAME, "rb") as file_obj:
+            for line in file_obj:
+                position = position + len(line)
+                if not line.strip():
+                    continue
+                try:
+                    _apply_record(entries, json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    print("Skipping corrupted mem_pool record")
+                    continue
+                if line.endswith(b"\n"):
+                    valid_length = position
+    except FileNotFoundError:
+        return []
+    if valid_length < position:
+        with open(FILENAME, "r+b") as file_obj:
+            file_obj.truncate(valid_length)
+    return list(entries.values())
+
+
+def get_transactions_from_memory() -> list:
+    return [entry["transaction"] for entry in get_mem_pool_entries_from_memory()]
+
+
+def store_mem_pool_entries_in_memory(entries: list):
+    temporary_filename = f"{FILENAME}.tmp"
+    with open(temporary_filename, "wb") as file_obj:
+        for entry in entries:
+            record = {"add": entry["transaction"], "fee": entry["fee"]}
+            file_obj.write(json.dumps(record).encode("utf-8") + b"\n")
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+    os.replace(temporary_filename, FILENAME)
 
 
 def store_transactions_in_memory(transactions: list):
-    text = json.dumps(transactions).encode("utf-8")
-    with open(FILENAME, "wb") as file_obj:
-        file_obj.write(text)
+    store_mem_pool_entries_in_memory([{"transaction": transaction, "fee": 0} for transaction in transactions])
+
+
+def append_transaction_to_memory(transaction: dict, fee: float):
+    record = {"add": transaction, "fee": fee}
+    with open(FILENAME, "ab") as file_obj:
+        file_obj.write(json.dumps(record).encode("utf-8") + b"\n")
+
+
+def append_removals_to_memory(transaction_hashes: list):
+    record = {"remove": transaction_hashes}
+    with open(FILENAME, "ab") as file_obj:
+        file_obj.write(json.dumps(record).encode("utf-8") + b"\n")
@@ -0,0 +1,67 @@
+import json
+import os
+
+from common.chain import Chain
+from common.io_blockchain import get_chain_from_memory, get_tip_hash_from_memory
+from common.utxo_set import UTXOSet, UTXOSetException
+
+FILENAME = "src/doc/utxo_set"
+LOG_FILENAME = "src/doc/utxo_set.log"
+UTXO_SNAPSHOT_INTERVAL = 100
+
+
+def _apply_log_records(utxo_set: UTXOSet):
+    try:
+        with open(LOG_FILENAME, "rb") as file_obj:
+            for line in file_obj:
+                utxo_set.apply_changes(json.loads(line))
+                utxo_set.log_records = utxo_set.log_records + 1
+    except FileNotFoundError:
+        pass
+    except (ValueError, KeyError, TypeError, UTXOSetException):
+        print("UTXO set log could not be replayed past this record")
+
+
+def get_utxo_set_from_memory(chain: Chain = None) -> UTXOSet:
+    tip_hash = chain.tip.block_header.hash if chain else get_tip_hash_from_memory()
+    try:
+        with open(FILENAME, "rb") as file_obj:
+            utxo_data = json.loads(file_obj.read())
+        utxo_set = UTXOSet.from_list(utxo_data["utxos"], utxo_data["tip_hash"])
+        _apply_log_records(utxo_set)
+        if utxo_set.tip_hash == tip_hash:
+            return utxo_set
+        print("UTXO set does not match the chain tip, rebuilding it")
+    except FileNotFoundError:
+        pass
+    except (ValueError, KeyError, TypeError):
+        print("UTXO set could not be read, rebuilding it")
+    utxo_set = UTXOSet.from_chain(chain if chain else get_chain_from_memory())
+    store_utxo_set_in_memory(utxo_set)
+    return utxo_set
+
+
+def store_utxo_set_in_memory(utxo_set: UTXOSet):
+    text = json.dumps({"tip_hash": utxo_set.tip_hash, "utxos": utxo_set.to_list}).encode("utf-8")
+    temporary_filename = f"{FILENAME}.tmp"
+    with open(temporary_filename, "wb") as file_obj:
+        file_obj.write(text)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+    with open(LOG_FILENAME, "wb"):
+        pass
+    os.replace(temporary_filename, FILENAME)
+    utxo_set.mark_stored()
+    utxo_set.log_records = 0
+
+
+def store_utxo_set_changes_in_memory(utxo_set: UTXOSet):
+    if utxo_set.log_records >= UTXO_SNAPSHOT_INTERVAL:
+        store_utxo_set_in_memory(utxo_set)
+        return
+    text = json.dumps(utxo_set.pop_changes()).encode("utf-8") + b"\n"
+    with open(LOG_FILENAME, "ab") as file_obj:
+        file_obj.write(text)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+    utxo_set.log_records = utxo_set.log_records + 1
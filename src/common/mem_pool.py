@@ -0,0 +1,251 @@
+import heapq
+import json
+import threading
+
+from common.io_mem_pool import append_removals_to_memory, append_transaction_to_memory, \
+    get_mem_pool_entries_from_memory, store_mem_pool_entries_in_memory
+from common.merkle_tree import get_leaf_hash
+from common.utils import calculate_transaction_hash
+
+LOG_COMPACTION_THRESHOLD = 1000
+
+
+class MemPoolException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+class MemPool:
+    def __init__(self, persistent: bool = False):
+        self.persistent = persistent
+        self.transactions = {}
+        self.fees = {}
+        self.sizes = {}
+        self.leaf_hashes = {}
+        self.parents = {}
+        self.children = {}
+        self.ancestors = {}
+        self.package_fees = {}
+        self.package_sizes = {}
+        self.spent_outpoints = {}
+        self.heap = []
+        self.package_heap = []
+        self.heap_sequences = {}
+        self.sequence = 0
+        self.log_records = 0
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def __contains__(self, transaction_hash: str) -> bool:
+        return transaction_hash in self.transactions
+
+    @staticmethod
+    def get_outpoints(transaction: dict) -> list:
+        return [(tx_input.get("transaction_hash"), tx_input.get("output_index"))
+                for tx_input in transaction["inputs"]]
+
+    def get(self, transaction_hash: str) -> dict:
+        return self.transactions.get(transaction_hash)
+
+    def get_output(self, transaction_hash: str, output_index: int) -> dict:
+        transaction = self.transactions.get(transaction_hash)
+        if transaction is None or output_index >= len(transaction["outputs"]):
+            return None
+        return transaction["outputs"][output_index]
+
+    def get_fee_rate(self, transaction_hash: str) -> float:
+        return self.fees[transaction_hash] / self.sizes[transaction_hash]
+
+    def get_spending_transaction_hash(self, transaction_hash: str, output_index: int) -> str:
+        return self.spent_outpoints.get((transaction_hash, output_index))
+
+    def get_descendants(self, transaction_hash: str) -> set:
+        descendants = set()
+        stack = list(self.children.get(transaction_hash, ()))
+        while stack:
+            descendant = stack.pop()
+            if descendant not in descendants:
+                descendants.add(descendant)
+                stack.extend(self.children[descendant])
+        return descendants
+
+    def _push_package(self, transaction_hash: str):
+        heapq.heappush(self.package_heap, (-self.package_fees[transaction_hash] / self.package_sizes[transaction_hash],
+                                           self.package_sizes[transaction_hash], transaction_hash))
+
+    def _add_ancestors(self, transaction_hash: str, new_ancestors: frozenset):
+        for descendant in [transaction_hash] + list(self.get_descendants(transaction_hash)):
+            missing_ancestors = new_ancestors - self.ancestors[descendant]
+            self.ancestors[descendant] = self.ancestors[descendant] | missing_ancestors
+            self.package_fees[descendant] = self.package_fees[descendant] + sum(
+                self.fees[ancestor] for ancestor in missing_ancestors)
+            self.package_sizes[descendant] = self.package_sizes[descendant] + sum(
+                self.sizes[ancestor] for ancestor in missing_ancestors)
+            self._push_package(descendant)
+
+    def _link(self, transaction_hash: str, outpoints: list, number_of_outputs: int):
+        parents = frozenset(outpoint[0] for outpoint in outpoints if outpoint[0] in self.transactions)
+        children = frozenset(self.spent_outpoints[(transaction_hash, output_index)]
+                             for output_index in range(number_of_outputs)
+                             if (transaction_hash, output_index) in self.spent_outpoints)
+        self.parents[transaction_hash] = parents
+        self.children[transaction_hash] = children
+        self.ancestors[transaction_hash] = frozenset()
+        self.package_fees[transaction_hash] = self.fees[transaction_hash]
+        self.package_sizes[transaction_hash] = self.sizes[transaction_hash]
+        for parent in parents:
+            self.children[parent] = self.children[parent] | {transaction_hash}
+        self._add_ancestors(transaction_hash, parents.union(*(self.ancestors[parent] for parent in parents)))
+        for child in children:
+            self.parents[child] = self.parents[child] | {transaction_hash}
+            self._add_ancestors(child, self.ancestors[transaction_hash] | {transaction_hash})
+
+    def _unlink(self, transaction_hash: str):
+        for descendant in self.get_descendants(transaction_hash):
+            self.ancestors[descendant] = self.ancestors[descendant] - {transaction_hash}
+            self.package_fees[descendant] = self.package_fees[descendant] - self.fees[transaction_hash]
+            self.package_sizes[descendant] = self.package_sizes[descendant] - self.sizes[transaction_hash]
+            self._push_package(descendant)
+        for parent in self.parents.pop(transaction_hash):
+            self.children[parent] = self.children[parent] - {transaction_hash}
+        for child in self.children.pop(transaction_hash):
+            self.parents[child] = self.parents[child] - {transaction_hash}
+        self.ancestors.pop(transaction_hash)
+        self.package_fees.pop(transaction_hash)
+        self.package_sizes.pop(transaction_hash)
+
+    def is_package_entry_current(self, entry: tuple) -> bool:
+        return self.package_sizes.get(entry[2]) == entry[1]
+
+    def _compact_package_heap(self):
+        if len(self.package_heap) > 2 * len(self.transactions) + LOG_COMPACTION_THRESHOLD:
+            current_entries = {entry[2]: entry for entry in self.package_heap if self.is_package_entry_current(entry)}
+            self.package_heap = list(current_entries.values())
+            heapq.heapify(self.package_heap)
+
+    def add(self, transaction: dict, fee: float = 0) -> bool:
+        transaction_hash = calculate_transaction_hash(transaction)
+        with self.lock:
+            if transaction_hash in self.transactions:
+                return False
+            outpoints = self.get_outpoints(transaction)
+            for outpoint in outpoints:
+                if outpoint in self.spent_outpoints:
+                    raise MemPoolException(
+                        f"{outpoint[0]}:{outpoint[1]}", "Output is already spent by a transaction in the mem_pool")
+            self.transactions[transaction_hash] = transaction
+            self.fees[transaction_hash] = fee
+            self.sizes[transaction_hash] = len(json.dumps(transaction))
+            self.leaf_hashes[transaction_hash] = get_leaf_hash(transaction)
+            self._link(transaction_hash, outpoints, len(transaction["outputs"]))
+            for outpoint in outpoints:
+                self.spent_outpoints[outpoint] = transaction_hash
+            self.sequence = self.sequence + 1
+            self.heap_sequences[transaction_hash] = self.sequence
+            heapq.heappush(self.heap, (-self.get_fee_rate(transaction_hash), self.sequence, transaction_hash))
+            self._compact_package_heap()
+            if self.persistent:
+                append_transaction_to_memory(transaction, fee)
+                self.log_records = self.log_records + 1
+        return True
+
+    def remove(self, transaction_hashes: list):
+        with self.lock:
+            removed_hashes = []
+            for transaction_hash in transaction_hashes:
+                if transaction_hash not in self.transactions:
+                    continue
+                self._unlink(transaction_hash)
+                transaction = self.transactions.pop(transaction_hash)
+                self.fees.pop(transaction_hash)
+                self.sizes.pop(transaction_hash)
+                self.leaf_hashes.pop(transaction_hash)
+                self.heap_sequences.pop(transaction_hash)
+                for outpoint in self.get_outpoints(transaction):
+                    self.spent_outpoints.pop(outpoint, None)
+                removed_hashes.append(transaction_hash)
+            if len(self.heap) > 2 * len(self.transactions) + LOG_COMPACTION_THRESHOLD:
+                self.heap = [entry for entry in self.heap if self.heap_sequences.get(entry[2]) == entry[1]]
+                heapq.heapify(self.heap)
+            self._compact_package_heap()
+            if self.persistent and removed_hashes:
+                self.log_records = self.log_records + 1
+                if self.log_records > 2 * len(self.transactions) + LOG_COMPACTION_THRESHOLD:
+                    self.compact()
+                else:
+                    append_removals_to_memory(removed_hashes)
+        return removed_hashes
+
+    def remove_confirmed_transactions(self, transactions: list) -> list:
+        with self.lock:
+            transaction_hashes = []
+            conflicting_hashes = []
+            for transaction in transactions:
+                transaction_hash = calculate_transaction_hash(transaction)
+                transaction_hashes.append(transaction_hash)
+                for outpoint in self.get_outpoints(transaction):
+                    spending_transaction_hash = self.spent_outpoints.get(outpoint)
+                    if spending_transaction_hash and spending_transaction_hash != transaction_hash:
+                        conflicting_hashes.append(spending_transaction_hash)
+            for conflicting_hash in conflicting_hashes:
+                transaction_hashes.append(conflicting_hash)
+                transaction_hashes.extend(self.get_descendants(conflicting_hash))
+            return self.remove(transaction_hashes)
+
+    def remove_orphaned_transactions(self, disconnected_transactions: list, utxo_set) -> list:
+        with self.lock:
+            transaction_hashes = []
+            for transaction in disconnected_transactions:
+                transaction_hash = calculate_transaction_hash(transaction)
+                if transaction_hash in self.transactions:
+                    continue
+                for output_index in range(len(transaction["outputs"])):
+                    spending_transaction_hash = self.spent_outpoints.get((transaction_hash, output_index))
+                    if spending_transaction_hash and (transaction_hash, output_index) not in utxo_set:
+                        transaction_hashes.append(spending_transaction_hash)
+                        transaction_hashes.extend(self.get_descendants(spending_transaction_hash))
+            return self.remove(transaction_hashes)
+
+    def iterate_by_fee_rate(self):
+        if not self.heap:
+            return
+        frontier = [(self.heap[0], 0)]
+        while frontier:
+            entry, position = heapq.heappop(frontier)
+            _, sequence, transaction_hash = entry
+            if self.heap_sequences.get(transaction_hash) == sequence:
+                yield transaction_hash
+            for child_position in (2 * position + 1, 2 * position + 2):
+                if child_position < len(self.heap):
+                    heapq.heappush(frontier, (self.heap[child_position], child_position))
+
+    def get_transactions_by_fee_rate(self, max_number_of_transactions: int = None) -> list:
+        transactions = []
+        with self.lock:
+            for transaction_hash in self.iterate_by_fee_rate():
+                if max_number_of_transactions is not None and len(transactions) >= max_number_of_transactions:
+                    break
+                transactions.append(self.transactions[transaction_hash])
+        return transactions
+
+    def compact(self):
+        with self.lock:
+            entries = [{"transaction": self.transactions[transaction_hash], "fee": self.fees[transaction_hash]}
+                       for transaction_hash in self.transactions]
+            store_mem_pool_entries_in_memory(entries)
+            self.log_records = len(entries)
+
+    @classmethod
+    def from_memory(cls):
+        mem_pool = cls()
+        for entry in get_mem_pool_entries_from_memory():
+            try:
+                mem_pool.add(entry["transaction"], entry["fee"])
+            except MemPoolException:
+                continue
+        mem_pool.persistent = True
+        mem_pool.log_records = len(mem_pool)
+        return mem_pool
@@ -1,65 +1,94 @@
+import binascii
+import hashlib
 import json
-import math
-
-from common.utils import calculate_hash
-
-
-class Node:
-    def __init__(self, value: str, left_child=None, right_child=None):
-        self.value = value
-        self.left_child = left_child
-        self.right_child = right_child
-
-
-def compute_tree_depth(number_of_leaves: int) -> int:
-    return math.ceil(math.log2(number_of_leaves))
-
-
-def is_power_of_2(number_of_leaves: int) -> bool:
-    return math.log2(number_of_leaves).is_integer()
-
-
-def fill_set(list_of_nodes: list):
-    current_number_of_leaves = len(list_of_nodes)
-    if is_power_of_2(current_number_of_leaves):
-        return list_of_nodes
-    total_number_of_leaves = 2**compute_tree_depth(current_number_of_leaves)
-    if current_number_of_leaves % 2 == 0:
-        for i in range(current_number_of_leaves, total_number_of_leaves, 2):
-            list_of_nodes = list_of_nodes + \
-                [list_of_nodes[-2], list_of_nodes[-1]]
-    else:
-        for i in range(current_number_of_leaves, total_number_of_leaves):
-            list_of_nodes.append(list_of_nodes[-1])
-    return list_of_nodes
-
-
-def build_merkle_tree(node_data: list(str)) -> Node:
-    complete_set = fill_set(node_data)
-    old_set_of_nodes = [Node(calculate_hash(str(data)))
-                        for data in complete_set]
-    tree_depth = compute_tree_depth(len(old_set_of_nodes))
-    if tree_depth == 0:
-        return Node(value=calculate_hash(str(node_data[0])))
-    for i in range(0, tree_depth):
-        num_nodes = 2**(tree_depth-i)
-        new_set_of_nodes = []
-        for j in range(0, num_nodes, 2):
-            child_node_0 = old_set_of_nodes[j]
-            child_node_1 = old_set_of_nodes[j+1]
-            new_node = Node(
-                value=calculate_hash(
-                    f"{child_node_0.value}{child_node_1.value}"),
-                left_child=child_node_0,
-                right_child=child_node_1
-            )
-            new_set_of_nodes.append(new_node)
-        old_set_of_nodes = new_set_of_nodes
-    return new_set_of_nodes[0]
+
+
+def get_leaf_hash(transaction: dict) -> bytes:
+    transaction_bytes = json.dumps(transaction, indent=2).encode("utf-8")
+    return hashlib.sha256(str(transaction_bytes).encode("utf-8")).digest()
+
+
+def hash_pair(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(binascii.hexlify(left + right)).digest()
+
+
+class MerkleTree:
+    def __init__(self, leaves: list = None):
+        self.levels = [list(leaves or [])]
+        level = 0
+        padding = None
+        while len(self.levels[level]) > 1:
+            padding = self._get_next_padding(level, padding)
+            nodes = self.levels[level]
+            self.levels.append([self._hash_children(nodes, i, padding) for i in range(0, len(nodes), 2)])
+            level = level + 1
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    @classmethod
+    def from_transactions(cls, transactions: list):
+        return cls([get_leaf_hash(transaction) for transaction in transactions])
+
+    @property
+    def root(self) -> str:
+        if not self.levels[0]:
+            return None
+        return self.levels[-1][0].hex()
+
+    def _get_next_padding(self, level: int, padding: bytes) -> bytes:
+        if level < 2:
+            return self.levels[level][-1]
+        return hash_pair(padding, padding)
+
+    @staticmethod
+    def _hash_children(nodes: list, left_index: int, padding: bytes) -> bytes:
+        right = nodes[left_index + 1] if left_index + 1 < len(nodes) else padding
+        return hash_pair(nodes[left_index], right)
+
+    def append(self, transaction: dict):
+        self.append_leaf(get_leaf_hash(transaction))
+
+    def append_leaf(self, leaf: bytes):
+        self.levels[0].append(leaf)
+        index = len(self.levels[0]) - 1
+        level = 0
+        padding = None
+        while len(self.levels[level]) > 1:
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            padding = self._get_next_padding(level, padding)
+            parent_index = index // 2
+            parent = self._hash_children(self.levels[level], 2 * parent_index, padding)
+            if parent_index < len(self.levels[level + 1]):
+                self.levels[level + 1][parent_index] = parent
+            else:
+                self.levels[level + 1].append(parent)
+            index = parent_index
+            level = level + 1
+
+    def get_proof(self, index: int) -> list:
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"No leaf at index {index}")
+        proof = []
+        padding = None
+        for level in range(len(self.levels) - 1):
+            padding = self._get_next_padding(level, padding)
+            nodes = self.levels[level]
+            sibling_index = index ^ 1
+            proof.append((nodes[sibling_index] if sibling_index < len(nodes) else padding).hex())
+            index = index // 2
+        return proof
+
+
+def verify_merkle_proof(leaf_hash: str, index: int, proof: list, merkle_root: str) -> bool:
+    node = bytes.fromhex(leaf_hash)
+    for sibling_hash in proof:
+        sibling = bytes.fromhex(sibling_hash)
+        node = hash_pair(sibling, node) if index % 2 else hash_pair(node, sibling)
+        index = index // 2
+    return index == 0 and node.hex() == merkle_root
 
 
 def get_merkle_root(transactions: list) -> str:
-    transactions_bytes = [json.dumps(transaction, indent=2).encode(
-        'utf-8') for transaction in transactions]
-    merkle_tree = build_merkle_tree(transactions_bytes)
-    return merkle_tree.value
+    return MerkleTree.from_transactions(transactions).root
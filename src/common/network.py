@@ -1,87 +1,213 @@
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+
+from common.block import Block, BlockHeader
+from common.inventory import get_inventory_item
+from common.merkle_tree import get_merkle_root
 from common.node import Node
-from common.io_blockchain import store_blockchain_dict_in_memory
+from common.peer_messenger import peer_messenger
+from common.peer_table import PeerTable
+from common.io_blockchain import append_block_to_memory, get_block_hashes_from_memory, get_chain_from_memory, \
+    truncate_blockchain_in_memory
+from common.io_utxo_set import get_utxo_set_from_memory, store_utxo_set_in_memory
 from common.initialize_default_blockchain import initialize_default_blockchain
+from common.utxo_set import UTXOSet
+from common.values import MAX_HEADERS_PER_REQUEST, NUMBER_OF_LEADING_ZEROS
+
+PEER_FAILURE_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def is_peer_failure(request_exception: requests.exceptions.RequestException) -> bool:
+    if isinstance(request_exception, requests.exceptions.HTTPError):
+        return request_exception.response is None or request_exception.response.status_code >= 500
+    return isinstance(request_exception, PEER_FAILURE_EXCEPTIONS)
+
+
+class NetworkException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
 
 
 class Network:
 
     KNOWN_NODES_FILE = 'src/doc/known_nodes.json'
     FIRST_KNOWN_NODE_HOSTNAME = "127.0.0.1:5000"
+    BLOCK_DOWNLOAD_WORKERS = 8
+    RELAY_FANOUT = 8
 
-    def __init__(self, node: Node):
+    def __init__(self, node: Node, fanout: int = RELAY_FANOUT):
         self.node = node
+        self.fanout = fanout
+        self.peer_table = PeerTable(self.KNOWN_NODES_FILE)
         self.initialize_known_nodes_file()
 
     def initialize_known_nodes_file(self):
+        if self.peer_table.load():
+            return
         print("Initializing known nodes file")
         initial_known_node = Node(hostname=self.FIRST_KNOWN_NODE_HOSTNAME)
-        with open(self.KNOWN_NODES_FILE, "w") as jsonFile:
-            json.dump([initial_known_node.dict], jsonFile)
+        self.peer_table.reset([initial_known_node])
+
+    def track(self, send):
+        def tracked_send(node: Node):
+            start = time.monotonic()
+            try:
+                result = send(node)
+            except requests.exceptions.RequestException as request_exception:
+                if is_peer_failure(request_exception):
+                    self.peer_table.record_failure(node.hostname)
+                raise
+            self.peer_table.record_success(node.hostname, time.monotonic() - start)
+            return result
+        return tracked_send
+
+    def select_peers(self, fanout: int = None) -> list:
+        return self.peer_table.select_peers(fanout, exclude_hostname=self.node.hostname)
+
+    def call_all(self, send) -> list:
+        return peer_messenger.call_all(self.select_peers(), self.track(send))
 
     def advertise_to_all_known_nodes(self):
         print("Advertising to all known nodes")
-        for node in self.known_nodes:
-            if node.hostname != self.node.hostname:
-                node.advertise(self.node.hostname)
+        self.call_all(lambda node: node.advertise(self.node.hostname))
 
     def ask_known_nodes_for_their_known_nodes(self) -> list:
         print("Asking known nodes for their own known nodes")
         known_nodes_of_known_nodes = []
-        for currently_known_node in self.known_nodes:
-            known_nodes_of_known_node = currently_known_node.known_node_request(
-                self.node.hostname)
+        responses = self.call_all(lambda node: node.known_node_request(self.node.hostname))
+        for _, known_nodes_of_known_node in responses:
             for node in known_nodes_of_known_node:
                 known_nodes_of_known_nodes.append(Node(node["hostname"]))
         return known_nodes_of_known_nodes
 
+    def broadcast(self, send) -> list:
+        return peer_messenger.broadcast(self.select_peers(self.fanout), self.track(send))
+
+    def announce(self, inventory_type: str, inventory_hash: str) -> list:
+        return self.announce_all(inventory_type, [inventory_hash])
+
+    def announce_all(self, inventory_type: str, inventory_hashes: list) -> list:
+        if not inventory_hashes:
+            return []
+        inventory = [get_inventory_item(inventory_type, inventory_hash) for inventory_hash in inventory_hashes]
+        return self.broadcast(lambda node: node.send_inventory(self.node.hostname, inventory))
+
+    @property
+    def other_nodes(self) -> list:
+        return [node for node in self.known_nodes if node.hostname != self.node.hostname]
+
     @property
     def known_nodes(self) -> list(Node):
-        with open(self.KNOWN_NODES_FILE) as f:
-            nodes = json.load(f)
-            known_nodes = [Node(hostname=node["hostname"]) for node in nodes]
-        return known_nodes
+        return self.peer_table.nodes
 
     def store_new_node(self, new_node: Node):
+        if new_node.hostname in self.peer_table:
+            self.peer_table.touch(new_node.hostname)
+            return
         print(f"Storing new node: {new_node.hostname}")
-        with open(self.KNOWN_NODES_FILE, "r+") as f:
-            current_nodes_json = json.load(f)
-            current_nodes = [Node(hostname=node["hostname"])
-                             for node in current_nodes_json]
-            if new_node not in current_nodes:
-                current_nodes_json.append(new_node.dict)
-                f.seek(0)
-                json.dump(current_nodes_json, f)
+        self.peer_table.add(new_node)
 
     def store_nodes(self, nodes: list(Node)):
         for node in nodes:
             self.store_new_node(node)
 
     def initialize_blockchain(self):
-        longest_blockchain = self.get_longest_blockchain()
-        store_blockchain_dict_in_memory(longest_blockchain)
-
-    def get_longest_blockchain(self):
-        longest_blockchain_size = 0
-        longest_blockchain = None
-        for node in self.known_nodes:
-            if node.hostname != self.node.hostname:
-                blockchain = node.get_blockchain()
-                blockchain_length = len(blockchain)
-                if blockchain_length > longest_blockchain_size:
-                    longest_blockchain_size = blockchain_length
-                    longest_blockchain = blockchain
-        return longest_blockchain
+        if not get_block_hashes_from_memory():
+            initialize_default_blockchain()
+        local_hashes = get_block_hashes_from_memory()
+        peer_tips = self.get_peer_tips()
+        if not peer_tips:
+            return
+        best_node, best_tip = max(peer_tips, key=lambda peer_tip: peer_tip[1]["height"])
+        if best_tip["height"] < len(local_hashes):
+            return
+        try:
+            self.synchronize_blockchain(best_node, peer_tips, local_hashes)
+        except NetworkException as network_exception:
+            print(f"Blockchain synchronization stopped: {network_exception.message}")
+        except requests.exceptions.RequestException as request_exception:
+            print(f"Blockchain synchronization stopped: {request_exception}")
+
+    def get_peer_tips(self) -> list:
+        return self.call_all(lambda node: node.get_tip())
+
+    @staticmethod
+    def find_fork(node: Node, local_hashes: list) -> tuple:
+        from_height = max(len(local_hashes) - MAX_HEADERS_PER_REQUEST, 0)
+        while True:
+            headers = node.get_headers(from_height)
+            number_of_matching_headers = 0
+            for header in headers:
+                if header["height"] >= len(local_hashes) or header["hash"] != local_hashes[header["height"]]:
+                    break
+                number_of_matching_headers = number_of_matching_headers + 1
+            if number_of_matching_headers or from_height == 0:
+                return from_height + number_of_matching_headers, headers[number_of_matching_headers:]
+            from_height = max(from_height - MAX_HEADERS_PER_REQUEST, 0)
+
+    @staticmethod
+    def validate_header(header: dict, previous_block_hash: str):
+        block_header = BlockHeader(**header["header"])
+        if block_header.previous_block_hash != previous_block_hash:
+            raise NetworkException(header["hash"], "Header does not extend the previous header")
+        if block_header.hash != header["hash"]:
+            raise NetworkException(header["hash"], "Header hash does not match its content")
+        if not block_header.hash.startswith("0" * NUMBER_OF_LEADING_ZEROS):
+            raise NetworkException(header["hash"], "Header proof of work validation failed")
+
+    def download_block(self, header: dict, nodes: list) -> Block:
+        for node in nodes:
+            try:
+                block_data = self.track(lambda peer: peer.get_block(header["hash"]))(node)
+            except requests.exceptions.RequestException:
+                continue
+            block_header = BlockHeader(**block_data["header"])
+            if block_header.hash == header["hash"] and \
+                    get_merkle_root(block_data["transactions"]) == block_header.merkle_root:
+                return Block(transactions=block_data["transactions"], block_header=block_header)
+        raise NetworkException(header["hash"], "Block could not be downloaded from any known node")
+
+    def download_blocks(self, headers: list, nodes: list) -> list:
+        with ThreadPoolExecutor(max_workers=self.BLOCK_DOWNLOAD_WORKERS) as executor:
+            futures = []
+            for i, header in enumerate(headers):
+                first_node = i % len(nodes)
+                futures.append(executor.submit(self.download_block, header, nodes[first_node:] + nodes[:first_node]))
+            return [future.result() for future in futures]
+
+    def synchronize_blockchain(self, best_node: Node, peer_tips: list, local_hashes: list):
+        fork_height, headers = self.find_fork(best_node, local_hashes)
+        previous_block_hash = local_hashes[fork_height - 1] if fork_height else None
+        needs_truncation = fork_height < len(local_hashes)
+        utxo_set = None if needs_truncation else get_utxo_set_from_memory()
+        try:
+            while headers:
+                for header in headers:
+                    self.validate_header(header, previous_block_hash)
+                    previous_block_hash = header["hash"]
+                synchronized_hostnames = {node.hostname for node, tip in peer_tips
+                                          if tip["height"] >= headers[-1]["height"]}
+                nodes = [node for node in self.select_peers() if node.hostname in synchronized_hostnames][:self.fanout]
+                blocks = self.download_blocks(headers, nodes or [best_node])
+                if needs_truncation:
+                    truncate_blockchain_in_memory(fork_height)
+                    needs_truncation = False
+                for block in blocks:
+                    append_block_to_memory(block)
+                    if utxo_set is not None:
+                        utxo_set.apply_block(block)
+                headers = best_node.get_headers(headers[-1]["height"] + 1)
+        finally:
+            if utxo_set is None:
+                utxo_set = UTXOSet.from_chain(get_chain_from_memory())
+            store_utxo_set_in_memory(utxo_set)
 
     @property
     def other_nodes_exist(self) -> bool:
-        if len(self.known_nodes) == 0:
-            return False
-        elif len(self.known_nodes) == 1 and self.known_nodes[0].hostname == self.node.hostname:
-            return False
-        else:
-            return True
+        return bool(self.other_nodes)
 
     def join_network(self):
         print("Joining network")
@@ -96,6 +222,4 @@ class Network:
             initialize_default_blockchain()
 
     def return_known_nodes(self) -> list:
-        with open(self.KNOWN_NODES_FILE) as f:
-            current_nodes_json = json.load(f)
-        return current_nodes_json
+        return [node.dict for node in self.known_nodes]
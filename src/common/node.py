@@ -1,10 +1,46 @@
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.encoding import BINARY_MIME_TYPE, decode_block, decode_blocks, decode_inventory_data
+from common.values import MAX_HEADERS_PER_REQUEST
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.2
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+MAX_POOLED_HOSTS = 64
+MAX_CONNECTIONS_PER_HOST = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=MAX_RETRIES, backoff_factor=RETRY_BACKOFF_FACTOR,
+                          status_forcelist=RETRY_STATUS_CODES, allowed_methods=frozenset(["GET", "POST"]),
+                          raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=MAX_POOLED_HOSTS, pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                                  max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Accept-Encoding"] = "gzip"
+            _session = session
+        return _session
 
 
 class Node:
-    def __init__(self, hostname: str):
+    def __init__(self, hostname: str, connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT):
         self.hostname = hostname
         self.base_url = f"http://{hostname}/"
+        self.timeout = (connect_timeout, read_timeout)
 
     def __eq__(self, other):
         return self.hostname == other.hostname
@@ -15,19 +51,31 @@ class Node:
             "hostname": self.hostname
         }
 
-    def post(self, endpoint: str, data: dict) -> requests.Response:
+    def post(self, endpoint: str, data: dict, params: dict = None) -> requests.Response:
         url = f"{self.base_url}{endpoint}"
-        req_return = requests.post(url, json=data)
+        req_return = get_session().post(url, json=data, params=params, timeout=self.timeout)
         req_return.raise_for_status()
         return req_return
 
-    def get(self, endpoint: str, data: dict = None) -> list:
+    def get(self, endpoint: str, data: dict = None, params: dict = None) -> list:
         url = f"{self.base_url}{endpoint}"
         if data:
-            req_return = requests.get(url, json=data)
+            req_return = get_session().get(url, json=data, params=params, timeout=self.timeout)
+        else:
+            req_return = get_session().get(url, params=params, timeout=self.timeout)
+        req_return.raise_for_status()
+        return req_return.json()
+
+    def get_payload(self, endpoint: str, decode, data: dict = None):
+        url = f"{self.base_url}{endpoint}"
+        headers = {"Accept": f"{BINARY_MIME_TYPE}, application/json;q=0.9"}
+        if data is None:
+            req_return = get_session().get(url, headers=headers, timeout=self.timeout)
         else:
-            req_return = requests.get(url)
+            req_return = get_session().post(url, json=data, headers=headers, timeout=self.timeout)
         req_return.raise_for_status()
+        if req_return.headers.get("Content-Type", "").startswith(BINARY_MIME_TYPE):
+            return decode(req_return.content)
         return req_return.json()
 
     def advertise(self, hostname: str):
@@ -38,11 +86,26 @@ class Node:
         data = {"hostname": hostname}
         return self.get(endpoint="known_node_request", data=data)
 
-    def send_new_block(self, block: dict) -> requests.Response:
-        return self.post(endpoint="block", data=block)
+    def send_new_block(self, block: dict, wait: bool = False) -> requests.Response:
+        return self.post(endpoint="block", data=block, params={"wait": "true"} if wait else None)
 
     def send_transaction(self, transaction_data: dict) -> requests.Response:
         return self.post("transactions", transaction_data)
 
     def get_blockchain(self) -> list:
-        return self.get(endpoint="block")
+        return self.get_payload(endpoint="block", decode=decode_blocks)
+
+    def get_tip(self) -> dict:
+        return self.get(endpoint="tip")
+
+    def get_headers(self, from_height: int, count: int = MAX_HEADERS_PER_REQUEST) -> list:
+        return self.get(endpoint="headers", params={"from": from_height, "count": count})
+
+    def get_block(self, block_hash: str) -> dict:
+        return self.get_payload(endpoint=f"block/{block_hash}", decode=decode_block)
+
+    def send_inventory(self, hostname: str, inventory: list) -> requests.Response:
+        return self.post(endpoint="inv", data={"hostname": hostname, "inventory": inventory})
+
+    def get_data(self, inventory: list) -> dict:
+        return self.get_payload(endpoint="getdata", decode=decode_inventory_data, data={"inventory": inventory})
@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+MAX_CONCURRENT_MESSAGES = 16
+MAX_PENDING_MESSAGES = 1024
+CALL_ALL_TIMEOUT = 30
+
+
+class PeerMessenger:
+    def __init__(self, max_workers: int = MAX_CONCURRENT_MESSAGES, max_pending_messages: int = MAX_PENDING_MESSAGES):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="peer_messenger")
+        self.pending_messages = threading.BoundedSemaphore(max_pending_messages)
+
+    @staticmethod
+    def _send(node, send):
+        try:
+            return send(node)
+        except Exception as exception:
+            print(f"Message to node {node.hostname} failed: {exception}")
+            raise
+
+    def _send_pending(self, node, send):
+        try:
+            return self._send(node, send)
+        finally:
+            self.pending_messages.release()
+
+    def call_all(self, nodes: list, send, timeout: float = CALL_ALL_TIMEOUT) -> list:
+        futures = [(node, self.executor.submit(self._send, node, send)) for node in nodes]
+        wait([future for _, future in futures], timeout=timeout)
+        results = []
+        for node, future in futures:
+            if future.done() and not future.exception():
+                results.append((node, future.result()))
+        return results
+
+    def broadcast(self, nodes: list, send) -> list:
+        futures = []
+        for node in nodes:
+            if not self.pending_messages.acquire(blocking=False):
+                print(f"Too many pending messages, dropping message to node {node.hostname}")
+                continue
+            futures.append(self.executor.submit(self._send_pending, node, send))
+        return futures
+
+
+peer_messenger = PeerMessenger()
@@ -0,0 +1,182 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from common.node import Node
+
+PERSIST_DELAY = 1
+LATENCY_SMOOTHING = 0.2
+ERROR_RATE_SMOOTHING = 0.2
+ERROR_RATE_PENALTY = 10
+DEFAULT_LATENCY = 1
+BASE_BACKOFF = 1
+MAX_BACKOFF = 300
+MAX_CONSECUTIVE_FAILURES = 10
+
+
+class Peer:
+    def __init__(self, node: Node, last_seen: float = None, last_success: float = None, latency: float = None,
+                 error_rate: float = 0, failures: int = 0, retry_at: float = 0):
+        self.node = node
+        self.last_seen = last_seen
+        self.last_success = last_success
+        self.latency = latency
+        self.error_rate = error_rate
+        self.failures = failures
+        self.retry_at = retry_at
+
+    @property
+    def hostname(self) -> str:
+        return self.node.hostname
+
+    @property
+    def score(self) -> float:
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY
+        return latency * (1 + ERROR_RATE_PENALTY * self.error_rate)
+
+    def is_available(self, now: float) -> bool:
+        return self.retry_at <= now
+
+    @property
+    def to_dict(self) -> dict:
+        return {
+            "hostname": self.hostname,
+            "last_seen": self.last_seen,
+            "last_success": self.last_success,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "failures": self.failures,
+            "retry_at": self.retry_at
+        }
+
+    @classmethod
+    def from_dict(cls, peer_data: dict):
+        return cls(Node(peer_data["hostname"]), peer_data.get("last_seen"), peer_data.get("last_success"),
+                   peer_data.get("latency"), peer_data.get("error_rate", 0), peer_data.get("failures", 0),
+                   peer_data.get("retry_at", 0))
+
+
+class PeerTable:
+    def __init__(self, filename: str, persist_delay: float = PERSIST_DELAY):
+        self.filename = filename
+        self.persist_delay = persist_delay
+        self.peers = OrderedDict()
+        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.dirty = False
+        self.persist_thread = None
+        atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return len(self.peers)
+
+    def __contains__(self, hostname: str) -> bool:
+        return hostname in self.peers
+
+    @property
+    def nodes(self) -> list:
+        with self.lock:
+            return [peer.node for peer in self.peers.values()]
+
+    def get(self, hostname: str) -> Peer:
+        return self.peers.get(hostname)
+
+    def select_peers(self, fanout: int = None, exclude_hostname: str = None) -> list:
+        now = time.time()
+        with self.lock:
+            peers = [peer for peer in self.peers.values()
+                     if peer.hostname != exclude_hostname and peer.is_available(now)]
+        peers.sort(key=lambda peer: peer.score)
+        return [peer.node for peer in peers[:fanout]]
+
+    def load(self) -> bool:
+        try:
+            with open(self.filename) as file_obj:
+                peers_data = json.load(file_obj)
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            self.peers = OrderedDict((peer_data["hostname"], Peer.from_dict(peer_data)) for peer_data in peers_data)
+        return True
+
+    def reset(self, nodes: list):
+        with self.lock:
+            self.peers = OrderedDict((node.hostname, Peer(node)) for node in nodes)
+            self.dirty = True
+        self.flush()
+
+    def add(self, node: Node) -> bool:
+        with self.lock:
+            if node.hostname in self.peers:
+                return False
+            self.peers[node.hostname] = Peer(node)
+        self.schedule_persist()
+        return True
+
+    def touch(self, hostname: str):
+        with self.lock:
+            peer = self.peers.get(hostname)
+            if peer is None:
+                return
+            peer.last_seen = time.time()
+        self.schedule_persist()
+
+    def record_success(self, hostname: str, latency: float):
+        with self.lock:
+            peer = self.peers.get(hostname)
+            if peer is None:
+                return
+            peer.last_seen = time.time()
+            peer.last_success = peer.last_seen
+            peer.latency = latency if peer.latency is None else \
+                (1 - LATENCY_SMOOTHING) * peer.latency + LATENCY_SMOOTHING * latency
+            peer.error_rate = (1 - ERROR_RATE_SMOOTHING) * peer.error_rate
+            peer.failures = 0
+            peer.retry_at = 0
+        self.schedule_persist()
+
+    def record_failure(self, hostname: str):
+        with self.lock:
+            peer = self.peers.get(hostname)
+            if peer is None:
+                return
+            peer.failures = peer.failures + 1
+            peer.error_rate = (1 - ERROR_RATE_SMOOTHING) * peer.error_rate + ERROR_RATE_SMOOTHING
+            peer.retry_at = time.time() + min(BASE_BACKOFF * 2 ** (peer.failures - 1), MAX_BACKOFF)
+            if peer.failures >= MAX_CONSECUTIVE_FAILURES:
+                print(f"Evicting node {hostname} after {peer.failures} consecutive failures")
+                self.peers.pop(hostname)
+        self.schedule_persist()
+
+    def schedule_persist(self):
+        with self.lock:
+            self.dirty = True
+            if self.persist_thread is None:
+                self.persist_thread = threading.Thread(target=self._persist_later, daemon=True)
+                self.persist_thread.start()
+
+    def _persist_later(self):
+        while True:
+            time.sleep(self.persist_delay)
+            with self.lock:
+                if not self.dirty:
+                    self.persist_thread = None
+                    return
+            self.flush()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                peers_data = [peer.to_dict for peer in self.peers.values()]
+                self.dirty = False
+            temporary_filename = f"{self.filename}.{id(self)}.tmp"
+            with open(temporary_filename, "w") as file_obj:
+                json.dump(peers_data, file_obj)
+                file_obj.flush()
+                os.fsync(file_obj.fileno())
+            os.replace(temporary_filename, self.filename)
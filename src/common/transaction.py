@@ -6,7 +6,7 @@ from Crypto.Signature import pkcs1_15
 
 from common.transaction_input import TransactionInput
 from common.transaction_output import TransactionOutput
-from common.utils import calculate_hash
+from common.utils import calculate_transaction_hash
 
 
 class Transaction:
@@ -20,8 +20,7 @@ class Transaction:
             "inputs": [i.to_dict() for i in self.inputs],
             "outputs": [i.to_dict() for i in self.outputs]
         }
-        transaction_bytes = json.dumps(transaction_data, indent=2)
-        return calculate_hash(transaction_bytes)
+        return calculate_transaction_hash(transaction_data)
 
     def sign_transaction_data(self, owner):
         transaction_dict = {"inputs": [tx_input.to_dict(with_unlocking_script=False) for tx_input in self.inputs],
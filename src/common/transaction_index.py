@@ -0,0 +1,57 @@
+from common.chain import Chain
+from common.utils import calculate_transaction_hash
+
+
+class TransactionIndex:
+    def __init__(self):
+        self.blocks = []
+        self.locations = {}
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __contains__(self, transaction_hash: str) -> bool:
+        return transaction_hash in self.locations
+
+    def add_block(self, block):
+        height = len(self.blocks)
+        self.blocks.append(block)
+        for position, transaction in enumerate(block.transactions):
+            self.locations[calculate_transaction_hash(transaction)] = (height, position)
+
+    def truncate(self, height: int):
+        for block in self.blocks[height:]:
+            for transaction in block.transactions:
+                transaction_hash = calculate_transaction_hash(transaction)
+                location = self.locations.get(transaction_hash)
+                if location is not None and location[0] >= height:
+                    self.locations.pop(transaction_hash)
+        del self.blocks[height:]
+
+    def get_output(self, transaction_hash: str, output_index: int) -> dict:
+        location = self.locations.get(transaction_hash)
+        if location is None:
+            raise KeyError((transaction_hash, output_index))
+        height, position = location
+        return self.blocks[height].transactions[position]["outputs"][output_index]
+
+    def get_location(self, transaction_hash: str) -> tuple:
+        return self.locations.get(transaction_hash)
+
+    def get_transaction(self, transaction_hash: str) -> dict:
+        location = self.locations.get(transaction_hash)
+        if location is None:
+            return {}
+        height, position = location
+        return self.blocks[height].transactions[position]
+
+    @classmethod
+    def from_chain(cls, chain):
+        transaction_index = cls()
+        for block in chain:
+            transaction_index.add_block(block)
+        return transaction_index
+
+    @classmethod
+    def from_blockchain(cls, blockchain):
+        return cls.from_chain(Chain.from_tip(blockchain))
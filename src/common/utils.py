@@ -21,3 +21,16 @@ def convert_transaction_data_to_bytes(transaction_data: dict):
     new_transaction_data["receiver"] = str(transaction_data["receiver"])
     new_transaction_data["amount"] = str(transaction_data["amount"])
     return json.dumps(new_transaction_data, indent=2).encode('utf-8')
+
+
+def calculate_transaction_hash(transaction_data: dict) -> str:
+    transaction_content = {key: value for key, value in transaction_data.items() if key != "transaction_hash"}
+    if "inputs" in transaction_content:
+        transaction_content["inputs"] = [{**tx_input, "unlocking_script": ""}
+                                         for tx_input in transaction_content["inputs"]]
+    return calculate_hash(json.dumps(transaction_content, indent=2))
+
+
+def calculate_transaction_content_hash(transaction_data: dict) -> str:
+    transaction_content = {key: value for key, value in transaction_data.items() if key != "transaction_hash"}
+    return calculate_hash(json.dumps(transaction_content, indent=2))
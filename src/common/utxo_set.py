@@ -0,0 +1,217 @@
+from common.chain import Chain
+from common.utils import calculate_transaction_hash
+
+
+class UTXOSetException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+def get_verified_transaction_hash(transaction: dict) -> str:
+    transaction_hash = calculate_transaction_hash(transaction)
+    if transaction.get("transaction_hash", transaction_hash) != transaction_hash:
+        raise UTXOSetException(transaction["transaction_hash"], "Transaction hash does not match its content")
+    return transaction_hash
+
+
+class UTXOSet:
+    def __init__(self, tip_hash: str = None):
+        self.utxos = {}
+        self.utxos_by_owner = {}
+        self.tip_hash = tip_hash
+        self.changes = {}
+        self.stored_tip_hash = tip_hash
+        self.log_records = 0
+
+    def __len__(self) -> int:
+        return len(self.utxos)
+
+    def __contains__(self, outpoint: tuple) -> bool:
+        return outpoint in self.utxos
+
+    @staticmethod
+    def get_owners(locking_script: str) -> list:
+        return [element for element in locking_script.split(" ") if not element.startswith("OP")]
+
+    def add(self, transaction_hash: str, output_index: int, output: dict):
+        outpoint = (transaction_hash, output_index)
+        if outpoint in self.utxos:
+            raise UTXOSetException(f"{transaction_hash}:{output_index}", "Output already exists in the UTXO set")
+        self.utxos[outpoint] = output
+        self.changes[outpoint] = output
+        for owner in self.get_owners(output["locking_script"]):
+            self.utxos_by_owner.setdefault(owner, {})[outpoint] = None
+
+    def remove(self, transaction_hash: str, output_index: int) -> dict:
+        outpoint = (transaction_hash, output_index)
+        output = self.utxos.pop(outpoint, None)
+        if output is not None:
+            self.changes[outpoint] = None
+            for owner in self.get_owners(output["locking_script"]):
+                owner_utxos = self.utxos_by_owner[owner]
+                owner_utxos.pop(outpoint, None)
+                if not owner_utxos:
+                    self.utxos_by_owner.pop(owner)
+        return output
+
+    def get(self, transaction_hash: str, output_index: int) -> dict:
+        return self.utxos[(transaction_hash, output_index)]
+
+    def get_locking_script(self, transaction_hash: str, output_index: int) -> str:
+        return self.get(transaction_hash, output_index)["locking_script"]
+
+    def get_amount(self, transaction_hash: str, output_index: int) -> int:
+        return self.get(transaction_hash, output_index)["amount"]
+
+    def apply_transaction(self, transaction: dict):
+        transaction_hash = get_verified_transaction_hash(transaction)
+        for output_index in range(len(transaction["outputs"])):
+            if (transaction_hash, output_index) in self.utxos:
+                raise UTXOSetException(f"{transaction_hash}:{output_index}", "Output already exists in the UTXO set")
+        for tx_input in transaction["inputs"]:
+            self.remove(tx_input["transaction_hash"], tx_input["output_index"])
+        for output_index, output in enumerate(transaction["outputs"]):
+            self.add(transaction_hash, output_index, output)
+
+    def commit(self, utxo_view):
+        for transaction_hash, output_index in utxo_view.spent:
+            self.remove(transaction_hash, output_index)
+        for (transaction_hash, output_index), output in utxo_view.added.items():
+            self.add(transaction_hash, output_index, output)
+
+    def apply_block(self, block):
+        utxo_view = UTXOView(self)
+        for transaction in block.transactions:
+            utxo_view.apply_transaction(transaction)
+        self.commit(utxo_view)
+        self.tip_hash = block.block_header.hash
+
+    def undo_transaction(self, transaction: dict, get_spent_output):
+        transaction_hash = calculate_transaction_hash(transaction)
+        for output_index in range(len(transaction["outputs"])):
+            self.remove(transaction_hash, output_index)
+        for tx_input in transaction["inputs"]:
+            spent_output = get_spent_output(tx_input["transaction_hash"], tx_input["output_index"])
+            self.add(tx_input["transaction_hash"], tx_input["output_index"], spent_output)
+
+    def undo_block(self, block, get_spent_output):
+        for transaction in reversed(block.transactions):
+            self.undo_transaction(transaction, get_spent_output)
+        self.tip_hash = block.block_header.previous_block_hash
+
+    def pop_changes(self) -> dict:
+        changes_record = {
+            "previous_tip_hash": self.stored_tip_hash,
+            "tip_hash": self.tip_hash,
+            "added": [
+                {
+                    "transaction_hash": transaction_hash,
+                    "output_index": output_index,
+                    "output": output
+                }
+                for (transaction_hash, output_index), output in self.changes.items() if output is not None
+            ],
+            "spent": [list(outpoint) for outpoint, output in self.changes.items() if output is None]
+        }
+        self.mark_stored()
+        return changes_record
+
+    def apply_changes(self, changes_record: dict):
+        if changes_record["previous_tip_hash"] != self.tip_hash:
+            raise UTXOSetException(changes_record["tip_hash"], "Changes do not follow the UTXO set tip")
+        for transaction_hash, output_index in changes_record["spent"]:
+            self.remove(transaction_hash, output_index)
+        for utxo in changes_record["added"]:
+            self.remove(utxo["transaction_hash"], utxo["output_index"])
+            self.add(utxo["transaction_hash"], utxo["output_index"], utxo["output"])
+        self.tip_hash = changes_record["tip_hash"]
+        self.mark_stored()
+
+    def mark_stored(self):
+        self.changes = {}
+        self.stored_tip_hash = self.tip_hash
+
+    def get_user_utxos(self, user: str) -> dict:
+        return_dict = {
+            "user": user,
+            "total": 0,
+            "utxos": []
+        }
+        for transaction_hash, output_index in self.utxos_by_owner.get(user, {}):
+            amount = self.utxos[(transaction_hash, output_index)]["amount"]
+            return_dict["total"] = return_dict["total"] + amount
+            return_dict["utxos"].append(
+                {
+                    "amount": amount,
+                    "transaction_hash": transaction_hash,
+                    "output_index": output_index
+                }
+            )
+        return return_dict
+
+    @property
+    def to_list(self) -> list:
+        return [
+            {
+                "transaction_hash": transaction_hash,
+                "output_index": output_index,
+                "output": output
+            }
+            for (transaction_hash, output_index), output in self.utxos.items()
+        ]
+
+    @classmethod
+    def from_list(cls, utxo_list: list, tip_hash: str = None):
+        utxo_set = cls(tip_hash)
+        for utxo in utxo_list:
+            utxo_set.add(utxo["transaction_hash"], utxo["output_index"], utxo["output"])
+        utxo_set.mark_stored()
+        return utxo_set
+
+    @classmethod
+    def from_chain(cls, chain):
+        utxo_set = cls()
+        for block in chain:
+            utxo_set.apply_block(block)
+        return utxo_set
+
+    @classmethod
+    def from_blockchain(cls, blockchain):
+        return cls.from_chain(Chain.from_tip(blockchain))
+
+
+class UTXOView:
+    def __init__(self, utxo_set: UTXOSet):
+        self.utxo_set = utxo_set
+        self.added = {}
+        self.spent = set()
+
+    def get(self, transaction_hash: str, output_index: int) -> dict:
+        outpoint = (transaction_hash, output_index)
+        if outpoint in self.spent:
+            raise KeyError(outpoint)
+        if outpoint in self.added:
+            return self.added[outpoint]
+        return self.utxo_set.get(transaction_hash, output_index)
+
+    def get_locking_script(self, transaction_hash: str, output_index: int) -> str:
+        return self.get(transaction_hash, output_index)["locking_script"]
+
+    def get_amount(self, transaction_hash: str, output_index: int) -> int:
+        return self.get(transaction_hash, output_index)["amount"]
+
+    def __contains__(self, outpoint: tuple) -> bool:
+        return outpoint in self.added or (outpoint in self.utxo_set and outpoint not in self.spent)
+
+    def apply_transaction(self, transaction: dict):
+        transaction_hash = get_verified_transaction_hash(transaction)
+        for output_index in range(len(transaction["outputs"])):
+            if (transaction_hash, output_index) in self:
+                raise UTXOSetException(f"{transaction_hash}:{output_index}", "Output already exists in the UTXO set")
+        for tx_input in transaction["inputs"]:
+            outpoint = (tx_input["transaction_hash"], tx_input["output_index"])
+            self.added.pop(outpoint, None)
+            self.spent.add(outpoint)
+        for output_index, output in enumerate(transaction["outputs"]):
+            self.added[(transaction_hash, output_index)] = output
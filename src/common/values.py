@@ -1 +1,6 @@
 NUMBER_OF_LEADING_ZEROS = 3
+MAX_BLOCK_SIZE = 1000000
+MAX_BLOCK_TRANSACTIONS = 10000
+MAX_HEADERS_PER_REQUEST = 2000
+MERKLE_TREE_CACHE_SIZE = 128
+MAX_TRANSACTIONS_PER_BATCH = 1000
@@ -1,67 +1,364 @@
-from flask import Flask, request, jsonify
+import gzip
+import json
+import os
 
-from common.io_blockchain import get_blockchain_from_memory
+from flask import Flask, Response, request, jsonify
+from waitress import serve
+
+from common.block import Block, BlockHeader
+from common.chain_state import BLOCK_ORPHANED, ChainState, ChainStateException
+from common.encoding import BINARY_MIME_TYPE, EncodingException, decode_block, decode_transaction, encode_block, \
+    encode_blocks, encode_inventory_data
+from common.inventory import INVENTORY_BLOCK, INVENTORY_TRANSACTION, RecentlySeenFilter, get_inventory_item
+from common.mem_pool import MemPool
 from common.network import Network
 from common.node import Node
+from common.peer_messenger import peer_messenger
+from common.utils import calculate_transaction_hash
+from common.utxo_set import UTXOSet
+from common.values import MAX_HEADERS_PER_REQUEST, MAX_TRANSACTIONS_PER_BATCH
 from node.new_block_validation.new_block_validation import NewBlock, NewBlockException
-from node.transaction_validation.transaction_validation import Transaction, TransactionException
+from node.transaction_validation.script_cache import script_cache
+from node.transaction_validation.transaction_validation import Transaction, TransactionBatch, TransactionException
+from node.validation_pool import ClientRateLimitException, ValidationPool, ValidationQueueFullException
 
 app = Flask(__name__)
 
 MY_HOSTNAME = "127.0.0.1:5000"
+GZIP_MIN_SIZE = 1024
+GZIP_COMPRESSION_LEVEL = 5
+SERVER_THREADS = 8
+RETRY_AFTER = 1
+NDJSON_MIME_TYPE = "application/x-ndjson"
 my_node = Node(MY_HOSTNAME)
-network = Network(my_node)
-network.join_network()
+network = None
+chain_state = ChainState()
+mem_pool = MemPool()
+recently_seen = RecentlySeenFilter()
+transaction_validation_pool = ValidationPool(name="transaction_validation")
+block_validation_pool = ValidationPool(max_workers=1, name="block_validation")
+
+
+def accepts_binary() -> bool:
+    return request.accept_mimetypes.best_match(["application/json", BINARY_MIME_TYPE]) == BINARY_MIME_TYPE
+
+
+def get_request_payload(key: str, decode) -> dict:
+    if request.mimetype == BINARY_MIME_TYPE:
+        return decode(request.get_data())
+    return request.json[key]
+
+
+def submit_validation(validation_pool: ValidationPool, process, data: dict, exception_types: tuple,
+                      success_message: str) -> Response:
+    try:
+        future = validation_pool.submit(request.remote_addr, process, data)
+    except ClientRateLimitException as rate_limit_exception:
+        return Response(rate_limit_exception.message, status=429, headers={"Retry-After": str(RETRY_AFTER)})
+    except ValidationQueueFullException as queue_full_exception:
+        return Response(queue_full_exception.message, status=503, headers={"Retry-After": str(RETRY_AFTER)})
+    if not request.args.get("wait", default=False, type=lambda value: value.lower() == "true"):
+        return Response("Accepted for validation", status=202)
+    try:
+        result = future.result()
+    except exception_types as validation_exception:
+        return f'{validation_exception}', 400
+    if result is not None:
+        return jsonify(result)
+    return success_message, 200
+
+
+def accepts_ndjson() -> bool:
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIME_TYPE]) == NDJSON_MIME_TYPE
+
+
+def is_block_range_request() -> bool:
+    return accepts_ndjson() or any(parameter in request.args
+                                   for parameter in ("from_height", "to_height", "limit", "since_hash"))
+
+
+def stream_blocks(blocks: list):
+    for block in blocks:
+        yield json.dumps({"header": block.block_header.to_dict, "transactions": block.transactions}) + "\n"
+
+
+def get_int_parameter(name: str, default: int = None) -> int:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return int(value)
+
+
+def get_transaction_batch() -> list:
+    if request.mimetype == NDJSON_MIME_TYPE:
+        return [json.loads(line) for line in request.get_data().splitlines() if line.strip()]
+    content = request.get_json()
+    if isinstance(content, dict):
+        content = content.get("transactions")
+    if not isinstance(content, list):
+        raise ValueError("Expected a list of transactions")
+    return content
+
+
+def make_payload_response(data, encode) -> Response:
+    if accepts_binary():
+        try:
+            return Response(encode(data), mimetype=BINARY_MIME_TYPE)
+        except EncodingException:
+            pass
+    return Response(json.dumps(data), mimetype="application/json")
+
+
+@app.after_request
+def compress_response(response):
+    if response.is_streamed or response.status_code != 200 or "Content-Encoding" in response.headers \
+            or "gzip" not in request.headers.get("Accept-Encoding", ""):
+        return response
+    response_data = response.get_data()
+    if len(response_data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(response_data, compresslevel=GZIP_COMPRESSION_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def validate_received_block(block: Block, parent: Block, utxo_set: UTXOSet):
+    new_block = NewBlock(parent, network, utxo_set)
+    new_block.receive(new_block={"header": block.block_header.to_dict, "transactions": block.transactions})
+    new_block.validate()
+
+
+def restore_transactions(disconnected_blocks: list):
+    transactions_data = [transaction_data for block in disconnected_blocks for transaction_data in block.transactions
+                         if transaction_data["inputs"]]
+    if transactions_data:
+        with chain_state.read():
+            TransactionBatch(chain_state.blockchain, network, chain_state.utxo_set, mem_pool).validate(transactions_data)
+
+
+def remove_orphaned_transactions(disconnected_blocks: list):
+    transactions_data = [transaction_data for block in disconnected_blocks for transaction_data in block.transactions]
+    if transactions_data:
+        with chain_state.read():
+            mem_pool.remove_orphaned_transactions(transactions_data, chain_state.utxo_set)
+
+
+def process_block(block_data: dict) -> dict:
+    block = Block(transactions=block_data["transactions"], block_header=BlockHeader(**block_data["header"]))
+    block_receipt = chain_state.receive_block(block, validate_received_block)
+    recently_seen.add(block.block_header.hash)
+    if block_receipt["connected"]:
+        for connected_block in block_receipt["connected"]:
+            mem_pool.remove_confirmed_transactions(connected_block.transactions)
+        restore_transactions(block_receipt["disconnected"])
+        remove_orphaned_transactions(block_receipt["disconnected"])
+        network.announce_all(INVENTORY_BLOCK, [connected_block.block_header.hash
+                                               for connected_block in block_receipt["connected"]])
+    return block_receipt
+
+
+def process_submitted_block(block_data: dict) -> dict:
+    return {"status": process_block(block_data)["status"]}
+
+
+def process_transaction(transaction_data: dict):
+    transaction = Transaction(chain_state.blockchain, network, chain_state.utxo_set, mem_pool=mem_pool)
+    transaction.receive(transaction=transaction_data)
+    if transaction.is_new:
+        with chain_state.read():
+            transaction.validate()
+            transaction.validate_funds()
+            transaction.store()
+        recently_seen.add(calculate_transaction_hash(transaction_data))
+        transaction.broadcast()
+
+
+def process_transactions(transactions_data: list) -> list:
+    with chain_state.read():
+        transaction_batch = TransactionBatch(chain_state.blockchain, network, chain_state.utxo_set, mem_pool)
+        results = transaction_batch.validate(transactions_data)
+    for transaction_hash in transaction_batch.accepted_hashes:
+        recently_seen.add(transaction_hash)
+    transaction_batch.broadcast()
+    return results
+
+
+def is_inventory_known(inventory_item: dict) -> bool:
+    if inventory_item["type"] == INVENTORY_BLOCK:
+        return chain_state.has_block(inventory_item["hash"])
+    return inventory_item["hash"] in mem_pool or inventory_item["hash"] in chain_state.transaction_index
+
+
+def request_parent_block(node: Node, parent_hash: str):
+    if not chain_state.has_block(parent_hash) and recently_seen.add(parent_hash):
+        parent_inventory = [get_inventory_item(INVENTORY_BLOCK, parent_hash)]
+        peer_messenger.broadcast([node], lambda peer: fetch_inventory(peer, parent_inventory))
+
+
+def fetch_inventory(node: Node, inventory: list):
+    received_hashes = set()
+    try:
+        data = node.get_data(inventory)
+        for block_data in data["blocks"]:
+            received_hashes.add(BlockHeader(**block_data["header"]).hash)
+            try:
+                block_receipt = process_block(block_data)
+                if block_receipt["status"] == BLOCK_ORPHANED:
+                    request_parent_block(node, block_data["header"]["previous_block_hash"])
+            except (NewBlockException, TransactionException, ChainStateException) as new_block_exception:
+                print(f"Announced block rejected: {new_block_exception.message}")
+        for transaction_data in data["transactions"]:
+            received_hashes.add(calculate_transaction_hash(transaction_data))
+            try:
+                process_transaction(transaction_data)
+            except TransactionException as transaction_exception:
+                print(f"Announced transaction rejected: {transaction_exception.message}")
+    finally:
+        for inventory_item in inventory:
+            if inventory_item["hash"] not in received_hashes:
+                recently_seen.discard(inventory_item["hash"])
 
 
 @app.route("/block", methods=['POST'])
 def validate_block():
-    content = request.json
-    blockchain_base = get_blockchain_from_memory()
     try:
-        block = NewBlock(blockchain_base, network)
-        block.receive(new_block=content["block"])
-        block.validate()
-        block.add()
-        block.broadcast()
-    except (NewBlockException, TransactionException) as new_block_exception:
-        return f'{new_block_exception}', 400
-    return "Transaction success", 200
+        block_data = get_request_payload("block", decode_block)
+    except EncodingException as encoding_exception:
+        return f'{encoding_exception}', 400
+    return submit_validation(block_validation_pool, process_submitted_block, block_data,
+                             (NewBlockException, TransactionException, ChainStateException), "Transaction success")
 
 
 @app.route("/transactions", methods=['POST'])
 def validate_transaction():
-    content = request.json
-    blockchain_base = get_blockchain_from_memory()
     try:
-        transaction = Transaction(blockchain_base, network)
-        transaction.receive(transaction=content["transaction"])
-        if transaction.is_new:
-            transaction.validate()
-            transaction.validate_funds()
-            transaction.broadcast()
-            transaction.store()
-    except TransactionException as transaction_exception:
-        return f'{transaction_exception}', 400
-    return "Transaction success", 200
+        transaction_data = get_request_payload("transaction", decode_transaction)
+    except EncodingException as encoding_exception:
+        return f'{encoding_exception}', 400
+    return submit_validation(transaction_validation_pool, process_transaction, transaction_data,
+                             (TransactionException,), "Transaction success")
+
+
+@app.route("/transactions/batch", methods=['POST'])
+def validate_transactions():
+    try:
+        transactions_data = get_transaction_batch()
+    except ValueError as value_error:
+        return f'Malformed transaction batch: {value_error}', 400
+    if len(transactions_data) > MAX_TRANSACTIONS_PER_BATCH:
+        return f'Transaction batch exceeds {MAX_TRANSACTIONS_PER_BATCH} transactions', 413
+    return submit_validation(transaction_validation_pool, process_transactions, transactions_data, (),
+                             "Transactions processed")
+
+
+@app.route("/inv", methods=['POST'])
+def receive_inventory():
+    content = request.json
+    unknown_inventory = [inventory_item for inventory_item in content["inventory"]
+                         if inventory_item["type"] in (INVENTORY_BLOCK, INVENTORY_TRANSACTION)
+                         and not is_inventory_known(inventory_item) and recently_seen.add(inventory_item["hash"])]
+    if unknown_inventory:
+        peer_messenger.broadcast([Node(content["hostname"])], lambda node: fetch_inventory(node, unknown_inventory))
+    return jsonify({"requested": len(unknown_inventory)})
+
+
+@app.route("/getdata", methods=['POST'])
+def get_data():
+    content = request.json
+    data = {"blocks": [], "transactions": []}
+    for inventory_item in content["inventory"]:
+        if inventory_item["type"] == INVENTORY_BLOCK:
+            block = chain_state.get_block(inventory_item["hash"])
+            if block is not None:
+                data["blocks"].append({"header": block.block_header.to_dict, "transactions": block.transactions})
+        elif inventory_item["type"] == INVENTORY_TRANSACTION:
+            transaction_data = mem_pool.get(inventory_item["hash"]) or chain_state.get_transaction(inventory_item["hash"])
+            if transaction_data:
+                data["transactions"].append(transaction_data)
+    return make_payload_response(data, encode_inventory_data)
 
 
 @app.route("/block", methods=['GET'])
 def get_blocks():
-    blockchain_base = get_blockchain_from_memory()
-    return jsonify(blockchain_base.to_dict)
+    if is_block_range_request():
+        return get_block_range()
+    with chain_state.read():
+        blocks = chain_state.chain.to_dict
+    if accepts_binary():
+        return make_payload_response(blocks, encode_blocks)
+    return jsonify(blocks)
+
+
+def get_block_range():
+    try:
+        from_height = max(get_int_parameter("from_height", default=0), 0)
+        to_height = get_int_parameter("to_height")
+        limit = get_int_parameter("limit")
+    except ValueError:
+        return "Block range parameters must be integers", 400
+    if limit is not None and limit < 1:
+        return "Block range limit must be positive", 400
+    since_hash = request.args.get("since_hash")
+    if since_hash is not None:
+        since_height = chain_state.get_height(since_hash)
+        if since_height is None:
+            return "Block not found", 404
+        from_height = max(from_height, since_height + 1)
+    tip_height = chain_state.get_tip()["height"]
+    to_height = tip_height if to_height is None else min(to_height, tip_height)
+    if limit is not None:
+        to_height = min(to_height, from_height + limit - 1)
+    blocks = chain_state.get_blocks(from_height, to_height) if from_height <= to_height else []
+    return Response(stream_blocks(blocks), mimetype=NDJSON_MIME_TYPE)
+
+
+@app.route("/block/<block_hash>", methods=['GET'])
+def get_block(block_hash):
+    block = chain_state.get_block(block_hash)
+    if block is None:
+        return "Block not found", 404
+    block_data = {"header": block.block_header.to_dict, "transactions": block.transactions}
+    return make_payload_response(block_data, encode_block)
+
+
+@app.route("/tip", methods=['GET'])
+def get_tip():
+    return jsonify(chain_state.get_tip())
 
 
 @app.route("/utxo/<user>", methods=['GET'])
 def get_user_utxos(user):
-    blockchain_base = get_blockchain_from_memory()
-    return jsonify(blockchain_base.get_user_utxos(user))
+    with chain_state.read():
+        user_utxos = chain_state.utxo_set.get_user_utxos(user)
+    return jsonify(user_utxos)
 
 
 @app.route("/transactions/<transaction_hash>", methods=['GET'])
 def get_transaction(transaction_hash):
-    blockchain_base = get_blockchain_from_memory()
-    return jsonify(blockchain_base.get_transaction(transaction_hash))
+    return jsonify(chain_state.get_transaction(transaction_hash))
+
+
+@app.route("/headers", methods=['GET'])
+def get_headers():
+    from_height = request.args.get("from", default=0, type=int)
+    count = request.args.get("count", default=MAX_HEADERS_PER_REQUEST, type=int)
+    return jsonify(chain_state.get_headers(from_height, count))
+
+
+@app.route("/proof/<transaction_hash>", methods=['GET'])
+def get_transaction_proof(transaction_hash):
+    transaction_proof = chain_state.get_transaction_proof(transaction_hash)
+    if not transaction_proof:
+        return "Transaction not found", 404
+    return Response(json.dumps(transaction_proof), mimetype="application/json")
+
+
+@app.route("/stats", methods=['GET'])
+def get_stats():
+    return jsonify({"script_cache": script_cache.stats,
+                    "transaction_validation_pool": transaction_validation_pool.stats,
+                    "block_validation_pool": block_validation_pool.stats})
 
 
 @app.route("/new_node_advertisement", methods=['POST'])
@@ -82,11 +379,13 @@ def known_node_request():
 
 
 def main():
-    global network
-    my_node = Node(MY_HOSTNAME)
+    global network, mem_pool
     network = Network(my_node)
     network.join_network()
-    app.run()
+    chain_state.load()
+    mem_pool = MemPool.from_memory()
+    serve(app, host=os.environ.get("IP", "127.0.0.1"), port=int(os.environ.get("PORT", 5000)),
+          threads=SERVER_THREADS)
 
 
 if __name__ == "__main__":
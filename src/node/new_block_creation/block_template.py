@@ -0,0 +1,83 @@
+import heapq
+
+from common.mem_pool import MemPool
+from common.merkle_tree import MerkleTree
+from common.values import MAX_BLOCK_SIZE, MAX_BLOCK_TRANSACTIONS
+
+COINBASE_SIZE_RESERVE = 1000
+MAX_CONSECUTIVE_FAILURES = 1000
+
+
+class BlockTemplate:
+    def __init__(self, transactions: list, fees: float, size: int, merkle_tree: MerkleTree):
+        self.transactions = transactions
+        self.fees = fees
+        self.size = size
+        self.merkle_tree = merkle_tree
+
+    def append(self, transaction: dict):
+        self.transactions.append(transaction)
+        self.merkle_tree.append(transaction)
+
+
+class BlockTemplateBuilder:
+    def __init__(self, mem_pool: MemPool, max_block_size: int = MAX_BLOCK_SIZE,
+                 max_number_of_transactions: int = MAX_BLOCK_TRANSACTIONS):
+        self.mem_pool = mem_pool
+        self.max_block_size = max_block_size - COINBASE_SIZE_RESERVE
+        self.max_number_of_transactions = max_number_of_transactions - 1
+
+    def build(self) -> BlockTemplate:
+        mem_pool = self.mem_pool
+        with mem_pool.lock:
+            heap = list(mem_pool.package_heap)
+            ancestors = {}
+            package_fees = {}
+            package_sizes = {}
+            selected = []
+            selected_leaf_hashes = []
+            selected_hashes = set()
+            block_size = 0
+            block_fees = 0
+            consecutive_failures = 0
+            while heap and len(selected) < self.max_number_of_transactions:
+                _, package_size, transaction_hash = heapq.heappop(heap)
+                current_package_size = package_sizes.get(transaction_hash, mem_pool.package_sizes.get(transaction_hash))
+                if transaction_hash in selected_hashes or package_size != current_package_size:
+                    continue
+                package = [transaction_hash] + list(ancestors.get(transaction_hash,
+                                                                  mem_pool.ancestors[transaction_hash]))
+                if block_size + package_size > self.max_block_size or \
+                        len(selected) + len(package) > self.max_number_of_transactions:
+                    consecutive_failures = consecutive_failures + 1
+                    if consecutive_failures > MAX_CONSECUTIVE_FAILURES:
+                        break
+                    continue
+                consecutive_failures = 0
+                package.sort(key=lambda package_hash: len(mem_pool.ancestors[package_hash]))
+                for package_hash in package:
+                    selected.append(mem_pool.transactions[package_hash])
+                    selected_leaf_hashes.append(mem_pool.leaf_hashes[package_hash])
+                    selected_hashes.add(package_hash)
+                    block_size = block_size + mem_pool.sizes[package_hash]
+                    block_fees = block_fees + mem_pool.fees[package_hash]
+                package_hashes = frozenset(package)
+                updated_descendants = set()
+                stack = [child for package_hash in package for child in mem_pool.children[package_hash]]
+                while stack:
+                    descendant = stack.pop()
+                    if descendant in selected_hashes or descendant in updated_descendants:
+                        continue
+                    descendant_ancestors = ancestors.get(descendant, mem_pool.ancestors[descendant])
+                    selected_ancestors = descendant_ancestors & package_hashes
+                    ancestors[descendant] = descendant_ancestors - selected_ancestors
+                    package_fees[descendant] = package_fees.get(descendant, mem_pool.package_fees[descendant]) - sum(
+                        mem_pool.fees[ancestor] for ancestor in selected_ancestors)
+                    package_sizes[descendant] = package_sizes.get(descendant, mem_pool.package_sizes[descendant]) - sum(
+                        mem_pool.sizes[ancestor] for ancestor in selected_ancestors)
+                    updated_descendants.add(descendant)
+                    stack.extend(mem_pool.children[descendant])
+                for descendant in updated_descendants:
+                    heapq.heappush(heap, (-package_fees[descendant] / package_sizes[descendant],
+                                          package_sizes[descendant], descendant))
+        return BlockTemplate(selected, block_fees, block_size, MerkleTree(selected_leaf_hashes))
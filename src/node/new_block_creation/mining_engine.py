@@ -0,0 +1,37 @@
+import hashlib
+import json
+
+from common.block import BlockHeader
+
+
+class HeaderHasher:
+    def __init__(self, block_header: BlockHeader):
+        header_content = {
+            "previous_block_hash": block_header.previous_block_hash,
+            "merkle_root": block_header.merkle_root,
+            "timestamp": block_header.timestamp,
+            "nonce": 0
+        }
+        serialized_header = json.dumps(header_content)
+        prefix = serialized_header[:-len("0}")]
+        self.midstate = hashlib.sha256(prefix.encode("utf-8"))
+
+    def get_digest(self, nonce: int) -> bytes:
+        header_hash = self.midstate.copy()
+        header_hash.update(b"%d}" % nonce)
+        return header_hash.digest()
+
+    def get_hash(self, nonce: int) -> str:
+        return self.get_digest(nonce).hex()
+
+    def search(self, first_nonce: int, stride: int, number_of_nonces: int, number_of_leading_zeros: int) -> int:
+        target = 1 << (256 - 4 * number_of_leading_zeros)
+        midstate = self.midstate
+        nonce = first_nonce
+        for _ in range(number_of_nonces):
+            header_hash = midstate.copy()
+            header_hash.update(b"%d}" % nonce)
+            if int.from_bytes(header_hash.digest(), "big") < target:
+                return nonce
+            nonce = nonce + stride
+        return None
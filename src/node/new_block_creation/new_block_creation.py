@@ -1,17 +1,23 @@
-import json
+import time
 from datetime import datetime
 
+import requests
+
 from blockchain_users.miner import private_key as miner_private_key
 from common.block import Block, BlockHeader
 from common.block_reward import BLOCK_REWARD
-from common.io_blockchain import get_blockchain_from_memory
-from common.io_mem_pool import get_transactions_from_memory
-from common.merkle_tree import get_merkle_root
+from common.io_blockchain import get_tip_from_memory
+from common.mem_pool import MemPool
 from common.network import Network
 from common.owner import Owner
 from common.transaction_output import TransactionOutput
-from common.utils import calculate_hash
 from common.values import NUMBER_OF_LEADING_ZEROS
+from node.new_block_creation.block_template import BlockTemplateBuilder
+from node.new_block_creation.mining_engine import HeaderHasher
+from node.new_block_creation.parallel_mining import ParallelMiner
+
+NONCES_PER_SEARCH = 100000
+TIP_POLL_INTERVAL = 1
 
 
 class BlockException(Exception):
@@ -21,83 +27,82 @@ class BlockException(Exception):
 
 
 class ProofOfWork:
-    def __init__(self, network: Network):
+    def __init__(self, network: Network, processes: int = 1, mem_pool: MemPool = None):
         self.network = network
-        self.blockchain = get_blockchain_from_memory()
+        self._mem_pool = mem_pool
+        self.miner = ParallelMiner(processes) if processes != 1 else None
+        self.blockchain = get_tip_from_memory()
         self.new_block = None
+        self.last_tip_poll = None
 
-    @staticmethod
-    def get_nonce(block_header: BlockHeader) -> int:
-        block_header_hash = ""
-        nonce = block_header.nonce
-        starting_zeros = "".join([str(0)
-                                 for _ in range(NUMBER_OF_LEADING_ZEROS)])
-        while not block_header_hash.startswith(starting_zeros):
-            nonce = nonce + 1
-            block_header_content = {
-                "previous_block_hash": block_header.previous_block_hash,
-                "merkle_root": block_header.merkle_root,
-                "timestamp": block_header.timestamp,
-                "nonce": nonce
-            }
-            block_header_hash = calculate_hash(
-                json.dumps(block_header_content))
+    @property
+    def mem_pool(self) -> MemPool:
+        if self._mem_pool is None:
+            self._mem_pool = MemPool.from_memory()
+        return self._mem_pool
+
+    def get_nonce(self, block_header: BlockHeader) -> int:
+        header_hasher = HeaderHasher(block_header)
+        nonce = None
+        first_nonce = block_header.nonce + 1
+        while nonce is None:
+            if self.is_tip_stale():
+                return None
+            nonce = header_hasher.search(first_nonce, 1, NONCES_PER_SEARCH, NUMBER_OF_LEADING_ZEROS)
+            first_nonce = first_nonce + NONCES_PER_SEARCH
         return nonce
 
+    def is_tip_stale(self) -> bool:
+        now = time.monotonic()
+        if now - self.last_tip_poll < TIP_POLL_INTERVAL:
+            return False
+        self.last_tip_poll = now
+        try:
+            return self.network.node.get_tip()["hash"] != self.blockchain.block_header.hash
+        except requests.exceptions.RequestException:
+            return False
+
     def create_new_block(self):
-        transactions = get_transactions_from_memory()
+        block_template = BlockTemplateBuilder(self.mem_pool).build()
+        transactions = block_template.transactions
         if transactions:
-            transaction_fees = self.get_transaction_fees(transactions)
-            coinbase_transaction = self.get_coinbase_transaction(
-                transaction_fees)
-            transactions.append(coinbase_transaction)
+            coinbase_transaction = self.get_coinbase_transaction(block_template.fees)
+            block_template.append(coinbase_transaction)
             block_header = BlockHeader(
-                merkle_root=get_merkle_root(transactions),
+                merkle_root=block_template.merkle_tree.root,
                 previous_block_hash=self.blockchain.block_header.hash,
                 timestamp=datetime.timestamp(datetime.now()),
                 nonce=0
             )
-            block_header.nonce = self.get_nonce(block_header)
+            self.last_tip_poll = time.monotonic()
+            if self.miner:
+                nonce = self.miner.get_nonce(block_header, self.is_tip_stale)
+            else:
+                nonce = self.get_nonce(block_header)
+            if nonce is None:
+                raise BlockException("", "Mining cancelled")
+            block_header.nonce = nonce
             block_header.hash = block_header.get_hash()
             self.new_block = Block(
                 transactions=transactions, block_header=block_header)
         else:
             raise BlockException("", "No transaction in mem_pool")
 
-    def get_transaction_fees(self, transactions: list) -> int:
-        transaction_fees = 0
-        for transaction in transactions:
-            input_amount = 0
-            output_amount = 0
-            for transaction_input in transaction["inputs"]:
-                utxo = self.blockchain.get_transaction_from_utxo(
-                    transaction_input["transaction_hash"])
-                if utxo:
-                    utxo_amount = utxo["outputs"][transaction_input["output_index"]]["amount"]
-                    input_amount = input_amount + utxo_amount
-            for transaction_output in transaction["outputs"]:
-                output_amount = output_amount + transaction_output["amount"]
-            transaction_fees = transaction_fees + (input_amount-output_amount)
-        return transaction_fees
-
-    @staticmethod
-    def get_coinbase_transaction(transaction_fees: float) -> dict:
+    def get_coinbase_transaction(self, transaction_fees: float) -> dict:
         owner = Owner(private_key=miner_private_key)
         transaction_output = TransactionOutput(
             amount=transaction_fees + BLOCK_REWARD,
             public_key_hash=owner.public_key_hash
         )
         return {"inputs": [],
-                "outputs": [transaction_output.to_dict()]}
+                "outputs": [transaction_output.to_dict()],
+                "height": self.blockchain.height + 1}
 
-    def broadcast(self):
-        node_list = self.network.known_nodes
-        for node in node_list:
-            if node.hostname != self.network.node.hostname:
-                block_content = {
-                    "block": {
-                        "header": self.new_block.block_header.to_dict,
-                        "transactions": self.new_block.transactions
-                    }
-                }
-                node.send_new_block(block_content)
+    def broadcast(self) -> dict:
+        block_content = {
+            "block": {
+                "header": self.new_block.block_header.to_dict,
+                "transactions": self.new_block.transactions
+            }
+        }
+        return self.network.node.send_new_block(block_content, wait=True).json()
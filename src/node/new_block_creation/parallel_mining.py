@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+import queue
+
+from common.block import BlockHeader
+from common.values import NUMBER_OF_LEADING_ZEROS
+from node.new_block_creation.mining_engine import HeaderHasher
+
+NONCES_PER_CANCELLATION_CHECK = 10000
+
+
+def search_nonces(block_header: BlockHeader, first_nonce: int, stride: int, number_of_leading_zeros: int,
+                  cancel_event, result_queue):
+    header_hasher = HeaderHasher(block_header)
+    nonce = first_nonce
+    while not cancel_event.is_set():
+        found_nonce = header_hasher.search(nonce, stride, NONCES_PER_CANCELLATION_CHECK, number_of_leading_zeros)
+        if found_nonce is not None:
+            result_queue.put(found_nonce)
+            cancel_event.set()
+            return
+        nonce = nonce + NONCES_PER_CANCELLATION_CHECK * stride
+
+
+class ParallelMiner:
+    def __init__(self, processes: int = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.cancel_event = multiprocessing.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def get_nonce(self, block_header: BlockHeader, is_cancelled=None) -> int:
+        result_queue = multiprocessing.Queue()
+        self.cancel_event.clear()
+        workers = [
+            multiprocessing.Process(
+                target=search_nonces,
+                args=(block_header, block_header.nonce + 1 + i, self.processes, NUMBER_OF_LEADING_ZEROS,
+                      self.cancel_event, result_queue),
+                daemon=True
+            )
+            for i in range(self.processes)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            while True:
+                try:
+                    return result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if is_cancelled is not None and is_cancelled():
+                        self.cancel()
+                    if self.cancel_event.is_set() and not any(worker.is_alive() for worker in workers):
+                        try:
+                            return result_queue.get_nowait()
+                        except queue.Empty:
+                            return None
+        finally:
+            self.cancel_event.set()
+            for worker in workers:
+                worker.join()
@@ -1,6 +1,8 @@
 from common.block import Block, BlockHeader
-from common.io_blockchain import store_blockchain_in_memory
+from common.io_utxo_set import get_utxo_set_from_memory
+from common.utxo_set import UTXOSet, UTXOSetException, UTXOView
 from common.values import NUMBER_OF_LEADING_ZEROS
+from node.transaction_validation.signature_verification import SignatureBatchVerifier, signature_batch_verifier
 from node.transaction_validation.transaction_validation import Transaction
 from common.block_reward import BLOCK_REWARD
 from common.network import Network
@@ -13,9 +15,12 @@ class NewBlockException(Exception):
 
 
 class NewBlock:
-    def __init__(self, blockchain: Block, network: Network):
+    def __init__(self, blockchain: Block, network: Network, utxo_set: UTXOSet = None,
+                 signature_verifier: SignatureBatchVerifier = signature_batch_verifier):
         self.blockchain = blockchain
         self.network = network
+        self.signature_verifier = signature_verifier
+        self.utxo_set = utxo_set if utxo_set is not None else get_utxo_set_from_memory()
         self.new_block = None
 
     def receive(self, new_block: dict):
@@ -46,30 +51,30 @@ class NewBlock:
     def _validate_transactions(self):
         input_amount = 0
         output_amount = 0
+        signatures = []
+        block_utxo_view = UTXOView(self.utxo_set)
         for transaction in self.new_block.transactions:
-            transaction_validation = Transaction(self.blockchain, self.network)
+            transaction_validation = Transaction(
+                self.blockchain, self.network, block_utxo_view)
             transaction_validation.receive(transaction=transaction)
-            transaction_validation.validate()
+            transaction_validation.validate(signature_collector=signatures)
             input_amount = input_amount + transaction_validation.get_total_amount_in_inputs()
             output_amount = output_amount + transaction_validation.get_total_amount_in_outputs()
+            try:
+                block_utxo_view.apply_transaction(transaction)
+            except UTXOSetException as utxo_set_exception:
+                raise NewBlockException(utxo_set_exception.expression, utxo_set_exception.message)
+        self._validate_signatures(signatures)
         self._validate_funds(input_amount, output_amount)
 
+    def _validate_signatures(self, signatures: list):
+        if not self.signature_verifier.verify(signatures):
+            print('Transaction signature validation failed')
+            raise NewBlockException("", "Transaction signature validation failed")
+
     @staticmethod
     def _validate_funds(input_amount: float, output_amount: float):
-        assert input_amount + BLOCK_REWARD == output_amount
-
-    def add(self):
-        self.new_block.previous_block = self.blockchain
-        store_blockchain_in_memory(self.new_block)
-
-    def broadcast(self):
-        node_list = self.network.known_nodes
-        for node in node_list:
-            if node.hostname != self.network.node.hostname:
-                block_content = {
-                    "block": {
-                        "header": self.new_block.block_header.to_dict,
-                        "transactions": self.new_block.transactions
-                    }
-                }
-                node.send_new_block(block_content)
+        if input_amount + BLOCK_REWARD != output_amount:
+            print('Block outputs do not match inputs and block reward')
+            raise NewBlockException(f"inputs ({input_amount}), outputs ({output_amount})",
+                                    "Block outputs do not match inputs and block reward")
@@ -1,11 +1,10 @@
-import binascii
 import json
-
-from Crypto.Hash import SHA256
-from Crypto.PublicKey import RSA
-from Crypto.Signature import pkcs1_15
+from functools import lru_cache
 
 from common.utils import calculate_hash
+from node.transaction_validation.signature_verification import verify_signature
+
+COMPILED_SCRIPT_CACHE_SIZE = 4096
 
 
 class Stack:
@@ -20,12 +19,17 @@ class Stack:
 
 
 class StackScript(Stack):
-    def __init__(self, transaction_data: dict):
+    def __init__(self, signature_message: bytes, signature_collector: list = None):
         super().__init__()
-        for count, tx_input in enumerate(transaction_data["inputs"]):
-            tx_input.pop("unlocking_script")
-            transaction_data["inputs"][count] = tx_input
-        self.transaction_data = transaction_data
+        self.signature_message = signature_message
+        self.signature_collector = signature_collector
+
+    def execute(self, compiled_script: tuple):
+        for operation, element in compiled_script:
+            if operation is None:
+                self.push(element)
+            else:
+                operation(self)
 
     def op_dup(self):
         last_element = self.pop()
@@ -45,12 +49,36 @@ class StackScript(Stack):
     def op_checksig(self):
         public_key = self.pop()
         signature = self.pop()
-        signature_decoded = binascii.unhexlify(signature.encode("utf-8"))
-        public_key_bytes = public_key.encode("utf-8")
-        public_key_object = RSA.import_key(
-            binascii.unhexlify(public_key_bytes))
-        transaction_bytes = json.dumps(
-            self.transaction_data, indent=2).encode('utf-8')
-        transaction_hash = SHA256.new(transaction_bytes)
-        pkcs1_15.new(public_key_object).verify(
-            transaction_hash, signature_decoded)
+        if self.signature_collector is not None:
+            self.signature_collector.append(
+                (public_key, self.signature_message, signature))
+        else:
+            assert verify_signature(public_key, self.signature_message, signature)
+
+
+OPERATIONS = {
+    "OP_DUP": StackScript.op_dup,
+    "OP_HASH160": StackScript.op_hash160,
+    "OP_EQUAL_VERIFY": StackScript.op_equal_verify,
+    "OP_CHECKSIG": StackScript.op_checksig,
+}
+
+
+@lru_cache(maxsize=COMPILED_SCRIPT_CACHE_SIZE)
+def compile_script(script: str) -> tuple:
+    compiled_script = []
+    for element in script.split(" "):
+        if element.startswith("OP"):
+            compiled_script.append((OPERATIONS[element], None))
+        else:
+            compiled_script.append((None, element))
+    return tuple(compiled_script)
+
+
+def get_signature_message(transaction_data: dict) -> bytes:
+    message_data = {key: value for key, value in transaction_data.items() if key != "transaction_hash"}
+    message_data["inputs"] = [
+        {key: value for key, value in tx_input.items() if key != "unlocking_script"}
+        for tx_input in transaction_data["inputs"]
+    ]
+    return json.dumps(message_data, indent=2).encode('utf-8')
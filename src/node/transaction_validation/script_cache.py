@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+
+SCRIPT_CACHE_SIZE = 100000
+
+
+class ScriptCache:
+    def __init__(self, max_size: int = SCRIPT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits = self.hits + 1
+                return True
+            self.misses = self.misses + 1
+            return False
+
+    def add(self, key: tuple):
+        with self.lock:
+            self.entries[key] = None
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+script_cache = ScriptCache()
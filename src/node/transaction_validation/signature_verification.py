@@ -0,0 +1,86 @@
+import binascii
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature import pkcs1_15
+
+PUBLIC_KEY_CACHE_SIZE = 1024
+MIN_SIGNATURES_PER_PROCESS = 8
+
+
+@lru_cache(maxsize=PUBLIC_KEY_CACHE_SIZE)
+def import_public_key(public_key_hex: str) -> RSA.RsaKey:
+    return RSA.import_key(binascii.unhexlify(public_key_hex.encode("utf-8")))
+
+
+def verify_signature(public_key_hex: str, message: bytes, signature_hex: str) -> bool:
+    try:
+        public_key_object = import_public_key(public_key_hex)
+        signature = binascii.unhexlify(signature_hex.encode("utf-8"))
+        pkcs1_15.new(public_key_object).verify(SHA256.new(message), signature)
+    except (ValueError, TypeError, binascii.Error):
+        return False
+    return True
+
+
+def verify_signatures(signatures: list) -> bool:
+    for public_key_hex, message, signature_hex in signatures:
+        if not verify_signature(public_key_hex, message, signature_hex):
+            return False
+    return True
+
+
+def verify_signature_groups(signature_groups: list) -> list:
+    return [verify_signatures(signatures) for signatures in signature_groups]
+
+
+class SignatureBatchVerifier:
+    def __init__(self, processes: int = None):
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def verify(self, signatures: list) -> bool:
+        unique_signatures = list(dict.fromkeys(signatures))
+        if self.processes == 1 or len(unique_signatures) < 2 * MIN_SIGNATURES_PER_PROCESS:
+            return verify_signatures(unique_signatures)
+        number_of_batches = min(self.processes * 4, len(unique_signatures) // MIN_SIGNATURES_PER_PROCESS)
+        batches = [unique_signatures[i::number_of_batches] for i in range(number_of_batches)]
+        pending = {self.executor.submit(verify_signatures, batch) for batch in batches}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if not all(future.result() for future in done):
+                for future in pending:
+                    future.cancel()
+                return False
+        return True
+
+    def verify_each(self, signature_groups: list) -> list:
+        number_of_signatures = sum(len(signatures) for signatures in signature_groups)
+        if self.processes == 1 or number_of_signatures < 2 * MIN_SIGNATURES_PER_PROCESS:
+            return verify_signature_groups(signature_groups)
+        number_of_batches = min(self.processes * 4, len(signature_groups),
+                                number_of_signatures // MIN_SIGNATURES_PER_PROCESS)
+        batches = [signature_groups[i::number_of_batches] for i in range(number_of_batches)]
+        verified = [False] * len(signature_groups)
+        for batch_index, batch_results in enumerate(self.executor.map(verify_signature_groups, batches)):
+            verified[batch_index::number_of_batches] = batch_results
+        return verified
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+signature_batch_verifier = SignatureBatchVerifier()
@@ -1,11 +1,17 @@
-import copy
-
-import requests
-
 from common.block import Block
-from common.io_mem_pool import get_transactions_from_memory, store_transactions_in_memory
+from common.inventory import INVENTORY_TRANSACTION
+from common.io_utxo_set import get_utxo_set_from_memory
+from common.mem_pool import MemPool, MemPoolException
 from common.network import Network
-from node.transaction_validation.script import StackScript
+from common.utils import calculate_transaction_content_hash, calculate_transaction_hash
+from common.utxo_set import UTXOSet, UTXOSetException, UTXOView, get_verified_transaction_hash
+from node.transaction_validation.script import StackScript, compile_script, get_signature_message
+from node.transaction_validation.script_cache import ScriptCache, script_cache
+from node.transaction_validation.signature_verification import SignatureBatchVerifier, signature_batch_verifier
+
+TRANSACTION_ACCEPTED = "accepted"
+TRANSACTION_KNOWN = "known"
+TRANSACTION_REJECTED = "rejected"
 
 
 class TransactionException(Exception):
@@ -15,72 +21,97 @@ class TransactionException(Exception):
 
 
 class Transaction:
-    def __init__(self, blockchain: Block, network: Network):
+    def __init__(self, blockchain: Block, network: Network, utxo_set: UTXOSet = None,
+                 script_cache: ScriptCache = script_cache, mem_pool: MemPool = None):
         self.blockchain = blockchain
         self.network = network
+        self._utxo_set = utxo_set
+        self._mem_pool = mem_pool
+        self.script_cache = script_cache
         self.transaction_data = {}
+        self.signature_message = None
         self.inputs = []
         self.outputs = []
         self.is_valid = False
         self.is_funds_sufficient = False
+        self.pending_script_cache_keys = []
+
+    @property
+    def utxo_set(self) -> UTXOSet:
+        if self._utxo_set is None:
+            self._utxo_set = get_utxo_set_from_memory()
+        return self._utxo_set
+
+    @property
+    def mem_pool(self) -> MemPool:
+        if self._mem_pool is None:
+            self._mem_pool = MemPool.from_memory()
+        return self._mem_pool
 
     def receive(self, transaction: dict):
         self.transaction_data = transaction
+        self.signature_message = None
         self.inputs = transaction["inputs"]
         self.outputs = transaction["outputs"]
 
     @property
     def is_new(self):
-        current_transactions = get_transactions_from_memory()
-        if self.transaction_data in current_transactions:
-            return False
-        return True
-
-    def execute_script(self, unlocking_script, locking_script):
-        unlocking_script_list = unlocking_script.split(" ")
-        locking_script_list = locking_script.split(" ")
-        transaction_data = copy.deepcopy(self.transaction_data)
-        if "transaction_hash" in transaction_data:
-            transaction_data.pop("transaction_hash")
-        stack_script = StackScript(transaction_data)
-        for element in unlocking_script_list:
-            if element.startswith("OP"):
-                class_method = getattr(StackScript, element.lower())
-                class_method(stack_script)
-            else:
-                stack_script.push(element)
-        for element in locking_script_list:
-            if element.startswith("OP"):
-                class_method = getattr(StackScript, element.lower())
-                class_method(stack_script)
-            else:
-                stack_script.push(element)
+        return calculate_transaction_hash(self.transaction_data) not in self.mem_pool
 
-    def validate(self):
-        for tx_input in self.inputs:
+    def get_utxo(self, transaction_hash: str, output_index: int) -> dict:
+        try:
+            return self.utxo_set.get(transaction_hash, output_index)
+        except KeyError:
+            if self._mem_pool is not None:
+                output = self._mem_pool.get_output(transaction_hash, output_index)
+                if output is not None:
+                    return output
+            raise
+
+    def execute_script(self, unlocking_script, locking_script, signature_collector: list = None):
+        if self.signature_message is None:
+            self.signature_message = get_signature_message(self.transaction_data)
+        stack_script = StackScript(self.signature_message, signature_collector)
+        stack_script.execute(compile_script(unlocking_script))
+        stack_script.execute(compile_script(locking_script))
+
+    def validate(self, signature_collector: list = None):
+        try:
+            get_verified_transaction_hash(self.transaction_data)
+        except UTXOSetException as utxo_set_exception:
+            raise TransactionException(utxo_set_exception.expression, utxo_set_exception.message)
+        content_hash = calculate_transaction_content_hash(self.transaction_data)
+        for input_index, tx_input in enumerate(self.inputs):
             transaction_hash = tx_input["transaction_hash"]
             output_index = tx_input["output_index"]
             try:
-                locking_script = self.blockchain.get_locking_script_from_utxo(
-                    transaction_hash, output_index)
+                locking_script = self.get_utxo(
+                    transaction_hash, output_index)["locking_script"]
             except Exception:
                 raise TransactionException(
                     f"{transaction_hash}:{output_index}", "Could not find locking script for utxo")
+            cache_key = (content_hash, input_index, locking_script)
+            if cache_key in self.script_cache:
+                self.is_valid = True
+                continue
             try:
                 self.execute_script(
-                    tx_input["unlocking_script"], locking_script)
+                    tx_input["unlocking_script"], locking_script, signature_collector)
                 self.is_valid = True
             except Exception:
                 print('Transaction script validation failed')
                 raise TransactionException(
                     f"UTXO ({transaction_hash}:{output_index})", "Transaction script validation failed")
+            if signature_collector is None:
+                self.script_cache.add(cache_key)
+            else:
+                self.pending_script_cache_keys.append(cache_key)
 
     def get_total_amount_in_inputs(self) -> int:
         total_in = 0
         for tx_input in self.inputs:
-            transaction_data = self.blockchain.get_transaction_from_utxo(
-                tx_input["transaction_hash"])
-            utxo_amount = transaction_data["outputs"][tx_input["output_index"]]["amount"]
+            utxo_amount = self.get_utxo(
+                tx_input["transaction_hash"], tx_input["output_index"])["amount"]
             total_in = total_in + utxo_amount
         return total_in
 
@@ -95,24 +126,132 @@ class Transaction:
         inputs_total = self.get_total_amount_in_inputs()
         outputs_total = self.get_total_amount_in_outputs()
         try:
-            assert inputs_total == outputs_total
+            assert inputs_total >= outputs_total
             self.is_funds_sufficient = True
         except AssertionError:
-            print('Transaction inputs and outputs did not match')
+            print('Transaction inputs do not cover outputs')
             raise TransactionException(f"inputs ({inputs_total}), outputs ({outputs_total})",
-                                       "Transaction inputs and outputs did not match")
+                                       "Transaction inputs do not cover outputs")
 
     def broadcast(self):
-        node_list = self.network.known_nodes
-        for node in node_list:
-            if node.hostname != self.network.node.hostname:
-                try:
-                    node.send_transaction(self.transaction_data)
-                except requests.ConnectionError:
-                    pass
+        self.network.announce(INVENTORY_TRANSACTION, calculate_transaction_hash(self.transaction_data))
 
     def store(self):
         if self.is_valid and self.is_funds_sufficient:
-            current_transactions = get_transactions_from_memory()
-            current_transactions.append(self.transaction_data)
-            store_transactions_in_memory(current_transactions)
+            transaction_fee = self.get_total_amount_in_inputs() - self.get_total_amount_in_outputs()
+            try:
+                self.mem_pool.add(self.transaction_data, transaction_fee)
+            except MemPoolException as mem_pool_exception:
+                print('Transaction conflicts with the mem_pool')
+                raise TransactionException(mem_pool_exception.expression, mem_pool_exception.message)
+
+
+def get_batch_result(transaction_hash: str, status: str, error: str = None) -> dict:
+    batch_result = {"transaction_hash": transaction_hash, "status": status}
+    if error is not None:
+        batch_result["error"] = error
+    return batch_result
+
+
+class TransactionBatch:
+    def __init__(self, blockchain: Block, network: Network, utxo_set: UTXOSet, mem_pool: MemPool,
+                 script_cache: ScriptCache = script_cache,
+                 signature_verifier: SignatureBatchVerifier = signature_batch_verifier):
+        self.blockchain = blockchain
+        self.network = network
+        self.utxo_set = utxo_set
+        self.mem_pool = mem_pool
+        self.script_cache = script_cache
+        self.signature_verifier = signature_verifier
+        self.results = []
+        self.accepted_hashes = []
+
+    def _validate_scripts_and_funds(self, transaction_data: dict, batch_utxo_view: UTXOView,
+                                    signatures: list) -> tuple:
+        transaction = Transaction(self.blockchain, self.network, batch_utxo_view, self.script_cache,
+                                  mem_pool=self.mem_pool)
+        transaction.receive(transaction=transaction_data)
+        transaction.validate(signature_collector=signatures)
+        transaction.validate_funds()
+        transaction_fee = transaction.get_total_amount_in_inputs() - transaction.get_total_amount_in_outputs()
+        try:
+            batch_utxo_view.apply_transaction(transaction_data)
+        except UTXOSetException as utxo_set_exception:
+            raise TransactionException(utxo_set_exception.expression, utxo_set_exception.message)
+        return transaction, transaction_fee
+
+    def validate(self, transactions_data: list) -> list:
+        self.results = [None] * len(transactions_data)
+        self.accepted_hashes = []
+        positions = []
+        for position, transaction_data in enumerate(transactions_data):
+            try:
+                transaction_hash = calculate_transaction_hash(transaction_data)
+            except (AttributeError, KeyError, TypeError) as malformed_exception:
+                self.results[position] = get_batch_result(
+                    None, TRANSACTION_REJECTED, f"Malformed transaction: {malformed_exception}")
+                continue
+            if transaction_hash in self.mem_pool:
+                self.results[position] = get_batch_result(transaction_hash, TRANSACTION_KNOWN)
+                continue
+            positions.append((position, transaction_hash))
+        signatures_valid = {}
+        candidates = self._get_candidates(transactions_data, positions, signatures_valid)
+        while any(position not in signatures_valid for position, *_ in candidates):
+            unverified_candidates = [candidate for candidate in candidates if candidate[0] not in signatures_valid]
+            verified = self.signature_verifier.verify_each([candidate[4] for candidate in unverified_candidates])
+            for (position, transaction_hash, *_), is_signature_valid in zip(unverified_candidates, verified):
+                signatures_valid[position] = is_signature_valid
+                if not is_signature_valid:
+                    self.results[position] = get_batch_result(
+                        transaction_hash, TRANSACTION_REJECTED, "Transaction script validation failed")
+            if all(verified):
+                break
+            candidates = self._get_candidates(transactions_data, positions, signatures_valid)
+        rejected_hashes = set()
+        for position, transaction_hash, transaction, transaction_fee, _ in candidates:
+            spent_hashes = {tx_input["transaction_hash"] for tx_input in transaction.inputs}
+            if spent_hashes & rejected_hashes:
+                error = "Transaction spends a rejected transaction"
+            else:
+                error = self._store(transaction, transaction_fee)
+            if error is not None:
+                rejected_hashes.add(transaction_hash)
+                self.results[position] = get_batch_result(transaction_hash, TRANSACTION_REJECTED, error)
+                continue
+            self.accepted_hashes.append(transaction_hash)
+            self.results[position] = get_batch_result(transaction_hash, TRANSACTION_ACCEPTED)
+        return self.results
+
+    def _get_candidates(self, transactions_data: list, positions: list, signatures_valid: dict) -> list:
+        batch_utxo_view = UTXOView(self.utxo_set)
+        candidates = []
+        for position, transaction_hash in positions:
+            if signatures_valid.get(position) is False:
+                continue
+            try:
+                signatures = []
+                transaction, transaction_fee = self._validate_scripts_and_funds(
+                    transactions_data[position], batch_utxo_view, signatures)
+            except TransactionException as transaction_exception:
+                self.results[position] = get_batch_result(
+                    transaction_hash, TRANSACTION_REJECTED, transaction_exception.message)
+                continue
+            except (AttributeError, KeyError, TypeError) as malformed_exception:
+                self.results[position] = get_batch_result(
+                    transaction_hash, TRANSACTION_REJECTED, f"Malformed transaction: {malformed_exception}")
+                continue
+            candidates.append((position, transaction_hash, transaction, transaction_fee, signatures))
+        return candidates
+
+    def _store(self, transaction: Transaction, transaction_fee: float) -> str:
+        try:
+            self.mem_pool.add(transaction.transaction_data, transaction_fee)
+        except MemPoolException as mem_pool_exception:
+            return mem_pool_exception.message
+        for cache_key in transaction.pending_script_cache_keys:
+            self.script_cache.add(cache_key)
+        return None
+
+    def broadcast(self):
+        self.network.announce_all(INVENTORY_TRANSACTION, self.accepted_hashes)
@@ -0,0 +1,72 @@
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+MAX_QUEUED_VALIDATIONS = 1024
+MAX_QUEUED_VALIDATIONS_PER_CLIENT = 64
+
+
+class ValidationQueueFullException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+class ClientRateLimitException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
+
+
+class ValidationPool:
+    def __init__(self, max_workers: int = None, max_queued: int = MAX_QUEUED_VALIDATIONS,
+                 max_queued_per_client: int = MAX_QUEUED_VALIDATIONS_PER_CLIENT, name: str = "validation"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self.max_queued = max_queued
+        self.max_queued_per_client = max_queued_per_client
+        self.queued = 0
+        self.queued_per_client = Counter()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.queued
+
+    @property
+    def stats(self) -> dict:
+        with self.lock:
+            return {"workers": self.max_workers, "queued": self.queued, "max_queued": self.max_queued}
+
+    def _release(self, client: str):
+        with self.lock:
+            self.queued = self.queued - 1
+            self.queued_per_client[client] = self.queued_per_client[client] - 1
+            if self.queued_per_client[client] <= 0:
+                del self.queued_per_client[client]
+
+    def _run(self, client: str, task, *args):
+        try:
+            return task(*args)
+        except Exception as exception:
+            print(f"Validation from client {client} failed: {exception}")
+            raise
+        finally:
+            self._release(client)
+
+    def submit(self, client: str, task, *args) -> Future:
+        with self.lock:
+            if self.queued >= self.max_queued:
+                raise ValidationQueueFullException(self.queued, "Validation queue is full")
+            if self.queued_per_client[client] >= self.max_queued_per_client:
+                raise ClientRateLimitException(client, "Too many pending validations from client")
+            self.queued = self.queued + 1
+            self.queued_per_client[client] = self.queued_per_client[client] + 1
+        try:
+            return self.executor.submit(self._run, client, task, *args)
+        except RuntimeError:
+            self._release(client)
+            raise
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -1,9 +1,21 @@
 import requests
 
+from common.block import BlockHeader
+from common.initialize_default_blockchain import get_default_block_hashes
+from common.merkle_tree import get_leaf_hash, verify_merkle_proof
+from common.node import CONNECT_TIMEOUT, READ_TIMEOUT, get_session
 from common.transaction import Transaction
 from common.transaction_input import TransactionInput
 from common.transaction_output import TransactionOutput
 from common.owner import Owner
+from common.utils import calculate_transaction_hash
+from common.values import NUMBER_OF_LEADING_ZEROS
+
+
+class WalletException(Exception):
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
 
 
 class Node:
@@ -11,20 +23,110 @@ class Node:
         ip = "127.0.0.1"
         port = 5000
         self.base_url = f"http://{ip}:{port}/"
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
 
     def send(self, transaction_data: dict) -> requests.Response:
         url = f"{self.base_url}transactions"
-        req_return = requests.post(url, json=transaction_data)
+        req_return = get_session().post(url, json=transaction_data, params={"wait": "true"}, timeout=self.timeout)
         req_return.raise_for_status()
         return req_return
 
+    def send_batch(self, transactions_data: list) -> list:
+        url = f"{self.base_url}transactions/batch"
+        req_return = get_session().post(url, json=transactions_data, params={"wait": "true"}, timeout=self.timeout)
+        req_return.raise_for_status()
+        return req_return.json()
+
+    def get(self, endpoint: str, params: dict = None):
+        url = f"{self.base_url}{endpoint}"
+        req_return = get_session().get(url, params=params, timeout=self.timeout)
+        req_return.raise_for_status()
+        return req_return.json()
+
+    def get_headers(self, from_height: int) -> list:
+        return self.get("headers", params={"from": from_height})
+
+    def get_proof(self, transaction_hash: str) -> dict:
+        return self.get(f"proof/{transaction_hash}")
+
 
 class Wallet:
-    def __init__(self, owner: Owner):
+    def __init__(self, owner: Owner, checkpoint_hashes: list = None):
         self.owner = owner
         self.node = Node()
+        self.checkpoint_hashes = get_default_block_hashes() if checkpoint_hashes is None else list(checkpoint_hashes)
+        self.headers = []
 
     def process_transaction(self, inputs: [TransactionInput], outputs: [TransactionOutput]) -> requests.Response:
         transaction = Transaction(inputs, outputs)
         transaction.sign(self.owner)
         return self.node.send({"transaction": transaction.transaction_data})
+
+    def process_transactions(self, transfers: list) -> list:
+        transactions_data = []
+        for inputs, outputs in transfers:
+            transaction = Transaction(inputs, outputs)
+            transaction.sign(self.owner)
+            transactions_data.append(transaction.transaction_data)
+        return self.node.send_batch(transactions_data)
+
+    def _validate_header(self, header: dict):
+        if header["height"] != len(self.headers):
+            raise WalletException(header["hash"], "Header received out of order")
+        if BlockHeader(**header["header"]).hash != header["hash"]:
+            raise WalletException(header["hash"], "Header hash does not match its content")
+        if header["height"] < len(self.checkpoint_hashes):
+            if header["hash"] != self.checkpoint_hashes[header["height"]]:
+                raise WalletException(header["hash"], "Header does not match the checkpoint")
+        elif not header["hash"].startswith("0" * NUMBER_OF_LEADING_ZEROS):
+            raise WalletException(header["hash"], "Header proof of work validation failed")
+
+    def _is_fork(self, header: dict) -> bool:
+        return bool(self.headers) and header["height"] == len(self.headers) \
+            and header["header"]["previous_block_hash"] != self.headers[-1]["hash"]
+
+    def _get_fork_height(self) -> int:
+        height = len(self.headers) - 1
+        while height >= len(self.checkpoint_hashes):
+            node_headers = self.node.get_headers(height)
+            if node_headers and node_headers[0]["hash"] == self.headers[height]["hash"]:
+                break
+            height = height - 1
+        return height + 1
+
+    def _roll_back(self, header: dict):
+        fork_height = self._get_fork_height()
+        if fork_height == len(self.headers):
+            raise WalletException(header["hash"], "Header does not extend the known headers")
+        print(f"Rolling back headers from height {len(self.headers)} to {fork_height}")
+        del self.headers[fork_height:]
+
+    def sync_headers(self) -> int:
+        new_headers = self.node.get_headers(len(self.headers))
+        while new_headers:
+            for header in new_headers:
+                if self._is_fork(header):
+                    self._roll_back(header)
+                    break
+                self._validate_header(header)
+                self.headers.append(header)
+            new_headers = self.node.get_headers(len(self.headers))
+        return len(self.headers)
+
+    def verify_transaction(self, transaction_hash: str) -> dict:
+        transaction_proof = self.node.get_proof(transaction_hash)
+        height = transaction_proof["height"]
+        if height >= len(self.headers):
+            self.sync_headers()
+        if height >= len(self.headers):
+            raise WalletException(transaction_hash, "Transaction is in an unknown block")
+        header = self.headers[height]
+        transaction = transaction_proof["transaction"]
+        try:
+            assert header["hash"] == transaction_proof["block_hash"]
+            assert calculate_transaction_hash(transaction) == transaction_hash
+            assert verify_merkle_proof(get_leaf_hash(transaction).hex(), transaction_proof["index"],
+                                       transaction_proof["proof"], header["header"]["merkle_root"])
+        except AssertionError:
+            raise WalletException(transaction_hash, "Transaction inclusion proof is invalid")
+        return transaction
@@ -1,5 +1,11 @@
+from common.block import Block, BlockHeader
 from common.initialize_default_blockchain import initialize_default_blockchain
-from common.io_blockchain import get_blockchain_from_memory
+from common.io_blockchain import append_block_to_memory, get_block_from_memory, get_blockchain_from_memory, \
+    get_blockchain_height, get_chain_from_memory, get_tip_from_memory
+from common import io_utxo_set
+from common.io_utxo_set import FILENAME as UTXO_SET_FILENAME, LOG_FILENAME as UTXO_SET_LOG_FILENAME, \
+    get_utxo_set_from_memory, store_utxo_set_changes_in_memory, store_utxo_set_in_memory
+from common.utxo_set import UTXOSet
 
 
 def test_given_two_memory_reads_from_blockchain_both_yield_same_value():
@@ -8,3 +14,105 @@ def test_given_two_memory_reads_from_blockchain_both_yield_same_value():
     second_block_read = get_blockchain_from_memory()
 
     assert first_block_read == second_block_read
+
+
+def test_given_stored_blockchain_when_get_block_from_memory_then_block_at_height_is_returned():
+    initialize_default_blockchain()
+    blockchain = get_blockchain_from_memory()
+
+    assert get_blockchain_height() == len(blockchain)
+    assert get_block_from_memory(len(blockchain) - 1) == blockchain
+    assert get_block_from_memory(0) == blockchain.previous_block.previous_block.previous_block
+
+
+def test_given_new_block_when_append_block_to_memory_then_it_becomes_the_tip():
+    initialize_default_blockchain()
+    blockchain = get_blockchain_from_memory()
+    block_header = BlockHeader(previous_block_hash=blockchain.block_header.hash,
+                               timestamp=1234.5,
+                               nonce=7,
+                               merkle_root="abcd")
+    new_block = Block(transactions=[], block_header=block_header, previous_block=blockchain)
+
+    append_block_to_memory(new_block)
+
+    assert get_tip_from_memory() == new_block
+    assert get_tip_from_memory().height == new_block.height
+    assert get_blockchain_height() == len(blockchain) + 1
+    assert get_blockchain_from_memory() == new_block
+    assert len(get_blockchain_from_memory()) == len(blockchain) + 1
+
+
+def test_given_utxo_set_stored_for_an_older_tip_when_get_utxo_set_from_memory_then_it_is_rebuilt_from_the_chain():
+    initialize_default_blockchain()
+    chain = get_chain_from_memory()
+    store_utxo_set_in_memory(UTXOSet.from_chain(chain[:-1]))
+
+    utxo_set = get_utxo_set_from_memory()
+
+    assert utxo_set.tip_hash == chain.tip.block_header.hash
+    assert utxo_set.utxos == UTXOSet.from_chain(chain).utxos
+
+
+def test_given_truncated_utxo_set_file_when_get_utxo_set_from_memory_then_it_is_rebuilt_from_the_chain():
+    initialize_default_blockchain()
+    chain = get_chain_from_memory()
+    with open(UTXO_SET_FILENAME, "r+b") as file_obj:
+        file_obj.truncate(10)
+
+    utxo_set = get_utxo_set_from_memory()
+
+    assert utxo_set.utxos == UTXOSet.from_chain(chain).utxos
+    assert get_utxo_set_from_memory().tip_hash == chain.tip.block_header.hash
+
+
+def test_given_utxo_changes_logged_after_a_snapshot_when_get_utxo_set_from_memory_then_log_is_replayed():
+    initialize_default_blockchain()
+    chain = get_chain_from_memory()
+    utxo_set = UTXOSet.from_chain(chain[:-1])
+    store_utxo_set_in_memory(utxo_set)
+    utxo_set.apply_block(chain.tip)
+
+    store_utxo_set_changes_in_memory(utxo_set)
+
+    with open(UTXO_SET_LOG_FILENAME, "rb") as file_obj:
+        assert len(file_obj.readlines()) == 1
+    loaded_utxo_set = get_utxo_set_from_memory()
+    assert loaded_utxo_set.tip_hash == chain.tip.block_header.hash
+    assert loaded_utxo_set.utxos == UTXOSet.from_chain(chain).utxos
+    assert loaded_utxo_set.log_records == 1
+
+
+def test_given_torn_utxo_log_record_when_get_utxo_set_from_memory_then_complete_records_are_replayed():
+    initialize_default_blockchain()
+    chain = get_chain_from_memory()
+    utxo_set = UTXOSet.from_chain(chain[:-1])
+    store_utxo_set_in_memory(utxo_set)
+    utxo_set.apply_block(chain.tip)
+    store_utxo_set_changes_in_memory(utxo_set)
+    with open(UTXO_SET_LOG_FILENAME, "ab") as file_obj:
+        file_obj.write(b'{"previous_tip_hash": ')
+
+    loaded_utxo_set = get_utxo_set_from_memory()
+
+    assert loaded_utxo_set.utxos == UTXOSet.from_chain(chain).utxos
+    assert loaded_utxo_set.log_records == 1
+
+
+def test_given_snapshot_interval_reached_when_store_utxo_set_changes_in_memory_then_snapshot_replaces_the_log(
+        monkeypatch):
+    monkeypatch.setattr(io_utxo_set, "UTXO_SNAPSHOT_INTERVAL", 1)
+    initialize_default_blockchain()
+    chain = get_chain_from_memory()
+    utxo_set = UTXOSet.from_chain(chain[:-2])
+    store_utxo_set_in_memory(utxo_set)
+    utxo_set.apply_block(chain[-2])
+    store_utxo_set_changes_in_memory(utxo_set)
+    utxo_set.apply_block(chain.tip)
+
+    store_utxo_set_changes_in_memory(utxo_set)
+
+    with open(UTXO_SET_LOG_FILENAME, "rb") as file_obj:
+        assert file_obj.read() == b""
+    assert utxo_set.log_records == 0
+    assert get_utxo_set_from_memory().utxos == UTXOSet.from_chain(chain).utxos
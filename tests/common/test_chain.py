@@ -0,0 +1,59 @@
+import pytest
+
+from common.block import Block, BlockHeader
+from common.chain import Chain, ChainException
+
+
+def create_blocks(number_of_blocks: int) -> list:
+    blocks = []
+    previous_block_hash = "aaaa"
+    for nonce in range(number_of_blocks):
+        block_header = BlockHeader(previous_block_hash=previous_block_hash, timestamp=1234.5, nonce=nonce,
+                                   merkle_root="abcd")
+        blocks.append(Block(transactions=[], block_header=block_header))
+        previous_block_hash = block_header.hash
+    return blocks
+
+
+def test_given_chain_when_indexed_then_blocks_are_found_by_height_and_hash():
+    blocks = create_blocks(5)
+    chain = Chain(blocks)
+
+    assert len(chain) == 5
+    assert chain.tip is blocks[-1]
+    assert chain[2] is blocks[2]
+    assert chain.get_block(blocks[3].block_header.hash) is blocks[3]
+    assert chain.get_height(blocks[1].block_header.hash) == 1
+    assert chain.get_last_blocks(2) == blocks[3:]
+    assert len(chain.tip) == 5
+    assert chain.tip.previous_block is blocks[3]
+
+
+def test_given_block_not_extending_tip_when_append_then_exception_is_raised():
+    blocks = create_blocks(3)
+    chain = Chain(blocks[:1])
+
+    with pytest.raises(ChainException):
+        chain.append(blocks[2])
+
+
+def test_given_chain_when_truncate_then_removed_blocks_are_no_longer_indexed():
+    blocks = create_blocks(4)
+    chain = Chain(blocks)
+
+    removed_blocks = chain.truncate(2)
+
+    assert removed_blocks == blocks[2:]
+    assert len(chain) == 2
+    assert blocks[3].block_header.hash not in chain
+    assert Chain.from_tip(blocks[1]).blocks == blocks[:2]
+
+
+def test_given_header_field_changes_when_hash_is_read_then_it_is_recomputed():
+    block_header = create_blocks(1)[0].block_header
+    first_hash = block_header.hash
+
+    block_header.nonce = block_header.nonce + 1
+
+    assert block_header.hash != first_hash
+    assert block_header.hash == block_header.get_hash()
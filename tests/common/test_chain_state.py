@@ -0,0 +1,162 @@
+import pytest
+
+from common.block import Block, BlockHeader
+from common.chain_state import BLOCK_CONNECTED, BLOCK_ORPHANED, BLOCK_REORGANIZED, BLOCK_SIDE_BRANCH, ChainState, \
+    ChainStateException
+from common.initialize_default_blockchain import initialize_default_blockchain
+from common.io_blockchain import get_block_hashes_from_memory, get_blockchain_from_memory
+from common.io_utxo_set import get_utxo_set_from_memory
+from common.merkle_tree import get_leaf_hash, get_merkle_root, verify_merkle_proof
+from common.utxo_set import UTXOSet
+from common.values import NUMBER_OF_LEADING_ZEROS
+from node.new_block_creation.mining_engine import HeaderHasher
+
+DEFAULT_UTXO = ("e1d7553f03fd2b578116c6ac7c72356c364535a120dbbb40ec182deb8d408961", 0)
+
+
+@pytest.fixture
+def chain_state():
+    initialize_default_blockchain()
+    chain_state = ChainState()
+    chain_state.load()
+    return chain_state
+
+
+def mine_block(previous_block_hash: str, amount: int, spent_outpoints: tuple = ()) -> Block:
+    transactions = [{"inputs": [], "outputs": [{"amount": amount, "locking_script": "OP_DUP OP_HASH160 abcd"}]}]
+    for transaction_hash, output_index in spent_outpoints:
+        transactions.append({"inputs": [{"transaction_hash": transaction_hash, "output_index": output_index}],
+                             "outputs": [{"amount": amount, "locking_script": "OP_DUP OP_HASH160 efgh"}]})
+    block_header = BlockHeader(previous_block_hash=previous_block_hash, timestamp=1234.5, nonce=0,
+                               merkle_root=get_merkle_root(transactions))
+    block_header.nonce = HeaderHasher(block_header).search(0, 1, 10 ** 6, NUMBER_OF_LEADING_ZEROS)
+    return Block(transactions=transactions, block_header=block_header)
+
+
+def accept_block(block: Block, parent: Block, utxo_set: UTXOSet):
+    pass
+
+
+def test_given_loaded_chain_state_when_get_transaction_then_transaction_is_found_in_any_block(chain_state):
+    genesis_block = chain_state.transaction_index.blocks[0]
+    genesis_transaction = genesis_block.transactions[0]
+    tip_transaction = chain_state.blockchain.transactions[0]
+
+    assert chain_state.get_transaction(genesis_transaction["transaction_hash"]) == genesis_transaction
+    assert chain_state.get_transaction(tip_transaction["transaction_hash"]) == tip_transaction
+    assert chain_state.transaction_index.get_location(tip_transaction["transaction_hash"]) == (
+        len(chain_state.blockchain) - 1, 0)
+    assert chain_state.get_transaction("unknown") == {}
+
+
+def test_given_loaded_chain_state_when_get_headers_then_headers_are_returned_from_height(chain_state):
+    headers = chain_state.get_headers(1, 2)
+
+    assert [header["height"] for header in headers] == [1, 2]
+    assert headers[0]["hash"] == chain_state.transaction_index.blocks[1].block_header.hash
+    assert headers[1]["header"]["previous_block_hash"] == headers[0]["hash"]
+    assert chain_state.get_headers(len(chain_state.blockchain)) == []
+
+
+def test_given_loaded_chain_state_when_get_transaction_proof_then_proof_verifies_against_header(chain_state):
+    tip_transaction = chain_state.blockchain.transactions[0]
+
+    transaction_proof = chain_state.get_transaction_proof(tip_transaction["transaction_hash"])
+
+    assert transaction_proof["transaction"] == tip_transaction
+    assert transaction_proof["block_hash"] == chain_state.blockchain.block_header.hash
+    assert verify_merkle_proof(get_leaf_hash(tip_transaction).hex(), transaction_proof["index"],
+                               transaction_proof["proof"], chain_state.blockchain.block_header.merkle_root)
+    assert chain_state.get_transaction_proof("unknown") == {}
+
+
+def test_given_heavier_side_branch_when_receive_block_then_chain_reorganizes_with_utxo_rollback(chain_state):
+    fork_hash = chain_state.blockchain.block_header.hash
+    main_block = mine_block(fork_hash, 11, (DEFAULT_UTXO,))
+    side_block = mine_block(fork_hash, 12)
+    side_child = mine_block(side_block.block_header.hash, 13)
+
+    assert chain_state.receive_block(main_block, accept_block)["status"] == BLOCK_CONNECTED
+    assert DEFAULT_UTXO not in chain_state.utxo_set
+    assert chain_state.receive_block(side_block, accept_block)["status"] == BLOCK_SIDE_BRANCH
+    block_receipt = chain_state.receive_block(side_child, accept_block)
+
+    assert block_receipt["status"] == BLOCK_REORGANIZED
+    assert block_receipt["connected"] == [side_block, side_child]
+    assert block_receipt["disconnected"] == [main_block]
+    assert chain_state.blockchain == side_child
+    assert DEFAULT_UTXO in chain_state.utxo_set
+    assert chain_state.utxo_set.utxos == UTXOSet.from_chain(chain_state.chain).utxos
+    assert get_utxo_set_from_memory().utxos == chain_state.utxo_set.utxos
+    assert get_block_hashes_from_memory() == [block.block_header.hash for block in chain_state.chain]
+    assert chain_state.has_block(main_block.block_header.hash)
+
+
+def test_given_orphan_block_when_parent_arrives_then_both_are_connected(chain_state):
+    parent = mine_block(chain_state.blockchain.block_header.hash, 11)
+    child = mine_block(parent.block_header.hash, 12)
+
+    assert chain_state.receive_block(child, accept_block)["status"] == BLOCK_ORPHANED
+    block_receipt = chain_state.receive_block(parent, accept_block)
+
+    assert block_receipt["status"] == BLOCK_CONNECTED
+    assert block_receipt["connected"] == [parent, child]
+    assert get_blockchain_from_memory() == child
+
+
+def test_given_invalid_side_branch_when_reorganizing_then_previous_chain_is_restored(chain_state):
+    fork_hash = chain_state.blockchain.block_header.hash
+    main_block = mine_block(fork_hash, 11, (DEFAULT_UTXO,))
+    side_block = mine_block(fork_hash, 12)
+    side_child = mine_block(side_block.block_header.hash, 13)
+    chain_state.receive_block(main_block, accept_block)
+    chain_state.receive_block(side_block, accept_block)
+    utxos = dict(chain_state.utxo_set.utxos)
+
+    def reject_side_child(block: Block, parent: Block, utxo_set: UTXOSet):
+        if block == side_child:
+            raise ChainStateException(block.block_header.hash, "Invalid block")
+
+    with pytest.raises(ChainStateException):
+        chain_state.receive_block(side_child, reject_side_child)
+    assert chain_state.blockchain == main_block
+    assert chain_state.utxo_set.utxos == utxos
+    assert not chain_state.has_block(side_child.block_header.hash)
+    assert get_blockchain_from_memory() == main_block
+
+
+def test_given_block_extending_the_tip_when_receive_block_then_it_is_validated_under_the_read_lock(chain_state):
+    block = mine_block(chain_state.blockchain.block_header.hash, 11)
+    lock_states = []
+
+    def record_lock_state(new_block: Block, parent: Block, utxo_set: UTXOSet):
+        lock_states.append((chain_state.lock._readers, chain_state.lock._writer))
+
+    block_receipt = chain_state.receive_block(block, record_lock_state)
+
+    assert block_receipt["status"] == BLOCK_CONNECTED
+    assert lock_states == [(1, False)]
+    assert chain_state.blockchain == block
+    assert get_blockchain_from_memory() == block
+
+
+def test_given_tip_changed_during_validation_when_receive_block_then_block_goes_to_a_side_branch(chain_state):
+    fork_hash = chain_state.blockchain.block_header.hash
+    block = mine_block(fork_hash, 11)
+    competing_block = mine_block(fork_hash, 12)
+    validate_tip_extension = chain_state._validate_tip_extension
+
+    def connect_competing_block_after_validation(new_block: Block, validate) -> str:
+        validated_tip_hash = validate_tip_extension(new_block, validate)
+        if new_block == block:
+            chain_state.receive_block(competing_block, accept_block)
+        return validated_tip_hash
+
+    chain_state._validate_tip_extension = connect_competing_block_after_validation
+
+    block_receipt = chain_state.receive_block(block, accept_block)
+
+    assert block_receipt["status"] == BLOCK_SIDE_BRANCH
+    assert block_receipt["connected"] == []
+    assert chain_state.blockchain == competing_block
+    assert chain_state.utxo_set.utxos == UTXOSet.from_chain(chain_state.chain).utxos
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from common.encoding import EncodingException, decode_block, decode_blocks, decode_inventory_data, \
+    decode_transaction, encode_block, encode_blocks, encode_inventory_data, encode_transaction
+from common.initialize_default_blockchain import initialize_default_blockchain
+from common.io_blockchain import get_blockchain_from_memory
+
+
+@pytest.fixture
+def blockchain_data():
+    initialize_default_blockchain()
+    return get_blockchain_from_memory().to_dict
+
+
+def test_given_stored_blocks_when_encode_block_then_decoded_block_equals_json_form(blockchain_data):
+    for block_data in blockchain_data:
+        decoded_block_data = decode_block(encode_block(block_data))
+
+        assert decoded_block_data == block_data
+        assert json.dumps(decoded_block_data, indent=2) == json.dumps(block_data, indent=2)
+
+
+def test_given_signed_blocks_when_encode_blocks_then_payload_is_several_times_smaller(blockchain_data):
+    binary_payload = encode_blocks(blockchain_data)
+
+    assert decode_blocks(binary_payload) == blockchain_data
+    assert 2 * len(binary_payload) < len(json.dumps(blockchain_data))
+
+
+def test_given_unusual_values_when_encode_transaction_then_they_round_trip():
+    transaction_data = {
+        "inputs": [{"transaction_hash": "abcd1234", "output_index": 3, "unlocking_script": ""},
+                   {"transaction_hash": "1111", "output_index": 0},
+                   {"transaction_hash": "not hex", "output_index": 1, "unlocking_script": "OP_UNKNOWN Albert"}],
+        "outputs": [{"amount": 0.5, "locking_script": "OP_DUP OP_HASH160 b'Albert' OP_EQUAL_VERIFY OP_CHECKSIG"},
+                    {"amount": -2, "locking_script": "ABCD"}]
+    }
+
+    decoded_transaction_data = decode_transaction(encode_transaction(transaction_data))
+
+    assert json.dumps(decoded_transaction_data, indent=2) == json.dumps(transaction_data, indent=2)
+
+
+def test_given_coinbase_with_height_when_encode_transaction_then_it_round_trips():
+    coinbase_data = {"inputs": [], "outputs": [{"amount": 6.25, "locking_script": "OP_DUP OP_HASH160 abcd"}],
+                     "height": 4}
+
+    decoded_coinbase_data = decode_transaction(encode_transaction(coinbase_data))
+
+    assert json.dumps(decoded_coinbase_data, indent=2) == json.dumps(coinbase_data, indent=2)
+
+
+def test_given_inventory_data_when_encode_inventory_data_then_it_round_trips(blockchain_data):
+    inventory_data = {"blocks": blockchain_data[:1], "transactions": blockchain_data[1]["transactions"]}
+
+    assert decode_inventory_data(encode_inventory_data(inventory_data)) == inventory_data
+
+
+def test_given_non_canonical_transaction_when_encode_transaction_then_exception_is_raised():
+    reordered_transaction_data = {"outputs": [], "inputs": []}
+    extra_field_transaction_data = {"inputs": [], "outputs": [], "transaction_hash": "abcd", "memo": "hello"}
+
+    with pytest.raises(EncodingException):
+        encode_transaction(reordered_transaction_data)
+    with pytest.raises(EncodingException):
+        encode_transaction(extra_field_transaction_data)
+
+
+def test_given_truncated_payload_when_decode_block_then_exception_is_raised(blockchain_data):
+    with pytest.raises(EncodingException):
+        decode_block(encode_block(blockchain_data[0])[:-5])
@@ -0,0 +1,31 @@
+from common.inventory import RecentlySeenFilter
+
+
+def test_given_new_hash_when_add_then_only_first_add_reports_it_as_new():
+    recently_seen = RecentlySeenFilter()
+
+    assert recently_seen.add("aaaa")
+    assert not recently_seen.add("aaaa")
+    assert "aaaa" in recently_seen
+
+
+def test_given_full_filter_when_add_then_least_recently_seen_hash_is_forgotten():
+    recently_seen = RecentlySeenFilter(max_size=2)
+    recently_seen.add("aaaa")
+    recently_seen.add("bbbb")
+    recently_seen.add("aaaa")
+
+    recently_seen.add("cccc")
+
+    assert "aaaa" in recently_seen
+    assert "bbbb" not in recently_seen
+    assert len(recently_seen) == 2
+
+
+def test_given_discarded_hash_when_add_then_it_is_new_again():
+    recently_seen = RecentlySeenFilter()
+    recently_seen.add("aaaa")
+
+    recently_seen.discard("aaaa")
+
+    assert recently_seen.add("aaaa")
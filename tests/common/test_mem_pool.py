@@ -0,0 +1,178 @@
+import pytest
+
+from common.io_mem_pool import FILENAME, store_transactions_in_memory
+from common.mem_pool import MemPool, MemPoolException
+from common.utils import calculate_transaction_hash
+from common.utxo_set import UTXOSet
+
+
+def transaction(utxo_hash: str, output_index: int = 0, amount: int = 10) -> dict:
+    return {
+        "inputs": [{"transaction_hash": utxo_hash, "output_index": output_index, "unlocking_script": "sig key"}],
+        "outputs": [{"amount": amount, "locking_script": "OP_DUP OP_HASH160 abcd OP_EQUAL_VERIFY OP_CHECKSIG"}]
+    }
+
+
+def test_given_new_transaction_when_add_then_transaction_is_indexed_by_hash():
+    mem_pool = MemPool()
+    new_transaction = transaction("aaaa")
+
+    assert mem_pool.add(new_transaction, fee=1)
+    assert calculate_transaction_hash(new_transaction) in mem_pool
+    assert not mem_pool.add(new_transaction, fee=1)
+    assert len(mem_pool) == 1
+
+
+def test_given_transaction_spending_same_output_when_add_then_exception_is_raised():
+    mem_pool = MemPool()
+    mem_pool.add(transaction("aaaa", amount=10))
+
+    with pytest.raises(MemPoolException):
+        mem_pool.add(transaction("aaaa", amount=9))
+
+
+def test_given_transactions_with_fees_when_get_transactions_by_fee_rate_then_highest_fee_rate_comes_first():
+    mem_pool = MemPool()
+    low_fee, high_fee, medium_fee = transaction("aaaa"), transaction("bbbb"), transaction("cccc")
+    mem_pool.add(low_fee, fee=1)
+    mem_pool.add(high_fee, fee=5)
+    mem_pool.add(medium_fee, fee=3)
+
+    assert mem_pool.get_transactions_by_fee_rate() == [high_fee, medium_fee, low_fee]
+    assert mem_pool.get_transactions_by_fee_rate(2) == [high_fee, medium_fee]
+
+
+def test_given_confirmed_and_conflicting_transactions_when_remove_confirmed_transactions_then_both_are_removed():
+    mem_pool = MemPool()
+    confirmed = transaction("aaaa")
+    conflicting = transaction("bbbb", amount=10)
+    unrelated = transaction("cccc")
+    for new_transaction in [confirmed, conflicting, unrelated]:
+        mem_pool.add(new_transaction)
+
+    mem_pool.remove_confirmed_transactions([confirmed, transaction("bbbb", amount=7)])
+
+    assert mem_pool.get_transactions_by_fee_rate() == [unrelated]
+    assert mem_pool.get_spending_transaction_hash("bbbb", 0) is None
+
+
+def test_given_persistent_mem_pool_when_reloaded_then_log_is_replayed():
+    store_transactions_in_memory([])
+    mem_pool = MemPool.from_memory()
+    kept, removed = transaction("aaaa"), transaction("bbbb")
+    mem_pool.add(kept, fee=2)
+    mem_pool.add(removed, fee=1)
+    mem_pool.remove([calculate_transaction_hash(removed)])
+
+    reloaded_mem_pool = MemPool.from_memory()
+
+    assert reloaded_mem_pool.get_transactions_by_fee_rate() == [kept]
+    assert reloaded_mem_pool.fees[calculate_transaction_hash(kept)] == 2
+
+
+def test_given_log_with_torn_last_record_when_reloaded_then_record_is_dropped_and_log_stays_appendable():
+    store_transactions_in_memory([])
+    mem_pool = MemPool.from_memory()
+    kept, appended_later = transaction("aaaa"), transaction("bbbb")
+    mem_pool.add(kept, fee=2)
+    with open(FILENAME, "ab") as file_obj:
+        file_obj.write(b'{"add": {"inputs": [')
+
+    reloaded_mem_pool = MemPool.from_memory()
+    reloaded_mem_pool.add(appended_later, fee=1)
+
+    assert list(MemPool.from_memory().transactions) == [calculate_transaction_hash(kept),
+                                                       calculate_transaction_hash(appended_later)]
+
+
+def test_given_compacted_mem_pool_when_reloaded_then_only_live_transactions_are_kept():
+    store_transactions_in_memory([])
+    mem_pool = MemPool.from_memory()
+    kept, removed = transaction("aaaa"), transaction("bbbb")
+    mem_pool.add(kept, fee=2)
+    mem_pool.add(removed, fee=1)
+    mem_pool.remove([calculate_transaction_hash(removed)])
+
+    mem_pool.compact()
+
+    with open(FILENAME, "rb") as file_obj:
+        assert len(file_obj.readlines()) == 1
+    assert MemPool.from_memory().get_transactions_by_fee_rate() == [kept]
+
+
+def test_given_parent_and_child_when_added_and_parent_removed_then_package_stats_follow_the_ancestors():
+    mem_pool = MemPool()
+    parent = transaction("aaaa")
+    parent_hash = calculate_transaction_hash(parent)
+    child = transaction(parent_hash)
+    child_hash = calculate_transaction_hash(child)
+    mem_pool.add(parent, fee=1)
+    mem_pool.add(child, fee=5)
+
+    assert mem_pool.ancestors[child_hash] == {parent_hash}
+    assert mem_pool.package_fees[child_hash] == 6
+    assert mem_pool.package_sizes[child_hash] == mem_pool.sizes[parent_hash] + mem_pool.sizes[child_hash]
+
+    mem_pool.remove([parent_hash])
+
+    assert mem_pool.ancestors[child_hash] == set()
+    assert mem_pool.package_fees[child_hash] == 5
+    assert mem_pool.package_sizes[child_hash] == mem_pool.sizes[child_hash]
+
+
+def test_given_child_added_before_parent_when_parent_is_added_then_child_package_includes_it():
+    mem_pool = MemPool()
+    grandparent = transaction("aaaa")
+    parent = transaction(calculate_transaction_hash(grandparent))
+    child = transaction(calculate_transaction_hash(parent))
+    mem_pool.add(grandparent, fee=1)
+    mem_pool.add(child, fee=3)
+
+    mem_pool.add(parent, fee=2)
+
+    child_hash = calculate_transaction_hash(child)
+    assert mem_pool.ancestors[child_hash] == {calculate_transaction_hash(grandparent), calculate_transaction_hash(parent)}
+    assert mem_pool.package_fees[child_hash] == 6
+
+
+def test_given_conflicting_transaction_with_child_when_remove_confirmed_transactions_then_child_is_removed_too():
+    mem_pool = MemPool()
+    conflicting = transaction("aaaa", amount=10)
+    child = transaction(calculate_transaction_hash(conflicting))
+    mem_pool.add(conflicting)
+    mem_pool.add(child)
+
+    mem_pool.remove_confirmed_transactions([transaction("aaaa", amount=7)])
+
+    assert len(mem_pool) == 0
+    assert mem_pool.children == {}
+
+
+def test_given_transactions_spending_disconnected_outputs_when_remove_orphaned_transactions_then_they_are_removed():
+    mem_pool = MemPool()
+    disconnected_coinbase = {"inputs": [], "outputs": [{"amount": 50, "locking_script": "OP_DUP OP_HASH160 abcd"}],
+                             "height": 4}
+    restored = transaction("aaaa")
+    child = transaction(calculate_transaction_hash(disconnected_coinbase))
+    grandchild = transaction(calculate_transaction_hash(child))
+    restored_child = transaction(calculate_transaction_hash(restored))
+    for new_transaction in [restored, child, grandchild, restored_child]:
+        mem_pool.add(new_transaction)
+
+    removed_hashes = mem_pool.remove_orphaned_transactions([disconnected_coinbase, restored], UTXOSet())
+
+    assert set(removed_hashes) == {calculate_transaction_hash(child), calculate_transaction_hash(grandchild)}
+    assert mem_pool.get_transactions_by_fee_rate() == [restored, restored_child]
+
+
+def test_given_disconnected_output_still_unspent_when_remove_orphaned_transactions_then_spender_is_kept():
+    mem_pool = MemPool()
+    disconnected_transaction = transaction("aaaa")
+    disconnected_hash = calculate_transaction_hash(disconnected_transaction)
+    child = transaction(disconnected_hash)
+    mem_pool.add(child)
+    utxo_set = UTXOSet()
+    utxo_set.add(disconnected_hash, 0, disconnected_transaction["outputs"][0])
+
+    assert mem_pool.remove_orphaned_transactions([disconnected_transaction], utxo_set) == []
+    assert calculate_transaction_hash(child) in mem_pool
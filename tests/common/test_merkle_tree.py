@@ -1,5 +1,8 @@
-from common.merkle_tree import build_merkle_tree
+import json
+
+from common.merkle_tree import MerkleTree, get_leaf_hash, get_merkle_root, verify_merkle_proof
 from common.utils import calculate_hash
+from tests.common.reference_merkle_tree import build_merkle_tree
 
 
 def test_given_1_leaf_when_build_merkle_tree_then_leafs_hash_is_computed_correctly():
@@ -140,3 +143,42 @@ def test_given_5_leaves_when_build_merkle_tree_then_root_is_computed_correctly()
 
     assert merkle_tree.value == calculate_hash(calculate_hash(calculate_hash(calculate_hash(l1)+calculate_hash(l2))+calculate_hash(calculate_hash(
         l3)+calculate_hash(l4))) + calculate_hash(calculate_hash(calculate_hash(l5)+calculate_hash(l5))+calculate_hash(calculate_hash(l5)+calculate_hash(l5))))
+
+
+def get_transactions(number_of_transactions: int) -> list:
+    return [{"inputs": [], "outputs": [{"amount": i, "locking_script": "abcd"}]} for i in range(number_of_transactions)]
+
+
+def test_given_transactions_when_get_merkle_root_then_root_matches_node_tree():
+    for number_of_transactions in range(1, 18):
+        transactions = get_transactions(number_of_transactions)
+        transactions_bytes = [json.dumps(transaction, indent=2).encode("utf-8") for transaction in transactions]
+
+        assert get_merkle_root(transactions) == build_merkle_tree(transactions_bytes).value
+
+
+def test_given_appended_transactions_when_get_root_then_root_matches_tree_built_at_once():
+    transactions = get_transactions(13)
+    merkle_tree = MerkleTree()
+    for i, transaction in enumerate(transactions):
+        merkle_tree.append(transaction)
+
+        assert merkle_tree.root == get_merkle_root(transactions[:i + 1])
+
+
+def test_given_merkle_tree_when_get_proof_then_proof_verifies_against_root():
+    transactions = get_transactions(11)
+    merkle_tree = MerkleTree.from_transactions(transactions)
+    for i, transaction in enumerate(transactions):
+        proof = merkle_tree.get_proof(i)
+
+        assert len(proof) == 4
+        assert verify_merkle_proof(get_leaf_hash(transaction).hex(), i, proof, merkle_tree.root)
+
+
+def test_given_other_transaction_when_verify_merkle_proof_then_proof_is_rejected():
+    transactions = get_transactions(6)
+    merkle_tree = MerkleTree.from_transactions(transactions)
+    other_transaction = {"inputs": [], "outputs": [{"amount": 100, "locking_script": "abcd"}]}
+
+    assert not verify_merkle_proof(get_leaf_hash(other_transaction).hex(), 2, merkle_tree.get_proof(2), merkle_tree.root)
@@ -1,9 +1,50 @@
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
+import requests
 
+from common.block import Block, BlockHeader
+from common.initialize_default_blockchain import initialize_default_blockchain
+from common.io_blockchain import get_block_hashes_from_memory, get_blockchain_from_memory
+from common.io_utxo_set import get_utxo_set_from_memory
+from common.merkle_tree import get_merkle_root
 from common.network import Network
 from common.node import Node
+from common.utils import calculate_transaction_hash
+from common.values import NUMBER_OF_LEADING_ZEROS
+from node.new_block_creation.mining_engine import HeaderHasher
+
+
+def mine_block(previous_block: Block, amount: int) -> Block:
+    transactions = [{"inputs": [], "outputs": [{"amount": amount, "locking_script": "OP_DUP OP_HASH160 abcd"}]}]
+    block_header = BlockHeader(previous_block_hash=previous_block.block_header.hash, timestamp=1234.5, nonce=0,
+                               merkle_root=get_merkle_root(transactions))
+    nonce = None
+    first_nonce = 0
+    while nonce is None:
+        nonce = HeaderHasher(block_header).search(first_nonce, 1, 10000, NUMBER_OF_LEADING_ZEROS)
+        first_nonce = first_nonce + 10000
+    block_header.nonce = nonce
+    block_header.hash = block_header.get_hash()
+    return Block(transactions=transactions, block_header=block_header, previous_block=previous_block)
+
+
+class PeerChain:
+    def __init__(self, blocks: list):
+        self.blocks = blocks
+        self.downloaded_block_hashes = []
+
+    def get_tip(self) -> dict:
+        return {"height": len(self.blocks) - 1, "hash": self.blocks[-1].block_header.hash}
+
+    def get_headers(self, from_height: int, count: int = 2000) -> list:
+        return [{"height": height, "hash": block.block_header.hash, "header": block.block_header.to_dict}
+                for height, block in enumerate(self.blocks) if from_height <= height < from_height + count]
+
+    def get_block(self, block_hash: str) -> dict:
+        self.downloaded_block_hashes.append(block_hash)
+        block = next(block for block in self.blocks if block.block_header.hash == block_hash)
+        return {"header": block.block_header.to_dict, "transactions": block.transactions}
 
 
 class TestNetwork:
@@ -12,12 +53,48 @@ class TestNetwork:
     def self_node(self):
         return Node("0.0.0.0:1234")
 
+    @pytest.fixture(autouse=True)
+    def known_nodes_file(self, tmp_path, monkeypatch):
+        known_nodes_file = str(tmp_path / "known_nodes.json")
+        monkeypatch.setattr(Network, "KNOWN_NODES_FILE", known_nodes_file)
+        return known_nodes_file
+
     def test_given_newly_initialized_node_when_known_nodes_then_hardcoded_node_is_returned(self, self_node):
         network = Network(self_node)
         nodes = network.known_nodes
 
         assert nodes == [Node(hostname="127.0.0.1:5000")]
 
+    def test_given_persisted_known_nodes_when_network_is_created_then_peer_table_is_loaded(self, self_node,
+                                                                                          known_nodes_file):
+        network = Network(self_node)
+        network.store_new_node(Node(hostname="1.1.1.1:5000"))
+        network.peer_table.flush()
+
+        restarted_network = Network(self_node)
+
+        assert restarted_network.known_nodes == [Node(hostname="127.0.0.1:5000"), Node(hostname="1.1.1.1:5000")]
+
+    @pytest.mark.parametrize("request_exception, is_failure", [
+        (requests.exceptions.ConnectionError(), True),
+        (requests.exceptions.ReadTimeout(), True),
+        (requests.exceptions.HTTPError(response=Mock(status_code=503)), True),
+        (requests.exceptions.HTTPError(response=Mock(status_code=400)), False),
+        (requests.exceptions.HTTPError(response=Mock(status_code=404)), False),
+    ])
+    def test_given_failed_request_when_track_then_only_unreachable_or_failing_peers_are_penalized(
+            self, self_node, request_exception, is_failure):
+        network = Network(self_node)
+        peer = network.peer_table.get(Network.FIRST_KNOWN_NODE_HOSTNAME)
+
+        def send(node: Node):
+            raise request_exception
+
+        with pytest.raises(requests.exceptions.RequestException):
+            network.track(send)(Node(Network.FIRST_KNOWN_NODE_HOSTNAME))
+
+        assert (peer.failures == 1) == is_failure
+
     def test_given_new_unique_node_when_store_new_node_then_new_node_is_stored(self, self_node):
         network = Network(self_node)
         new_node = Node(hostname="1.1.1.1:5000")
@@ -35,7 +112,7 @@ class TestNetwork:
         nodes = network.known_nodes
         assert len(nodes) == 1
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_given_known_hosts_when_advertise_to_all_known_nodes_then_http_post_is_sent_to_all_known_hosts(self, mock_post, self_node):
         network = Network(self_node)
 
@@ -46,3 +123,26 @@ class TestNetwork:
         assert mock_post.call_count == 1
         assert args[0] == f"http://{Network.FIRST_KNOWN_NODE_HOSTNAME}/new_node_advertisement"
         assert kwargs["json"] == {'hostname': self_node.hostname}
+
+    def test_given_longer_peer_chain_when_initialize_blockchain_then_only_missing_blocks_are_downloaded(self, self_node):
+        network = Network(self_node)
+        initialize_default_blockchain()
+        local_blockchain = get_blockchain_from_memory()
+        first_new_block = mine_block(local_blockchain, 10)
+        second_new_block = mine_block(first_new_block, 20)
+        local_blocks = [local_blockchain]
+        while local_blocks[0].previous_block:
+            local_blocks.insert(0, local_blocks[0].previous_block)
+        peer_chain = PeerChain(local_blocks + [first_new_block, second_new_block])
+
+        with patch.object(Node, "get_tip", peer_chain.get_tip), \
+                patch.object(Node, "get_headers", peer_chain.get_headers), \
+                patch.object(Node, "get_block", peer_chain.get_block):
+            network.initialize_blockchain()
+
+        assert get_blockchain_from_memory() == second_new_block
+        assert get_block_hashes_from_memory() == [block.block_header.hash for block in peer_chain.blocks]
+        assert peer_chain.downloaded_block_hashes == [first_new_block.block_header.hash,
+                                                      second_new_block.block_header.hash]
+        assert get_utxo_set_from_memory().get_amount(
+            calculate_transaction_hash(second_new_block.transactions[0]), 0) == 20
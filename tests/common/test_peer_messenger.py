@@ -0,0 +1,56 @@
+import threading
+import time
+
+import requests
+
+from common.node import Node
+from common.peer_messenger import PeerMessenger
+
+
+def test_given_failing_and_slow_nodes_when_call_all_then_only_timely_results_are_returned():
+    peer_messenger = PeerMessenger(max_workers=4)
+    release = threading.Event()
+
+    def send(node: Node) -> str:
+        if node.hostname == "failing:5000":
+            raise requests.exceptions.ConnectionError("unreachable")
+        if node.hostname == "slow:5000":
+            release.wait(5)
+        return node.hostname
+
+    nodes = [Node("fast:5000"), Node("failing:5000"), Node("slow:5000")]
+    results = peer_messenger.call_all(nodes, send, timeout=0.2)
+    release.set()
+
+    assert [(node.hostname, result) for node, result in results] == [("fast:5000", "fast:5000")]
+
+
+def test_given_slow_node_when_broadcast_then_it_returns_before_messages_are_sent():
+    peer_messenger = PeerMessenger(max_workers=2)
+    release = threading.Event()
+    sent = []
+
+    def send(node: Node):
+        release.wait(5)
+        sent.append(node.hostname)
+
+    start = time.perf_counter()
+    futures = peer_messenger.broadcast([Node("a:5000"), Node("b:5000")], send)
+    elapsed = time.perf_counter() - start
+    release.set()
+    for future in futures:
+        future.result()
+
+    assert elapsed < 1
+    assert sorted(sent) == ["a:5000", "b:5000"]
+
+
+def test_given_too_many_pending_messages_when_broadcast_then_extra_messages_are_dropped():
+    peer_messenger = PeerMessenger(max_workers=1, max_pending_messages=2)
+    release = threading.Event()
+
+    futures = peer_messenger.broadcast([Node("a:5000"), Node("b:5000"), Node("c:5000")],
+                                       lambda node: release.wait(5))
+    release.set()
+
+    assert len(futures) == 2
@@ -0,0 +1,90 @@
+import json
+import threading
+
+import pytest
+
+from common.node import Node
+from common.peer_table import MAX_CONSECUTIVE_FAILURES, PeerTable
+
+
+@pytest.fixture
+def filename(tmp_path) -> str:
+    return str(tmp_path / "known_nodes.json")
+
+
+def test_given_new_nodes_when_add_then_table_is_persisted_in_known_nodes_format(filename):
+    peer_table = PeerTable(filename)
+    peer_table.reset([Node("127.0.0.1:5000")])
+
+    assert peer_table.add(Node("1.1.1.1:5000"))
+    assert not peer_table.add(Node("1.1.1.1:5000"))
+    peer_table.flush()
+
+    with open(filename) as file_obj:
+        peers_data = json.load(file_obj)
+    assert [peer_data["hostname"] for peer_data in peers_data] == ["127.0.0.1:5000", "1.1.1.1:5000"]
+
+
+def test_given_peer_statistics_when_load_then_statistics_are_restored(filename):
+    peer_table = PeerTable(filename)
+    peer_table.reset([Node("127.0.0.1:5000")])
+    peer_table.record_failure("127.0.0.1:5000")
+    peer_table.record_success("127.0.0.1:5000", 0.5)
+    peer_table.record_failure("127.0.0.1:5000")
+    peer_table.flush()
+
+    loaded_peer_table = PeerTable(filename)
+    loaded_peer_table.load()
+
+    peer = loaded_peer_table.get("127.0.0.1:5000")
+    assert peer.latency == 0.5
+    assert peer.failures == 1
+    assert peer.last_seen is not None
+
+
+def test_given_concurrent_adds_when_flush_then_every_node_is_persisted_once(filename):
+    peer_table = PeerTable(filename, persist_delay=0.01)
+    peer_table.reset([])
+    threads = [threading.Thread(target=lambda i=i: [peer_table.add(Node(f"10.0.{i}.{j}:5000")) for j in range(50)])
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    peer_table.flush()
+
+    with open(filename) as file_obj:
+        peers_data = json.load(file_obj)
+    assert len(peers_data) == 400
+    assert len({peer_data["hostname"] for peer_data in peers_data}) == 400
+
+
+def test_given_peer_latencies_when_select_peers_then_fastest_healthy_peers_are_selected(filename):
+    peer_table = PeerTable(filename)
+    peer_table.reset([Node("slow:5000"), Node("self:5000"), Node("fast:5000"), Node("unknown:5000")])
+    peer_table.record_success("slow:5000", 2)
+    peer_table.record_success("fast:5000", 0.1)
+
+    assert [node.hostname for node in peer_table.select_peers(2, exclude_hostname="self:5000")] == \
+        ["fast:5000", "unknown:5000"]
+
+
+def test_given_failing_peer_when_select_peers_then_it_is_backed_off_and_eventually_evicted(filename):
+    peer_table = PeerTable(filename)
+    peer_table.reset([Node("failing:5000"), Node("healthy:5000")])
+
+    peer_table.record_failure("failing:5000")
+
+    assert [node.hostname for node in peer_table.select_peers()] == ["healthy:5000"]
+    peer_table.get("failing:5000").retry_at = 0
+    assert [node.hostname for node in peer_table.select_peers()] == ["healthy:5000", "failing:5000"]
+    for _ in range(MAX_CONSECUTIVE_FAILURES - 1):
+        peer_table.record_failure("failing:5000")
+    assert "failing:5000" not in peer_table
+
+
+def test_given_missing_file_when_load_then_false_is_returned_and_table_is_empty(filename):
+    peer_table = PeerTable(filename)
+
+    assert not peer_table.load()
+    assert len(peer_table) == 0
@@ -0,0 +1,163 @@
+import pytest
+
+from common.block import Block, BlockHeader
+from common.utils import calculate_transaction_hash
+from common.utxo_set import UTXOSet, UTXOSetException
+
+
+def locking_script(public_key_hash: str) -> str:
+    return f"OP_DUP OP_HASH160 {public_key_hash} OP_EQUAL_VERIFY OP_CHECKSIG"
+
+
+def get_block(transactions: list) -> Block:
+    return Block(transactions=transactions,
+                 block_header=BlockHeader(previous_block_hash="1111", timestamp=1234.5, nonce=0, merkle_root="abcd"))
+
+
+def test_given_new_transaction_when_apply_transaction_then_outputs_are_unspent():
+    utxo_set = UTXOSet()
+    transaction = {
+        "inputs": [],
+        "outputs": [
+            {"amount": 10, "locking_script": locking_script("albert")},
+            {"amount": 5, "locking_script": locking_script("bertrand")}
+        ]
+    }
+    transaction_hash = calculate_transaction_hash(transaction)
+
+    utxo_set.apply_transaction(transaction)
+
+    assert len(utxo_set) == 2
+    assert utxo_set.get_amount(transaction_hash, 1) == 5
+    assert utxo_set.get_locking_script(transaction_hash, 0) == locking_script("albert")
+
+
+def test_given_spending_transaction_when_apply_transaction_then_spent_output_is_removed():
+    utxo_set = UTXOSet()
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+    transaction = {
+        "inputs": [{"transaction_hash": "aaaa", "output_index": 0, "unlocking_script": ""}],
+        "outputs": [{"amount": 10, "locking_script": locking_script("bertrand")}]
+    }
+
+    utxo_set.apply_transaction(transaction)
+
+    assert ("aaaa", 0) not in utxo_set
+    assert (calculate_transaction_hash(transaction), 0) in utxo_set
+    assert utxo_set.get_user_utxos("albert") == {"user": "albert", "total": 0, "utxos": []}
+
+
+def test_given_user_utxos_when_get_user_utxos_then_only_user_outputs_are_returned():
+    utxo_set = UTXOSet()
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+    utxo_set.add("aaaa", 1, {"amount": 3, "locking_script": locking_script("bertrand")})
+    utxo_set.add("bbbb", 0, {"amount": 2, "locking_script": locking_script("albert")})
+
+    assert utxo_set.get_user_utxos("albert") == {
+        "user": "albert",
+        "total": 12,
+        "utxos": [
+            {"amount": 10, "transaction_hash": "aaaa", "output_index": 0},
+            {"amount": 2, "transaction_hash": "bbbb", "output_index": 0}
+        ]
+    }
+
+
+def test_given_stored_utxo_set_when_from_list_then_same_utxos_are_loaded():
+    utxo_set = UTXOSet()
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+
+    loaded_utxo_set = UTXOSet.from_list(utxo_set.to_list)
+
+    assert loaded_utxo_set.utxos == utxo_set.utxos
+    assert loaded_utxo_set.utxos_by_owner == utxo_set.utxos_by_owner
+
+
+def test_given_existing_outpoint_when_add_then_exception_is_raised():
+    utxo_set = UTXOSet()
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+
+    with pytest.raises(UTXOSetException):
+        utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+
+    assert utxo_set.get_user_utxos("albert")["total"] == 10
+
+
+def test_given_identical_coinbase_when_apply_transaction_twice_then_second_one_is_rejected():
+    utxo_set = UTXOSet()
+    coinbase = {"inputs": [], "outputs": [{"amount": 6.25, "locking_script": locking_script("albert")}]}
+    utxo_set.apply_transaction(coinbase)
+
+    with pytest.raises(UTXOSetException):
+        utxo_set.apply_transaction(dict(coinbase))
+
+    assert len(utxo_set) == 1
+
+
+def test_given_transaction_claiming_another_hash_when_apply_transaction_then_exception_is_raised():
+    utxo_set = UTXOSet()
+    transaction = {
+        "inputs": [],
+        "outputs": [{"amount": 10, "locking_script": locking_script("albert")}],
+        "transaction_hash": "aaaa"
+    }
+
+    with pytest.raises(UTXOSetException):
+        utxo_set.apply_transaction(transaction)
+
+    assert len(utxo_set) == 0
+
+
+def test_given_block_spending_its_own_output_when_apply_block_then_only_final_outputs_are_unspent():
+    utxo_set = UTXOSet()
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+    parent = {"inputs": [{"transaction_hash": "aaaa", "output_index": 0, "unlocking_script": ""}],
+              "outputs": [{"amount": 10, "locking_script": locking_script("bertrand")}]}
+    child = {"inputs": [{"transaction_hash": calculate_transaction_hash(parent), "output_index": 0,
+                         "unlocking_script": ""}],
+             "outputs": [{"amount": 10, "locking_script": locking_script("camille")}]}
+    block = get_block([parent, child])
+
+    utxo_set.apply_block(block)
+
+    assert list(utxo_set.utxos) == [(calculate_transaction_hash(child), 0)]
+    assert list(utxo_set.utxos_by_owner) == ["camille"]
+    assert utxo_set.tip_hash == block.block_header.hash
+
+
+def test_given_block_with_invalid_last_transaction_when_apply_block_then_utxo_set_is_unchanged():
+    utxo_set = UTXOSet(tip_hash="1111")
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+    utxo_set.mark_stored()
+    spending_transaction = {"inputs": [{"transaction_hash": "aaaa", "output_index": 0, "unlocking_script": ""}],
+                            "outputs": [{"amount": 10, "locking_script": locking_script("bertrand")}]}
+    coinbase = {"inputs": [], "outputs": [{"amount": 6.25, "locking_script": locking_script("albert")}]}
+    utxos = dict(utxo_set.utxos)
+
+    with pytest.raises(UTXOSetException):
+        utxo_set.apply_block(get_block([spending_transaction, coinbase, dict(coinbase)]))
+
+    assert utxo_set.utxos == utxos
+    assert utxo_set.tip_hash == "1111"
+    assert utxo_set.changes == {}
+
+
+def test_given_changes_popped_from_a_utxo_set_when_applied_to_its_stored_copy_then_both_are_equal():
+    utxo_set = UTXOSet(tip_hash="1111")
+    utxo_set.add("aaaa", 0, {"amount": 10, "locking_script": locking_script("albert")})
+    utxo_set.add("aaaa", 1, {"amount": 3, "locking_script": locking_script("bertrand")})
+    stored_utxo_set = UTXOSet.from_list(utxo_set.to_list, utxo_set.tip_hash)
+    utxo_set.mark_stored()
+    transaction = {"inputs": [{"transaction_hash": "aaaa", "output_index": 0, "unlocking_script": ""}],
+                   "outputs": [{"amount": 10, "locking_script": locking_script("camille")}]}
+    utxo_set.apply_block(get_block([transaction]))
+
+    changes_record = utxo_set.pop_changes()
+    stored_utxo_set.apply_changes(changes_record)
+
+    assert changes_record["spent"] == [["aaaa", 0]]
+    assert stored_utxo_set.utxos == utxo_set.utxos
+    assert stored_utxo_set.tip_hash == utxo_set.tip_hash
+    assert utxo_set.changes == {}
+    with pytest.raises(UTXOSetException):
+        stored_utxo_set.apply_changes(changes_record)
@@ -0,0 +1,133 @@
+import random
+import time
+
+from common import mem_pool as mem_pool_module
+from common.mem_pool import MemPool
+from common.transaction import Transaction
+from common.transaction_input import TransactionInput
+from common.transaction_output import TransactionOutput
+from common.utils import calculate_transaction_hash
+from common.values import MAX_BLOCK_SIZE
+from node.new_block_creation.block_template import COINBASE_SIZE_RESERVE, BlockTemplateBuilder
+
+BENCHMARK_NUMBER_OF_TRANSACTIONS = 100000
+BENCHMARK_CHILD_PROBABILITY = 0.2
+BENCHMARK_BUILD_TIME_BOUND = 0.25
+
+
+def transaction(utxo_hash: str, output_index: int = 0) -> dict:
+    return {
+        "inputs": [{"transaction_hash": utxo_hash, "output_index": output_index, "unlocking_script": "sig key"}],
+        "outputs": [{"amount": 10, "locking_script": "OP_DUP OP_HASH160 abcd OP_EQUAL_VERIFY OP_CHECKSIG"}]
+    }
+
+
+def test_given_transactions_when_build_then_transactions_are_ordered_by_fee_rate():
+    mem_pool = MemPool()
+    low_fee, high_fee = transaction("aaaa"), transaction("bbbb")
+    mem_pool.add(low_fee, fee=1)
+    mem_pool.add(high_fee, fee=5)
+
+    block_template = BlockTemplateBuilder(mem_pool).build()
+
+    assert block_template.transactions == [high_fee, low_fee]
+    assert block_template.fees == 6
+
+
+def test_given_high_fee_child_of_low_fee_parent_when_build_then_package_is_selected_parent_first():
+    mem_pool = MemPool()
+    parent = transaction("aaaa")
+    child = transaction(calculate_transaction_hash(parent))
+    medium_fee = transaction("bbbb")
+    mem_pool.add(parent, fee=0)
+    mem_pool.add(child, fee=10)
+    mem_pool.add(medium_fee, fee=2)
+
+    block_template = BlockTemplateBuilder(mem_pool).build()
+
+    assert block_template.transactions == [parent, child, medium_fee]
+
+
+def test_given_wallet_parent_and_child_when_build_then_parent_is_selected_before_child():
+    parent = Transaction([TransactionInput("aaaa", 0, "sig key")], [TransactionOutput(public_key_hash="abcd", amount=10)])
+    child = Transaction([TransactionInput(parent.transaction_hash, 0, "sig key")],
+                        [TransactionOutput(public_key_hash="abcd", amount=9)])
+    mem_pool = MemPool()
+    mem_pool.add(parent.transaction_data, fee=0)
+    mem_pool.add(child.transaction_data, fee=1)
+
+    block_template = BlockTemplateBuilder(mem_pool).build()
+
+    assert block_template.transactions == [parent.transaction_data, child.transaction_data]
+    assert block_template.fees == 1
+
+
+def test_given_child_without_room_for_parent_when_build_then_child_is_not_selected():
+    mem_pool = MemPool()
+    parent = transaction("aaaa")
+    child = transaction(calculate_transaction_hash(parent))
+    mem_pool.add(parent, fee=0)
+    mem_pool.add(child, fee=10)
+
+    block_template = BlockTemplateBuilder(mem_pool, max_number_of_transactions=2).build()
+
+    assert block_template.transactions == [parent]
+
+
+def test_given_size_limit_when_build_then_template_fits_in_block():
+    mem_pool = MemPool()
+    transactions = [transaction(f"{i:04x}") for i in range(10)]
+    for i, new_transaction in enumerate(transactions):
+        mem_pool.add(new_transaction, fee=i)
+    transaction_size = mem_pool.sizes[calculate_transaction_hash(transactions[0])]
+
+    block_template = BlockTemplateBuilder(mem_pool, max_block_size=COINBASE_SIZE_RESERVE + 3 * transaction_size).build()
+
+    assert block_template.transactions == [transactions[9], transactions[8], transactions[7]]
+    assert block_template.size == 3 * transaction_size
+
+
+def test_given_100k_transaction_mem_pool_when_build_then_template_is_built_within_the_benchmark_bound(monkeypatch):
+    monkeypatch.setattr(mem_pool_module, "calculate_transaction_hash", lambda tx: tx["transaction_hash"])
+    monkeypatch.setattr(mem_pool_module, "get_leaf_hash", lambda tx: bytes.fromhex(tx["transaction_hash"]))
+    random.seed(0)
+    mem_pool = MemPool()
+    transaction_hashes = []
+    for i in range(BENCHMARK_NUMBER_OF_TRANSACTIONS):
+        if transaction_hashes and random.random() < BENCHMARK_CHILD_PROBABILITY:
+            new_transaction = transaction(transaction_hashes.pop(random.randrange(len(transaction_hashes))))
+        else:
+            new_transaction = transaction(f"{BENCHMARK_NUMBER_OF_TRANSACTIONS + i:064x}")
+        new_transaction["transaction_hash"] = f"{i:064x}"
+        mem_pool.add(new_transaction, fee=random.randint(0, 100))
+        transaction_hashes.append(new_transaction["transaction_hash"])
+
+    elapsed_times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        block_template = BlockTemplateBuilder(mem_pool).build()
+        elapsed_times.append(time.perf_counter() - start)
+
+    assert min(elapsed_times) < BENCHMARK_BUILD_TIME_BOUND
+    assert block_template.size <= MAX_BLOCK_SIZE - COINBASE_SIZE_RESERVE
+    selected_hashes = set()
+    for selected_transaction in block_template.transactions:
+        parent_hash = selected_transaction["inputs"][0]["transaction_hash"]
+        assert parent_hash in selected_hashes or parent_hash not in mem_pool
+        selected_hashes.add(selected_transaction["transaction_hash"])
+
+
+def test_given_parent_confirmed_after_child_was_added_when_build_then_child_is_ranked_by_its_own_fee_rate():
+    mem_pool = MemPool()
+    parent = transaction("aaaa")
+    child = transaction(calculate_transaction_hash(parent))
+    medium_fee = transaction("bbbb")
+    mem_pool.add(parent, fee=0)
+    mem_pool.add(child, fee=4)
+    mem_pool.add(medium_fee, fee=3)
+
+    mem_pool.remove_confirmed_transactions([parent])
+    block_template = BlockTemplateBuilder(mem_pool).build()
+
+    assert block_template.transactions == [child, medium_fee]
+    assert block_template.fees == 7
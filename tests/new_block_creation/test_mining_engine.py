@@ -0,0 +1,21 @@
+from common.block import BlockHeader
+from node.new_block_creation.mining_engine import HeaderHasher
+
+
+def test_given_block_header_when_get_hash_then_hash_is_identical_to_block_header_hash():
+    block_header = BlockHeader(previous_block_hash="aaaa", timestamp=1320365123.111, nonce=0, merkle_root="abcd")
+    header_hasher = HeaderHasher(block_header)
+
+    for nonce in [0, 1, 9, 10, 12345, 2**40]:
+        block_header.nonce = nonce
+        assert header_hasher.get_hash(nonce) == block_header.get_hash()
+
+
+def test_given_block_header_when_search_then_first_valid_nonce_is_returned():
+    block_header = BlockHeader(previous_block_hash="aaaa", timestamp=1234.5, nonce=0, merkle_root="abcd")
+    header_hasher = HeaderHasher(block_header)
+
+    nonce = header_hasher.search(1, 1, 100000, 2)
+
+    assert header_hasher.get_hash(nonce).startswith("00")
+    assert not any(header_hasher.get_hash(previous_nonce).startswith("00") for previous_nonce in range(1, nonce))
@@ -8,7 +8,7 @@ from blockchain_users.bertrand import private_key as bertrand_private_key
 from blockchain_users.camille import private_key as camille_private_key
 from blockchain_users.miner import public_key_hash
 from common.block import Block, BlockHeader
-from common.io_mem_pool import store_transactions_in_memory
+from common.io_mem_pool import store_mem_pool_entries_in_memory
 from common.merkle_tree import get_merkle_root
 from common.network import Network
 from common.node import Node
@@ -48,8 +48,9 @@ def transactions(transaction_fee):
 
 
 @pytest.fixture(scope="module")
-def store_transactions_in_mem_pool(transactions):
-    store_transactions_in_memory(transactions)
+def store_transactions_in_mem_pool(transactions, transaction_fee):
+    store_mem_pool_entries_in_memory([{"transaction": transaction, "fee": transaction_fee}
+                                      for transaction in transactions])
 
 
 @pytest.fixture(scope="module")
@@ -179,28 +180,11 @@ def test_given_transactions_in_mem_pool_when_create_new_block_then_coinbase_tran
         'outputs': [{
             'amount': BLOCK_REWARD + transaction_fee,
             'locking_script': f'OP_DUP OP_HASH160 {public_key_hash} OP_EQUAL_VERIFY OP_CHECKSIG'
-        }]
+        }],
+        'height': pow.blockchain.height + 1
     }
 
 
-def test_given_no_transaction_when_get_transaction_fees_then_0_is_returned(network):
-    transactions = []
-    pow = ProofOfWork(network)
-
-    transaction_fees = pow.get_transaction_fees(transactions)
-
-    assert transaction_fees == 0
-
-
-def test_given_transactions_when_get_transaction_fees_then_transaction_fees_are_returned(
-        transactions, network):
-    pow = ProofOfWork(network)
-
-    transaction_fees = pow.get_transaction_fees(transactions)
-
-    assert transaction_fees == 0.5
-
-
 def test_given_transaction_fees_when_get_coinbase_transaction_then_coinbase_transaction_is_returned(
         transaction_fee, network):
     pow = ProofOfWork(network)
@@ -212,5 +196,6 @@ def test_given_transaction_fees_when_get_coinbase_transaction_then_coinbase_tran
         'outputs': [{
             'amount': BLOCK_REWARD + transaction_fee,
             'locking_script': f'OP_DUP OP_HASH160 {public_key_hash} OP_EQUAL_VERIFY OP_CHECKSIG'
-        }]
+        }],
+        'height': pow.blockchain.height + 1
     }
@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+from common.block import BlockHeader
+from common.values import NUMBER_OF_LEADING_ZEROS
+from node.new_block_creation.parallel_mining import ParallelMiner
+
+
+def block_header():
+    return BlockHeader(previous_block_hash="aaaa", timestamp=1234.5, nonce=0, merkle_root="abcd")
+
+
+def test_given_several_processes_when_get_nonce_then_nonce_gives_valid_hash():
+    header = block_header()
+    miner = ParallelMiner(processes=2)
+
+    header.nonce = miner.get_nonce(header)
+
+    assert header.get_hash().startswith("0" * NUMBER_OF_LEADING_ZEROS)
+
+
+@patch("node.new_block_creation.parallel_mining.NUMBER_OF_LEADING_ZEROS", 64)
+def test_given_running_miner_when_tip_becomes_stale_then_no_nonce_is_returned():
+    miner = ParallelMiner(processes=2)
+    stale_checks = []
+
+    def is_cancelled() -> bool:
+        stale_checks.append(True)
+        return len(stale_checks) > 3
+
+    nonce = miner.get_nonce(block_header(), is_cancelled)
+
+    assert nonce is None
+    assert len(stale_checks) > 3
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from common.block import Block, BlockHeader
+from common.block_reward import BLOCK_REWARD
+from common.chain_state import ChainState
+from common.initialize_default_blockchain import initialize_default_blockchain
+from common.mem_pool import MemPool
+from common.merkle_tree import get_merkle_root
+from common.utils import calculate_transaction_hash
+from common.values import NUMBER_OF_LEADING_ZEROS
+from node import main
+from node.new_block_creation.mining_engine import HeaderHasher
+
+
+@pytest.fixture
+def chain_state(monkeypatch):
+    initialize_default_blockchain()
+    chain_state = ChainState()
+    chain_state.load()
+    monkeypatch.setattr(main, "chain_state", chain_state)
+    return chain_state
+
+
+@pytest.fixture
+def client():
+    return main.app.test_client()
+
+
+def get_blocks_data(chain_state: ChainState, from_height: int, to_height: int) -> list:
+    return [{"header": block.block_header.to_dict, "transactions": block.transactions}
+            for block in chain_state.chain[from_height:to_height + 1]]
+
+
+def read_ndjson(response) -> list:
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_given_ndjson_accept_header_when_get_blocks_then_one_block_per_line_is_streamed(chain_state, client):
+    response = client.get("/block", headers={"Accept": main.NDJSON_MIME_TYPE})
+
+    assert response.status_code == 200
+    assert response.mimetype == main.NDJSON_MIME_TYPE
+    assert read_ndjson(response) == get_blocks_data(chain_state, 0, chain_state.chain.height)
+
+
+def test_given_height_range_and_limit_when_get_blocks_then_only_requested_blocks_are_streamed(chain_state, client):
+    response = client.get("/block", query_string={"from_height": 1, "to_height": 3, "limit": 2})
+
+    assert read_ndjson(response) == get_blocks_data(chain_state, 1, 2)
+
+
+def test_given_since_hash_when_get_blocks_then_blocks_after_it_are_streamed(chain_state, client):
+    since_hash = chain_state.chain[1].block_header.hash
+
+    response = client.get("/block", query_string={"since_hash": since_hash})
+
+    assert read_ndjson(response) == get_blocks_data(chain_state, 2, chain_state.chain.height)
+
+
+def test_given_range_above_tip_when_get_blocks_then_stream_is_empty(chain_state, client):
+    response = client.get("/block", query_string={"from_height": chain_state.chain.height + 1})
+
+    assert response.status_code == 200
+    assert read_ndjson(response) == []
+
+
+def test_given_unknown_since_hash_when_get_blocks_then_block_is_not_found(chain_state, client):
+    response = client.get("/block", query_string={"since_hash": "abcd"})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("query_string", [{"from_height": "one"}, {"to_height": "1.5"}, {"limit": "all"},
+                                          {"limit": 0}, {"limit": -2}])
+def test_given_invalid_range_parameter_when_get_blocks_then_request_is_rejected(chain_state, client, query_string):
+    response = client.get("/block", query_string=query_string)
+
+    assert response.status_code == 400
+
+
+def test_given_block_paying_more_than_reward_when_post_block_then_it_is_rejected(chain_state, client):
+    coinbase_output = {"amount": BLOCK_REWARD + 1, "locking_script": "OP_DUP OP_HASH160 abcd"}
+    transactions = [{"inputs": [], "outputs": [coinbase_output], "height": chain_state.chain.height + 1}]
+    block_header = BlockHeader(previous_block_hash=chain_state.chain.tip.block_header.hash, timestamp=1234.5,
+                               nonce=0, merkle_root=get_merkle_root(transactions))
+    block_header.nonce = HeaderHasher(block_header).search(0, 1, 10 ** 6, NUMBER_OF_LEADING_ZEROS)
+    block_data = {"block": {"header": block_header.to_dict, "transactions": transactions}}
+
+    response = client.post("/block", data=json.dumps(block_data), content_type="application/json",
+                           query_string={"wait": "true"})
+
+    assert response.status_code == 400
+    assert "Block outputs do not match inputs and block reward" in response.get_data(as_text=True)
+    assert chain_state.chain.tip.block_header.hash == block_header.previous_block_hash
+
+
+def test_given_mem_pool_spending_a_disconnected_coinbase_when_remove_orphaned_transactions_then_spender_is_evicted(
+        chain_state, monkeypatch):
+    mem_pool = MemPool()
+    monkeypatch.setattr(main, "mem_pool", mem_pool)
+    disconnected_coinbase = {"inputs": [], "outputs": [{"amount": BLOCK_REWARD, "locking_script": "abcd"}],
+                             "height": chain_state.chain.height + 1}
+    spender = {"inputs": [{"transaction_hash": calculate_transaction_hash(disconnected_coinbase), "output_index": 0,
+                           "unlocking_script": "sig key"}],
+               "outputs": [{"amount": BLOCK_REWARD, "locking_script": "efgh"}]}
+    mem_pool.add(spender)
+    disconnected_block = Block(transactions=[disconnected_coinbase],
+                               block_header=BlockHeader(previous_block_hash=chain_state.blockchain.block_header.hash,
+                                                        timestamp=1234.5, nonce=0,
+                                                        merkle_root=get_merkle_root([disconnected_coinbase])))
+
+    main.remove_orphaned_transactions([disconnected_block])
+
+    assert len(mem_pool) == 0
@@ -0,0 +1,63 @@
+import copy
+import json
+
+import pytest
+
+from blockchain_users.camille import private_key as camille_private_key
+from common.transaction import Transaction
+from common.transaction_input import TransactionInput
+from common.transaction_output import TransactionOutput
+from node.transaction_validation.script import StackScript, compile_script, get_signature_message
+from wallet.wallet import Owner
+
+
+@pytest.fixture(scope="module")
+def camille():
+    return Owner(private_key=camille_private_key)
+
+
+@pytest.fixture(scope="module")
+def transaction_data(camille):
+    inputs = [TransactionInput(transaction_hash="aaaa", output_index=0),
+              TransactionInput(transaction_hash="bbbb", output_index=1)]
+    outputs = [TransactionOutput(public_key_hash=camille.public_key_hash, amount=5)]
+    transaction = Transaction(inputs, outputs)
+    transaction.sign(camille)
+    return transaction.transaction_data
+
+
+def test_given_script_when_compile_script_then_opcodes_and_data_are_separated():
+    compiled_script = compile_script("OP_DUP OP_HASH160 abcd OP_EQUAL_VERIFY OP_CHECKSIG")
+
+    assert compiled_script == (
+        (StackScript.op_dup, None),
+        (StackScript.op_hash160, None),
+        (None, "abcd"),
+        (StackScript.op_equal_verify, None),
+        (StackScript.op_checksig, None),
+    )
+
+
+def test_given_unknown_opcode_when_compile_script_then_exception_is_raised():
+    with pytest.raises(KeyError):
+        compile_script("OP_UNKNOWN")
+
+
+def test_given_signed_transaction_when_get_signature_message_then_unsigned_data_is_serialised(transaction_data):
+    unsigned_data = copy.deepcopy(transaction_data)
+    unsigned_data.pop("transaction_hash")
+    for tx_input in unsigned_data["inputs"]:
+        tx_input.pop("unlocking_script")
+
+    assert get_signature_message(transaction_data) == json.dumps(unsigned_data, indent=2).encode("utf-8")
+    assert "unlocking_script" in transaction_data["inputs"][0]
+
+
+def test_given_signed_transaction_when_execute_scripts_then_signature_is_verified(camille, transaction_data):
+    locking_script = f"OP_DUP OP_HASH160 {camille.public_key_hash} OP_EQUAL_VERIFY OP_CHECKSIG"
+    stack_script = StackScript(get_signature_message(transaction_data))
+
+    stack_script.execute(compile_script(transaction_data["inputs"][0]["unlocking_script"]))
+    stack_script.execute(compile_script(locking_script))
+
+    assert stack_script.elements == []
@@ -0,0 +1,23 @@
+from node.transaction_validation.script_cache import ScriptCache
+
+
+def test_given_added_key_when_lookup_then_hit_is_counted():
+    script_cache = ScriptCache()
+    script_cache.add(("aaaa", 0, "OP_CHECKSIG"))
+
+    assert ("aaaa", 0, "OP_CHECKSIG") in script_cache
+    assert ("aaaa", 1, "OP_CHECKSIG") not in script_cache
+    assert script_cache.stats == {"size": 1, "max_size": script_cache.max_size, "hits": 1, "misses": 1}
+
+
+def test_given_full_cache_when_add_then_least_recently_used_key_is_evicted():
+    script_cache = ScriptCache(max_size=2)
+    script_cache.add(("aaaa", 0, ""))
+    script_cache.add(("bbbb", 0, ""))
+    assert ("aaaa", 0, "") in script_cache
+
+    script_cache.add(("cccc", 0, ""))
+
+    assert len(script_cache) == 2
+    assert ("aaaa", 0, "") in script_cache
+    assert ("bbbb", 0, "") not in script_cache
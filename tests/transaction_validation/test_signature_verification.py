@@ -0,0 +1,52 @@
+import binascii
+
+import pytest
+from Crypto.Hash import SHA256
+from Crypto.Signature import pkcs1_15
+
+from blockchain_users.camille import private_key as camille_private_key
+from node.transaction_validation.signature_verification import SignatureBatchVerifier, verify_signature
+from wallet.wallet import Owner
+
+
+@pytest.fixture(scope="module")
+def camille():
+    return Owner(private_key=camille_private_key)
+
+
+@pytest.fixture(scope="module")
+def signatures(camille):
+    signatures = []
+    for i in range(40):
+        message = f"transaction {i}".encode("utf-8")
+        signature = pkcs1_15.new(camille.private_key).sign(SHA256.new(message))
+        signatures.append((camille.public_key_hex, message, binascii.hexlify(signature).decode("utf-8")))
+    return signatures
+
+
+@pytest.fixture(scope="module")
+def verifier():
+    verifier = SignatureBatchVerifier(processes=2)
+    yield verifier
+    verifier.shutdown()
+
+
+def test_given_valid_signature_when_verify_signature_then_returns_true(signatures):
+    assert verify_signature(*signatures[0])
+
+
+def test_given_tampered_message_when_verify_signature_then_returns_false(signatures):
+    public_key_hex, _, signature_hex = signatures[0]
+
+    assert not verify_signature(public_key_hex, b"tampered", signature_hex)
+
+
+def test_given_valid_signatures_when_verify_batch_then_returns_true(verifier, signatures):
+    assert verifier.verify(signatures)
+
+
+def test_given_one_invalid_signature_when_verify_batch_then_returns_false(verifier, signatures):
+    public_key_hex, _, signature_hex = signatures[0]
+    bad_signatures = signatures + [(public_key_hex, b"tampered", signature_hex)]
+
+    assert not verifier.verify(bad_signatures)
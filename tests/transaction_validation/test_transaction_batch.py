@@ -0,0 +1,115 @@
+import pytest
+
+from blockchain_users.camille import private_key as camille_private_key
+from common.chain_state import ChainState
+from common.initialize_default_blockchain import initialize_default_blockchain
+from common.mem_pool import MemPool
+from common.network import Network
+from common.node import Node
+from common.transaction import Transaction as SignedTransaction
+from common.transaction_input import TransactionInput
+from common.transaction_output import TransactionOutput
+from common.utils import calculate_transaction_hash
+from node.transaction_validation.script_cache import ScriptCache
+from node.transaction_validation.signature_verification import SignatureBatchVerifier
+from node.transaction_validation.transaction_validation import TRANSACTION_ACCEPTED, TRANSACTION_KNOWN, \
+    TRANSACTION_REJECTED, Transaction, TransactionBatch
+from wallet.wallet import Owner
+
+CAMILLE_UTXO_HASH = "e1d7553f03fd2b578116c6ac7c72356c364535a120dbbb40ec182deb8d408961"
+OTHER_CAMILLE_UTXO_HASH = "e10154f49ae1119777b93e5bcd1a1506b6a89c1f82cc85f63c6cbe83a39df5dc"
+
+
+@pytest.fixture
+def chain_state():
+    initialize_default_blockchain()
+    chain_state = ChainState()
+    chain_state.load()
+    return chain_state
+
+
+@pytest.fixture(scope="module")
+def camille():
+    return Owner(private_key=camille_private_key)
+
+
+def signed_transaction(owner: Owner, transaction_hash: str, amount: int) -> dict:
+    transaction = SignedTransaction([TransactionInput(transaction_hash, 0)],
+                                    [TransactionOutput(public_key_hash=owner.public_key_hash, amount=amount)])
+    transaction.sign(owner)
+    return transaction.transaction_data
+
+
+def get_transaction_batch(chain_state: ChainState, mem_pool: MemPool) -> TransactionBatch:
+    return TransactionBatch(chain_state.blockchain, Network(Node("1.1.1.1:1234")), chain_state.utxo_set, mem_pool,
+                            script_cache=ScriptCache(), signature_verifier=SignatureBatchVerifier(processes=1))
+
+
+def test_given_mixed_batch_when_validate_then_each_transaction_gets_its_own_result(chain_state, camille):
+    parent = signed_transaction(camille, CAMILLE_UTXO_HASH, 10)
+    child = signed_transaction(camille, parent["transaction_hash"], 9)
+    double_spend = signed_transaction(camille, CAMILLE_UTXO_HASH, 8)
+    forged = signed_transaction(camille, OTHER_CAMILLE_UTXO_HASH, 5)
+    forged["outputs"][0]["amount"] = 4
+    forged["transaction_hash"] = calculate_transaction_hash(forged)
+    mem_pool = MemPool()
+
+    transaction_batch = get_transaction_batch(chain_state, mem_pool)
+    results = transaction_batch.validate([parent, child, double_spend, forged, {}])
+
+    assert [result["status"] for result in results] == [TRANSACTION_ACCEPTED, TRANSACTION_ACCEPTED,
+                                                        TRANSACTION_REJECTED, TRANSACTION_REJECTED,
+                                                        TRANSACTION_REJECTED]
+    assert results[3]["error"] == "Transaction script validation failed"
+    assert len(mem_pool) == 2
+    assert transaction_batch.accepted_hashes == [results[0]["transaction_hash"], results[1]["transaction_hash"]]
+
+
+def test_given_forged_spend_before_honest_spend_when_validate_batch_then_honest_spend_is_accepted(chain_state,
+                                                                                                  camille):
+    forged = signed_transaction(camille, CAMILLE_UTXO_HASH, 10)
+    forged["outputs"][0]["amount"] = 9
+    forged["transaction_hash"] = calculate_transaction_hash(forged)
+    honest = signed_transaction(camille, CAMILLE_UTXO_HASH, 8)
+    honest_child = signed_transaction(camille, honest["transaction_hash"], 7)
+    mem_pool = MemPool()
+
+    transaction_batch = get_transaction_batch(chain_state, mem_pool)
+    results = transaction_batch.validate([forged, honest, honest_child])
+
+    assert results[0] == {"transaction_hash": forged["transaction_hash"], "status": TRANSACTION_REJECTED,
+                          "error": "Transaction script validation failed"}
+    assert [result["status"] for result in results[1:]] == [TRANSACTION_ACCEPTED, TRANSACTION_ACCEPTED]
+    assert transaction_batch.accepted_hashes == [honest["transaction_hash"], honest_child["transaction_hash"]]
+    assert mem_pool.get_spending_transaction_hash(CAMILLE_UTXO_HASH, 0) == honest["transaction_hash"]
+
+
+def test_given_transaction_already_in_mem_pool_when_validate_batch_then_it_is_reported_as_known(chain_state,
+                                                                                               camille):
+    transaction = signed_transaction(camille, CAMILLE_UTXO_HASH, 10)
+    mem_pool = MemPool()
+    get_transaction_batch(chain_state, mem_pool).validate([transaction])
+
+    transaction_batch = get_transaction_batch(chain_state, mem_pool)
+    results = transaction_batch.validate([transaction])
+
+    assert results[0]["status"] == TRANSACTION_KNOWN
+    assert transaction_batch.accepted_hashes == []
+
+
+def test_given_wallet_child_of_mem_pool_parent_when_validated_one_by_one_then_both_are_stored(chain_state, camille):
+    parent = signed_transaction(camille, CAMILLE_UTXO_HASH, 10)
+    child = signed_transaction(camille, parent["transaction_hash"], 9)
+    mem_pool = MemPool()
+
+    for transaction_data in (parent, child):
+        transaction = Transaction(chain_state.blockchain, Network(Node("1.1.1.1:1234")), chain_state.utxo_set,
+                                  script_cache=ScriptCache(), mem_pool=mem_pool)
+        transaction.receive(transaction=transaction_data)
+        transaction.validate()
+        transaction.validate_funds()
+        transaction.store()
+
+    assert parent["transaction_hash"] in mem_pool
+    assert child["transaction_hash"] in mem_pool
+    assert mem_pool.get_spending_transaction_hash(parent["transaction_hash"], 0) == child["transaction_hash"]
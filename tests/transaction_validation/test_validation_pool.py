@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from node.validation_pool import ClientRateLimitException, ValidationPool, ValidationQueueFullException
+
+
+def test_given_full_queue_when_submit_then_it_is_rejected_until_work_completes():
+    validation_pool = ValidationPool(max_workers=1, max_queued=2)
+    release = threading.Event()
+    futures = [validation_pool.submit(client, release.wait, 5) for client in ("a", "b")]
+
+    with pytest.raises(ValidationQueueFullException):
+        validation_pool.submit("c", release.wait, 5)
+    release.set()
+    for future in futures:
+        future.result()
+
+    assert len(validation_pool) == 0
+    assert validation_pool.submit("c", lambda: "validated").result() == "validated"
+
+
+def test_given_busy_client_when_submit_then_only_that_client_is_rate_limited():
+    validation_pool = ValidationPool(max_workers=1, max_queued=10, max_queued_per_client=1)
+    release = threading.Event()
+    future = validation_pool.submit("a", release.wait, 5)
+
+    with pytest.raises(ClientRateLimitException):
+        validation_pool.submit("a", release.wait, 5)
+    other_future = validation_pool.submit("b", lambda: "validated")
+    release.set()
+
+    assert future.result() is True
+    assert other_future.result() == "validated"
@@ -0,0 +1,328 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from blockchain_users.camille import private_key as camille_private_key
+from common.block import BlockHeader
+from common.chain_state import ChainState
+from common.initialize_default_blockchain import get_default_block_hashes, initialize_default_blockchain
+from common.mem_pool import MemPool
+from common.merkle_tree import MerkleTree
+from common.transaction_input import TransactionInput
+from common.transaction_output import TransactionOutput
+from common.utils import calculate_transaction_hash
+from common.values import NUMBER_OF_LEADING_ZEROS
+from node import main
+from node.new_block_creation.mining_engine import HeaderHasher
+from node.transaction_validation.transaction_validation import TRANSACTION_ACCEPTED, TRANSACTION_REJECTED
+from wallet.wallet import Owner, Wallet, WalletException
+
+HEADERS_PER_PAGE = 2
+CAMILLE_UTXO_HASH = "e1d7553f03fd2b578116c6ac7c72356c364535a120dbbb40ec182deb8d408961"
+OTHER_CAMILLE_UTXO_HASH = "e10154f49ae1119777b93e5bcd1a1506b6a89c1f82cc85f63c6cbe83a39df5dc"
+
+
+def locking_script(public_key_hash: str) -> str:
+    return f"OP_DUP OP_HASH160 {public_key_hash} OP_EQUAL_VERIFY OP_CHECKSIG"
+
+
+def coinbase(height: int) -> dict:
+    return {"inputs": [], "outputs": [{"amount": 50, "locking_script": locking_script("albert")}], "height": height}
+
+
+def mine(block_header: BlockHeader) -> BlockHeader:
+    header_hasher = HeaderHasher(block_header)
+    nonce = None
+    first_nonce = 0
+    while nonce is None:
+        nonce = header_hasher.search(first_nonce, 1, 100000, NUMBER_OF_LEADING_ZEROS)
+        first_nonce = first_nonce + 100000
+    block_header.nonce = nonce
+    return block_header
+
+
+def get_header(height: int, block_header: BlockHeader) -> dict:
+    return {"height": height, "hash": block_header.hash, "header": block_header.to_dict}
+
+
+def get_blocks(previous_block_hash: str, first_height: int, number_of_blocks: int, timestamp: float = 1234.5) -> list:
+    blocks = []
+    for height in range(first_height, first_height + number_of_blocks):
+        transactions = [coinbase(height), coinbase(height + 100)]
+        block_header = BlockHeader(previous_block_hash=previous_block_hash, timestamp=timestamp, nonce=0,
+                                   merkle_root=MerkleTree.from_transactions(transactions).root)
+        if height:
+            mine(block_header)
+        blocks.append((block_header, transactions))
+        previous_block_hash = block_header.hash
+    return blocks
+
+
+@pytest.fixture(scope="module")
+def blocks():
+    return get_blocks("1111", 0, 4)
+
+
+@pytest.fixture(scope="module")
+def headers(blocks):
+    return [get_header(height, block_header) for height, (block_header, _) in enumerate(blocks)]
+
+
+def get_wallet(headers: list, checkpoint_hashes: list = None) -> Wallet:
+    if checkpoint_hashes is None:
+        checkpoint_hashes = [headers[0]["hash"]]
+    wallet = Wallet(Owner(private_key=camille_private_key), checkpoint_hashes=checkpoint_hashes)
+    wallet.node = Mock()
+    wallet.node.get_headers.side_effect = lambda from_height: headers[from_height:from_height + HEADERS_PER_PAGE]
+    return wallet
+
+
+def get_transaction_proof(blocks: list, height: int, index: int) -> dict:
+    block_header, transactions = blocks[height]
+    return {
+        "transaction": transactions[index],
+        "height": height,
+        "block_hash": block_header.hash,
+        "merkle_root": block_header.merkle_root,
+        "index": index,
+        "proof": MerkleTree.from_transactions(transactions).get_proof(index)
+    }
+
+
+def test_given_headers_on_several_pages_when_sync_headers_then_all_headers_are_stored(headers):
+    wallet = get_wallet(headers)
+
+    assert wallet.sync_headers() == len(headers)
+
+    assert wallet.headers == headers
+    assert wallet.node.get_headers.call_count == 3
+
+
+def test_given_header_without_proof_of_work_when_sync_headers_then_exception_is_raised(headers):
+    unmined_header = BlockHeader(previous_block_hash=headers[1]["hash"], timestamp=1234.5, nonce=0,
+                                 merkle_root="abcd")
+    while unmined_header.hash.startswith("0" * NUMBER_OF_LEADING_ZEROS):
+        unmined_header.nonce = unmined_header.nonce + 1
+    wallet = get_wallet(headers[:2] + [get_header(2, unmined_header)])
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header proof of work validation failed"
+    assert len(wallet.headers) == 2
+
+
+def test_given_header_with_wrong_hash_when_sync_headers_then_exception_is_raised(headers):
+    wrong_header = {**headers[2], "hash": headers[3]["hash"]}
+    wallet = get_wallet(headers[:2] + [wrong_header])
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header hash does not match its content"
+    assert len(wallet.headers) == 2
+
+
+def test_given_header_not_extending_known_headers_when_sync_headers_then_exception_is_raised(headers):
+    wallet = get_wallet(headers[:2] + [{**headers[3], "height": 2}])
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header does not extend the known headers"
+
+
+def test_given_node_switched_to_a_longer_fork_when_sync_headers_then_headers_are_rolled_back_to_the_fork_point(
+        blocks, headers):
+    fork_headers = headers[:2] + [get_header(height, block_header) for height, (block_header, _)
+                                  in enumerate(get_blocks(headers[1]["hash"], 2, 3, timestamp=5678.5), start=2)]
+    wallet = get_wallet(headers)
+    wallet.sync_headers()
+    wallet.node.get_headers.side_effect = lambda from_height: fork_headers[from_height:from_height + HEADERS_PER_PAGE]
+
+    assert wallet.sync_headers() == len(fork_headers)
+
+    assert wallet.headers == fork_headers
+
+
+def test_given_fork_below_the_checkpoint_when_sync_headers_then_exception_is_raised(headers):
+    wallet = get_wallet(headers[:2] + [{**headers[3], "height": 2}], checkpoint_hashes=[headers[0]["hash"],
+                                                                                        headers[1]["hash"]])
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header does not extend the known headers"
+    assert wallet.headers == headers[:2]
+
+
+def test_given_header_out_of_order_when_sync_headers_then_exception_is_raised(headers):
+    wallet = get_wallet(headers[:2] + headers[3:])
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header received out of order"
+
+
+def test_given_valid_inclusion_proof_when_verify_transaction_then_transaction_is_returned(blocks, headers):
+    wallet = get_wallet(headers)
+    transaction_proof = get_transaction_proof(blocks, 2, 1)
+    wallet.node.get_proof.return_value = transaction_proof
+
+    transaction = wallet.verify_transaction(calculate_transaction_hash(transaction_proof["transaction"]))
+
+    assert transaction == blocks[2][1][1]
+    assert len(wallet.headers) == len(headers)
+
+
+def test_given_tampered_transaction_when_verify_transaction_then_exception_is_raised(blocks, headers):
+    wallet = get_wallet(headers)
+    transaction_proof = get_transaction_proof(blocks, 2, 1)
+    transaction_hash = calculate_transaction_hash(transaction_proof["transaction"])
+    transaction_proof["transaction"] = {**transaction_proof["transaction"],
+                                        "outputs": [{"amount": 500, "locking_script": locking_script("albert")}]}
+    wallet.node.get_proof.return_value = transaction_proof
+
+    with pytest.raises(WalletException) as error:
+        wallet.verify_transaction(transaction_hash)
+
+    assert error.value.message == "Transaction inclusion proof is invalid"
+
+
+def test_given_coinbase_inclusion_proof_when_verify_transaction_then_coinbase_is_returned(blocks, headers):
+    wallet = get_wallet(headers)
+    transaction_proof = get_transaction_proof(blocks, 3, 0)
+    wallet.node.get_proof.return_value = transaction_proof
+
+    transaction = wallet.verify_transaction(calculate_transaction_hash(blocks[3][1][0]))
+
+    assert transaction == blocks[3][1][0]
+    assert "transaction_hash" not in transaction
+
+
+def test_given_proof_for_another_block_when_verify_transaction_then_exception_is_raised(blocks, headers):
+    wallet = get_wallet(headers)
+    transaction_proof = get_transaction_proof(blocks, 2, 1)
+    transaction_proof["block_hash"] = headers[3]["hash"]
+    wallet.node.get_proof.return_value = transaction_proof
+
+    with pytest.raises(WalletException) as error:
+        wallet.verify_transaction(calculate_transaction_hash(transaction_proof["transaction"]))
+
+    assert error.value.message == "Transaction inclusion proof is invalid"
+
+
+def test_given_proof_above_known_headers_when_verify_transaction_then_exception_is_raised(blocks, headers):
+    wallet = get_wallet(headers[:2])
+    transaction_proof = get_transaction_proof(blocks, 2, 1)
+    wallet.node.get_proof.return_value = transaction_proof
+
+    with pytest.raises(WalletException) as error:
+        wallet.verify_transaction(calculate_transaction_hash(transaction_proof["transaction"]))
+
+    assert error.value.message == "Transaction is in an unknown block"
+
+
+def get_default_chain_headers() -> list:
+    initialize_default_blockchain()
+    chain_state = ChainState()
+    chain_state.load()
+    return chain_state.get_headers(0)
+
+
+def test_given_default_chain_when_sync_headers_then_unmined_bootstrap_headers_are_trusted_by_checkpoint():
+    default_headers = get_default_chain_headers()
+    wallet = get_wallet(default_headers, checkpoint_hashes=get_default_block_hashes())
+
+    assert wallet.sync_headers() == len(default_headers)
+
+    assert wallet.headers == default_headers
+    assert not all(header["hash"].startswith("0" * NUMBER_OF_LEADING_ZEROS) for header in default_headers[1:])
+
+
+def test_given_default_chain_extended_by_unmined_header_when_sync_headers_then_exception_is_raised():
+    default_headers = get_default_chain_headers()
+    unmined_header = BlockHeader(previous_block_hash=default_headers[-1]["hash"], timestamp=1234.5, nonce=0,
+                                 merkle_root="abcd")
+    while unmined_header.hash.startswith("0" * NUMBER_OF_LEADING_ZEROS):
+        unmined_header.nonce = unmined_header.nonce + 1
+    wallet = get_wallet(default_headers + [get_header(len(default_headers), unmined_header)],
+                        checkpoint_hashes=get_default_block_hashes())
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header proof of work validation failed"
+    assert wallet.headers == default_headers
+
+
+def test_given_header_not_matching_the_checkpoint_when_sync_headers_then_exception_is_raised(headers):
+    wallet = get_wallet(headers, checkpoint_hashes=[headers[0]["hash"], headers[2]["hash"]])
+
+    with pytest.raises(WalletException) as error:
+        wallet.sync_headers()
+
+    assert error.value.message == "Header does not match the checkpoint"
+    assert len(wallet.headers) == 1
+
+
+def test_given_wallet_without_checkpoint_when_created_then_default_chain_is_the_checkpoint():
+    wallet = Wallet(Owner(private_key=camille_private_key))
+
+    assert wallet.checkpoint_hashes == get_default_block_hashes()
+
+
+def get_transfer(transaction_hash: str, amount: int) -> tuple:
+    camille = Owner(private_key=camille_private_key)
+    return ([TransactionInput(transaction_hash=transaction_hash, output_index=0)],
+            [TransactionOutput(public_key_hash=camille.public_key_hash, amount=amount)])
+
+
+@patch("wallet.wallet.get_session")
+def test_given_transfers_when_process_transactions_then_signed_batch_is_posted_and_results_returned(get_session):
+    batch_results = [{"transaction_hash": "aaaa", "status": TRANSACTION_ACCEPTED}]
+    get_session.return_value.post.return_value.json.return_value = batch_results
+    wallet = Wallet(Owner(private_key=camille_private_key))
+
+    results = wallet.process_transactions([get_transfer(CAMILLE_UTXO_HASH, 10),
+                                           get_transfer(OTHER_CAMILLE_UTXO_HASH, 5)])
+
+    assert results == batch_results
+    url = get_session.return_value.post.call_args.args[0]
+    keyword_arguments = get_session.return_value.post.call_args.kwargs
+    assert url == "http://127.0.0.1:5000/transactions/batch"
+    assert keyword_arguments["params"] == {"wait": "true"}
+    transactions_data = keyword_arguments["json"]
+    assert [transaction_data["inputs"][0]["transaction_hash"] for transaction_data in transactions_data] == \
+        [CAMILLE_UTXO_HASH, OTHER_CAMILLE_UTXO_HASH]
+    assert all(transaction_data["inputs"][0]["unlocking_script"] for transaction_data in transactions_data)
+    assert all(transaction_data["transaction_hash"] == calculate_transaction_hash(transaction_data)
+               for transaction_data in transactions_data)
+
+
+def test_given_transfers_sent_to_node_when_process_transactions_then_each_transfer_gets_its_result(monkeypatch):
+    initialize_default_blockchain()
+    chain_state = ChainState()
+    chain_state.load()
+    mem_pool = MemPool()
+    monkeypatch.setattr(main, "chain_state", chain_state)
+    monkeypatch.setattr(main, "mem_pool", mem_pool)
+    monkeypatch.setattr(main, "network", Mock())
+    client = main.app.test_client()
+    wallet = Wallet(Owner(private_key=camille_private_key))
+    wallet.node = Mock()
+    wallet.node.send_batch.side_effect = lambda transactions_data: client.post(
+        "/transactions/batch", data=json.dumps(transactions_data), content_type="application/json",
+        query_string={"wait": "true"}).get_json()
+
+    results = wallet.process_transactions([get_transfer(CAMILLE_UTXO_HASH, 10),
+                                           get_transfer(OTHER_CAMILLE_UTXO_HASH, 5),
+                                           get_transfer(CAMILLE_UTXO_HASH, 8)])
+
+    assert [result["status"] for result in results] == [TRANSACTION_ACCEPTED, TRANSACTION_ACCEPTED,
+                                                        TRANSACTION_REJECTED]
+    assert results[0]["transaction_hash"] in mem_pool
+    assert results[1]["transaction_hash"] in mem_pool
+    assert len(mem_pool) == 2